@@ -1,93 +1,388 @@
-def check_soc2_compliance(system_config):
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CheckResult = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Control:
+    """A single control check, shared by every framework that lists it"""
+    name: str
+    check: Callable[[Dict[str, Any]], CheckResult]
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+
+def _setting(path: str) -> Callable[[Dict[str, Any]], Any]:
+    def lookup(system_config: Dict[str, Any]) -> Any:
+        value: Any = system_config
+        for key in path.split('.'):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    return lookup
+
+
+def setting_check(path: str,
+                  finding: str,
+                  recommendation: str,
+                  severity: str = 'high',
+                  passes: Callable[[Any], bool] = bool) -> Callable[[Dict[str, Any]], CheckResult]:
     """
-    Check SOC2 compliance controls focusing on security, availability,
-    processing integrity, confidentiality, and privacy
+    Build a check that passes when the setting at dotted ``path`` satisfies ``passes``
     """
-    controls = {
+    lookup = _setting(path)
+
+    def check(system_config: Dict[str, Any]) -> CheckResult:
+        status = passes(lookup(system_config))
+        return {
+            'status': status,
+            'finding': None if status else finding,
+            'severity': severity,
+            'recommendation': None if status else recommendation,
+        }
+    return check
+
+
+def _at_least(minimum: float) -> Callable[[Any], bool]:
+    return lambda value: isinstance(value, (int, float)) and value >= minimum
+
+
+CONTROLS: Dict[str, Control] = {control.name: control for control in [
+    Control('access_control', setting_check(
+        'access_control.rbac_enabled', 'Role-based access control is not enforced',
+        'Enable RBAC and review role assignments quarterly')),
+    Control('mfa', setting_check(
+        'access_control.mfa_enabled', 'Multi-factor authentication is not required',
+        'Require MFA for all interactive and privileged access'), depends_on=('access_control',)),
+    Control('encryption_at_rest', setting_check(
+        'encryption.at_rest', 'Data is not encrypted at rest', 'Enable storage encryption with managed keys')),
+    Control('encryption_in_transit', setting_check(
+        'encryption.in_transit', 'Data is not encrypted in transit', 'Enforce TLS 1.2+ on every endpoint')),
+    Control('audit_logging', setting_check(
+        'logging.audit_enabled', 'Audit logging is disabled', 'Enable audit logs for all administrative actions')),
+    Control('log_retention', setting_check(
+        'logging.retention_days', 'Audit logs are kept for less than a year',
+        'Retain audit logs for at least 365 days', severity='medium', passes=_at_least(365)),
+        depends_on=('audit_logging',)),
+    Control('availability', setting_check(
+        'availability.uptime_target', 'No uptime target of at least 99.9% is defined',
+        'Define and monitor an availability SLO of 99.9% or higher', severity='medium',
+        passes=_at_least(99.9))),
+    Control('disaster_recovery', setting_check(
+        'availability.dr_plan', 'No disaster recovery plan', 'Document and test a disaster recovery plan')),
+    Control('data_validation', setting_check(
+        'processing.input_validation', 'Inputs are not validated', 'Validate all external input',
+        severity='medium')),
+    Control('error_handling', setting_check(
+        'processing.error_handling', 'Errors are not handled consistently',
+        'Handle and report processing errors centrally', severity='medium')),
+    Control('data_classification', setting_check(
+        'data.classification', 'Data is not classified', 'Classify data by sensitivity', severity='medium')),
+    Control('data_retention', setting_check(
+        'data.retention_policy', 'No data retention policy', 'Define and enforce a data retention policy',
+        severity='medium')),
+    Control('privacy_controls', setting_check(
+        'privacy.data_protection', 'Personal data protection controls are missing',
+        'Apply minimization and access restrictions to personal data')),
+    Control('consent_management', setting_check(
+        'privacy.consent', 'Consent is not recorded', 'Record and honour user consent', severity='medium')),
+    Control('incident_response', setting_check(
+        'security.incident_response_plan', 'No incident response plan',
+        'Maintain and rehearse an incident response plan')),
+    Control('system_integrity', setting_check(
+        'security.integrity_monitoring', 'System integrity is not monitored', 'Enable file integrity monitoring')),
+    Control('security_policy', setting_check(
+        'security.policies_documented', 'Security policies are not documented',
+        'Document information security policies and review them yearly', severity='medium')),
+    Control('asset_management', setting_check(
+        'assets.inventory', 'No asset inventory', 'Keep an up-to-date inventory of systems and owners',
+        severity='medium')),
+    Control('network_security', setting_check(
+        'network.firewall_enabled', 'Network traffic is not filtered', 'Restrict traffic with firewall rules')),
+    Control('vulnerability_management', setting_check(
+        'security.vulnerability_scanning', 'No vulnerability scanning',
+        'Scan systems for vulnerabilities regularly')),
+    Control('security_monitoring', setting_check(
+        'monitoring.security_alerts', 'Security events do not raise alerts', 'Alert on suspicious security events'),
+        depends_on=('audit_logging',)),
+    Control('cardholder_data', setting_check(
+        'data.cardholder_data_encrypted', 'Cardholder data is stored unencrypted',
+        'Encrypt or tokenize stored cardholder data', severity='critical'), depends_on=('encryption_at_rest',)),
+]}
+
+# framework -> category -> control label in that framework -> control name
+FRAMEWORKS: Dict[str, Dict[str, Dict[str, str]]] = {
+    'soc2': {
         'security': {
-            'access_controls': check_access_controls(),
-            'encryption': check_encryption_standards(),
-            'logging': check_audit_logging(),
+            'access_controls': 'access_control',
+            'encryption': 'encryption_at_rest',
+            'logging': 'audit_logging',
         },
         'availability': {
-            'uptime': check_system_availability(),
-            'disaster_recovery': check_dr_plans(),
+            'uptime': 'availability',
+            'disaster_recovery': 'disaster_recovery',
         },
         'processing_integrity': {
-            'data_validation': check_data_validation(),
-            'error_handling': check_error_handling(),
+            'data_validation': 'data_validation',
+            'error_handling': 'error_handling',
         },
         'confidentiality': {
-            'data_classification': check_data_classification(),
-            'data_retention': check_retention_policies(),
+            'data_classification': 'data_classification',
+            'data_retention': 'data_retention',
         },
         'privacy': {
-            'data_protection': check_privacy_controls(),
-            'consent_management': check_consent_mechanisms(),
-        }
-    }
-    return evaluate_controls(controls)
+            'data_protection': 'privacy_controls',
+            'consent_management': 'consent_management',
+        },
+    },
+    'fedramp': {
+        'access_control': {'access_control': 'access_control', 'multi_factor': 'mfa'},
+        'audit_logging': {'audit_logging': 'audit_logging', 'retention': 'log_retention'},
+        'identification': {'identification': 'mfa'},
+        'incident_response': {'incident_response': 'incident_response'},
+        'system_integrity': {'system_integrity': 'system_integrity'},
+    },
+    'iso': {
+        'information_security': {'information_security': 'security_policy'},
+        'asset_management': {'asset_management': 'asset_management'},
+        'access_control': {'access_control': 'access_control'},
+        'cryptography': {'at_rest': 'encryption_at_rest', 'in_transit': 'encryption_in_transit'},
+        'operations_security': {'logging': 'audit_logging', 'vulnerabilities': 'vulnerability_management'},
+    },
+    'pci': {
+        'network_security': {'network_security': 'network_security'},
+        'cardholder_data': {'cardholder_data': 'cardholder_data', 'transmission': 'encryption_in_transit'},
+        'vulnerability_management': {'vulnerability_management': 'vulnerability_management'},
+        'access_control': {'access_control': 'access_control', 'multi_factor': 'mfa'},
+        'monitoring': {'audit_logging': 'audit_logging', 'security_monitoring': 'security_monitoring'},
+        'policy': {'policy': 'security_policy'},
+    },
+}
+
+
+def _failed(finding: str, recommendation: str, severity: str = 'high') -> CheckResult:
+    return {'status': False, 'finding': finding, 'severity': severity, 'recommendation': recommendation}
+
+
+class ComplianceEngine:
+    """
+    Evaluates the unique controls behind any set of frameworks concurrently.
+
+    A control shared by several frameworks runs once per audit, after the
+    controls it depends on; if one of those fails it is reported as failed
+    without running. Each control is bounded by its own timeout. Results are
+    cached per control and system config for ``cache_ttl`` seconds.
+    """
+
+    def __init__(self,
+                 controls: Optional[Dict[str, Control]] = None,
+                 frameworks: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None,
+                 max_workers: int = 16,
+                 default_timeout: float = 30.0,
+                 cache_ttl: float = 300.0):
+        self.controls = CONTROLS if controls is None else controls
+        self.frameworks = FRAMEWORKS if frameworks is None else frameworks
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.cache_ttl = cache_ttl
+        # (control name, config digest) -> (expiry, result)
+        self._cache: Dict[Tuple[str, str], Tuple[float, CheckResult]] = {}
+        self._cache_lock = threading.Lock()
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def plan(self, frameworks: Iterable[str]) -> List[List[str]]:
+        """
+        Unique controls needed for ``frameworks``, grouped into dependency levels
+        """
+        needed: Dict[str, int] = {}
+
+        def visit(name: str, path: Tuple[str, ...]) -> int:
+            if name in path:
+                raise ValueError(f"Control dependency cycle: {' -> '.join(path + (name,))}")
+            if name not in needed:
+                needed[name] = 1 + max((visit(dependency, path + (name,))
+                                        for dependency in self.controls[name].depends_on), default=-1)
+            return needed[name]
+
+        for framework in frameworks:
+            for checks in self.frameworks[framework].values():
+                for name in checks.values():
+                    visit(name, ())
+        levels: List[List[str]] = [[] for _ in range(max(needed.values(), default=-1) + 1)]
+        for name, level in needed.items():
+            levels[level].append(name)
+        return levels
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[CheckResult]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._cache[key]
+                return None
+            return entry[1]
+
+    def _store(self, key: Tuple[str, str], result: CheckResult) -> None:
+        if self.cache_ttl > 0:
+            with self._cache_lock:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+
+    def _run_check(self, control: Control, system_config: Dict[str, Any]) -> CheckResult:
+        try:
+            return control.check(system_config)
+        except Exception as e:
+            return _failed(f"Check raised {type(e).__name__}: {e}", f"Fix the {control.name} check")
+
+    def run_controls(self,
+                     frameworks: Iterable[str],
+                     system_config: Dict[str, Any]) -> Iterator[Tuple[str, CheckResult]]:
+        """
+        Yield ``(control name, result)`` for every control of ``frameworks`` as each one finishes
+        """
+        levels = self.plan(frameworks)
+        digest = hashlib.sha256(json.dumps(system_config, sort_keys=True, default=str).encode()).hexdigest()
+        done: Dict[str, CheckResult] = {}
+        waiting = {name: set(self.controls[name].depends_on) for level in levels for name in level}
+        running: Dict[Future, Tuple[str, float]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="compliance")
+
+        def ready() -> List[str]:
+            names = [name for name, dependencies in waiting.items() if dependencies <= done.keys()]
+            for name in names:
+                del waiting[name]
+            return names
+
+        def finish(name: str, result: CheckResult) -> Tuple[str, CheckResult]:
+            done[name] = result
+            return name, result
+
+        try:
+            pending = ready()
+            while pending or running:
+                for name in pending:
+                    control = self.controls[name]
+                    failed = [dependency for dependency in control.depends_on if not done[dependency]['status']]
+                    cached = self._cached((name, digest))
+                    if failed:
+                        yield finish(name, _failed(f"Not evaluated: depends on failing {', '.join(failed)}",
+                                                   f"Resolve {', '.join(failed)} first"))
+                    elif cached is not None:
+                        yield finish(name, cached)
+                    else:
+                        timeout = control.timeout if control.timeout is not None else self.default_timeout
+                        future = executor.submit(self._run_check, control, system_config)
+                        running[future] = (name, time.monotonic() + timeout)
+                pending = ready()
+                if pending or not running:
+                    continue
+
+                nearest = min(deadline for _, deadline in running.values())
+                finished, _ = wait(running, timeout=max(0.0, nearest - time.monotonic()),
+                                   return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, _ = running.pop(future)
+                    result = future.result()
+                    self._store((name, digest), result)
+                    yield finish(name, result)
+                now = time.monotonic()
+                for future, (name, deadline) in list(running.items()):
+                    if deadline <= now and not future.done():
+                        del running[future]
+                        limit = self.controls[name].timeout or self.default_timeout
+                        yield finish(name, _failed(f"Check timed out after {limit}s",
+                                                   f"Investigate why the {name} check is slow"))
+                pending = ready()
+        finally:
+            # Timed-out checks keep their thread until they return; nobody waits for them
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def audit(self, system_config: Dict[str, Any], frameworks: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        Evaluate ``frameworks`` (default: all) against ``system_config``, one report per framework
+        """
+        frameworks = list(self.frameworks if frameworks is None else frameworks)
+        reports = {framework: new_report() for framework in frameworks}
+        # control name -> every (framework, category, label) it answers for
+        usages: Dict[str, List[Tuple[str, str, str]]] = {}
+        for framework in frameworks:
+            for category, checks in self.frameworks[framework].items():
+                for label, name in checks.items():
+                    usages.setdefault(name, []).append((framework, category, label))
+
+        for name, result in self.run_controls(frameworks, system_config):
+            for framework, category, label in usages.get(name, ()):
+                record_result(reports[framework], category, label, result)
+        return reports
+
+
+_default_engine = ComplianceEngine()
+
+
+def check_soc2_compliance(system_config):
+    """
+    Check SOC2 compliance controls focusing on security, availability,
+    processing integrity, confidentiality, and privacy
+    """
+    return _default_engine.audit(system_config, ['soc2'])['soc2']
 
 def check_fedramp_compliance(system_config):
     """
     Check FedRAMP compliance controls based on impact level
     """
-    controls = {
-        'access_control': check_fedramp_access_controls(),
-        'audit_logging': check_fedramp_audit_requirements(),
-        'identification': check_identification_auth(),
-        'incident_response': check_incident_response_plan(),
-        'system_integrity': check_system_integrity(),
-    }
-    return evaluate_controls(controls)
+    return _default_engine.audit(system_config, ['fedramp'])['fedramp']
 
 def check_iso_compliance(system_config):
     """
     Check ISO 27001/27002 compliance controls
     """
-    controls = {
-        'information_security': check_information_security_policies(),
-        'asset_management': check_asset_management(),
-        'access_control': check_iso_access_controls(),
-        'cryptography': check_cryptographic_controls(),
-        'operations_security': check_operations_security(),
-    }
-    return evaluate_controls(controls)
+    return _default_engine.audit(system_config, ['iso'])['iso']
 
 def check_pci_compliance(system_config):
     """
     Check PCI DSS compliance controls
     """
-    controls = {
-        'network_security': check_network_security(),
-        'cardholder_data': check_cardholder_data_protection(),
-        'vulnerability_management': check_vulnerability_program(),
-        'access_control': check_pci_access_controls(),
-        'monitoring': check_security_monitoring(),
-        'policy': check_security_policy(),
+    return _default_engine.audit(system_config, ['pci'])['pci']
+
+def new_report():
+    return {
+        'compliant': True,
+        'findings': [],
+        'recommendations': []
     }
-    return evaluate_controls(controls)
+
+def record_result(results, category, check_name, check_result):
+    """
+    Fold one control result into a report, so reports can be built as results arrive
+    """
+    if not check_result['status']:
+        results['compliant'] = False
+        results['findings'].append({
+            'category': category,
+            'control': check_name,
+            'finding': check_result['finding'],
+            'severity': check_result['severity']
+        })
+        results['recommendations'].append(check_result['recommendation'])
 
 def evaluate_controls(controls):
     """
     Evaluate compliance controls and return results
     """
-    results = {
-        'compliant': True,
-        'findings': [],
-        'recommendations': []
-    }
-    
+    results = new_report()
+
     for category, checks in controls.items():
         for check_name, check_result in checks.items():
-            if not check_result['status']:
-                results['compliant'] = False
-                results['findings'].append({
-                    'category': category,
-                    'control': check_name,
-                    'finding': check_result['finding'],
-                    'severity': check_result['severity']
-                })
-                results['recommendations'].append(check_result['recommendation'])
-    
-    return results 
\ No newline at end of file
+            record_result(results, category, check_name, check_result)
+
+    return results
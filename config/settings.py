@@ -8,7 +8,10 @@ AGENT_SETTINGS = {
     'max_reflection_depth': 3,
     'validation_threshold': 0.8,
     'enable_ml': False,
-    'cache_solutions': True
+    'cache_solutions': True,
+    'solution_cache_size': 1024,
+    'solution_cache_ttl': 7 * 24 * 60 * 60,
+    'solution_cache_path': BASE_DIR / 'solution_cache.json',
 }
 
 # Logging settings
@@ -19,16 +22,23 @@ LOGGING = {
         'standard': {
             'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         },
+        'json': {
+            '()': 'devops_agent.logging_config.JSONFormatter',
+        },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'standard',
         },
+        # Rotates at 10 MB and daily, keeping the last 7 files
         'file': {
-            'class': 'logging.FileHandler',
+            'class': 'devops_agent.logging_config.RotatingLogHandler',
             'filename': BASE_DIR / 'logs' / 'agent.log',
-            'formatter': 'standard',
+            'maxBytes': 10 * 1024 * 1024,
+            'interval': 24 * 60 * 60,
+            'backupCount': 7,
+            'formatter': 'json',
         },
     },
     'loggers': {
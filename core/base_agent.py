@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Dict
 
 class BaseAgent(ABC):
     def __init__(self):
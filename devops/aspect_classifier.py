@@ -0,0 +1,151 @@
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .agent import DevOpsAspect
+from .text import stem
+
+# Indicative terms per aspect with relative weights; phrases match consecutive words
+ASPECT_KEYWORDS: Dict[DevOpsAspect, Dict[str, float]] = {
+    DevOpsAspect.INFRASTRUCTURE: {
+        "infrastructure": 2.0, "terraform": 2.0, "server": 1.0, "vm": 1.0, "network": 1.0, "vpc": 1.5,
+        "kubernetes": 1.0, "cluster": 1.0, "provision": 1.5, "cloud": 1.0, "aws": 1.0, "azure": 1.0,
+        "gcp": 1.0, "dns": 1.0, "storage": 1.0, "subnet": 1.5, "iac": 2.0, "node": 1.0, "host": 1.0,
+    },
+    DevOpsAspect.SECURITY: {
+        "security": 2.0, "secure": 1.5, "vulnerability": 2.0, "secret": 2.0, "encryption": 2.0, "encrypt": 2.0,
+        "tls": 1.5, "ssl": 1.5, "certificate": 1.5, "firewall": 1.5, "iam": 1.5, "permission": 1.0,
+        "authentication": 1.5, "authorization": 1.5, "rbac": 1.5, "attack": 1.5, "cve": 2.0, "password": 1.5,
+        "access control": 1.5, "least privilege": 2.0,
+    },
+    DevOpsAspect.AUTOMATION: {
+        "automate": 2.0, "automation": 2.0, "automated": 1.5, "script": 1.5, "ansible": 2.0, "bash": 1.0,
+        "cron": 1.5, "schedule": 1.0, "workflow": 1.0, "manual": 1.0, "repeatable": 1.0, "self-service": 1.0,
+    },
+    DevOpsAspect.MONITORING: {
+        "monitor": 2.0, "monitoring": 2.0, "alert": 2.0, "alerting": 2.0, "prometheus": 2.0, "grafana": 2.0,
+        "metric": 1.5, "dashboard": 1.5, "log": 1.0, "logging": 1.5, "observability": 2.0, "tracing": 1.5,
+        "on-call": 1.5, "slo": 1.5, "sli": 1.5, "health check": 1.5,
+    },
+    DevOpsAspect.PERFORMANCE: {
+        "performance": 2.0, "latency": 2.0, "slow": 1.5, "throughput": 2.0, "optimize": 1.0, "cpu": 1.0,
+        "memory": 1.0, "cache": 1.0, "caching": 1.0, "bottleneck": 2.0, "profiling": 1.5, "response time": 2.0,
+    },
+    DevOpsAspect.SCALABILITY: {
+        "scale": 2.0, "scaling": 2.0, "scalability": 2.0, "autoscaling": 2.0, "autoscale": 2.0, "load": 1.0,
+        "traffic": 1.5, "horizontal": 1.5, "vertical": 1.0, "replica": 1.5, "shard": 1.5, "growth": 1.0,
+        "capacity": 1.5, "load balancer": 1.5,
+    },
+    DevOpsAspect.RELIABILITY: {
+        "reliability": 2.0, "reliable": 1.5, "availability": 2.0, "outage": 2.0, "downtime": 2.0,
+        "failover": 2.0, "backup": 2.0, "restore": 1.5, "disaster recovery": 2.0, "redundancy": 2.0,
+        "rollback": 1.5, "resilience": 2.0, "incident": 1.5, "high availability": 2.0, "uptime": 1.5,
+    },
+    DevOpsAspect.COST_OPTIMIZATION: {
+        "cost": 2.0, "budget": 2.0, "spend": 1.5, "billing": 2.0, "cheaper": 1.5, "expensive": 1.5,
+        "savings": 1.5, "reserved instance": 2.0, "spot": 1.5, "rightsizing": 2.0, "idle": 1.0,
+    },
+    DevOpsAspect.COMPLIANCE: {
+        "compliance": 2.0, "compliant": 2.0, "audit": 2.0, "soc2": 2.0, "fedramp": 2.0, "iso": 1.5,
+        "27001": 2.0, "pci": 2.0, "hipaa": 2.0, "gdpr": 2.0, "regulation": 1.5, "policy": 1.0, "retention": 1.0,
+    },
+    DevOpsAspect.CI_CD: {
+        "ci": 2.0, "cd": 2.0, "ci/cd": 2.0, "pipeline": 2.0, "jenkins": 2.0, "github actions": 2.0,
+        "gitlab": 1.5, "build": 1.5, "deploy": 1.5, "deployment": 1.5, "release": 1.5, "artifact": 1.0,
+        "blue-green": 1.5, "canary": 1.5, "test": 1.0, "continuous integration": 2.0,
+        "continuous delivery": 2.0,
+    },
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9/+_-]*")
+
+
+def _stem_phrase(phrase: str) -> str:
+    return " ".join(stem(word) for word in phrase.lower().split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words and adjacent word pairs, so phrase keywords can match."""
+    words = [stem(token) for token in TOKEN_PATTERN.findall(text.lower())]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class AspectClassifier:
+    """Scores questions against every ``DevOpsAspect`` with one matrix product.
+
+    The keyword table is compiled into a term x aspect weight matrix, with
+    each term's weight scaled by an IDF factor so terms specific to one
+    aspect count more than terms shared by several. Questions become
+    sublinear term-frequency rows, and ``scores`` multiplies the whole
+    batch by the matrix at once.
+    """
+
+    def __init__(self,
+                 keywords: Optional[Dict[DevOpsAspect, Dict[str, float]]] = None,
+                 primary_ratio: float = 0.6,
+                 min_score: float = 0.1):
+        keywords = ASPECT_KEYWORDS if keywords is None else keywords
+        self.aspects = list(keywords)
+        self.primary_ratio = primary_ratio
+        self.min_score = min_score
+
+        terms = sorted({_stem_phrase(term) for table in keywords.values() for term in table})
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        weights = np.zeros((len(terms), len(self.aspects)), dtype=np.float32)
+        for column, aspect in enumerate(self.aspects):
+            for term, weight in keywords[aspect].items():
+                row = self.vocabulary[_stem_phrase(term)]
+                weights[row, column] = max(weights[row, column], weight)
+        document_frequency = np.count_nonzero(weights, axis=1)
+        idf = np.log1p(len(self.aspects) / np.maximum(document_frequency, 1)).astype(np.float32)
+        weights *= idf[:, None]
+        # Unit columns so aspects with long keyword lists are not favoured
+        self.weights = weights / np.maximum(np.linalg.norm(weights, axis=0), 1e-9)
+
+    def vectorize(self, questions: Sequence[str]) -> np.ndarray:
+        """Sublinear term-frequency matrix of the questions over the keyword vocabulary."""
+        rows: List[int] = []
+        columns: List[int] = []
+        for row, question in enumerate(questions):
+            for token in tokenize(question):
+                column = self.vocabulary.get(token)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+        matrix = np.zeros((len(questions), len(self.vocabulary)), dtype=np.float32)
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1.0)
+        np.log1p(matrix, out=matrix)
+        return matrix
+
+    def scores(self, questions: Sequence[str]) -> np.ndarray:
+        """Question x aspect relevance scores."""
+        return self.vectorize(questions) @ self.weights
+
+    def classify_many(self, questions: Sequence[str]) -> List[Dict[str, object]]:
+        """Primary and related aspects with scores for each question.
+
+        Aspects scoring at least ``primary_ratio`` of a question's best score
+        are primary; the rest above ``min_score`` are related. Aspects are
+        listed from highest to lowest score.
+        """
+        scores = self.scores(questions)
+        best = scores.max(axis=1, initial=0.0)
+        relevant = scores >= self.min_score
+        primary = relevant & (scores >= best[:, None] * self.primary_ratio)
+        related = relevant & ~primary
+        order = np.argsort(-scores, axis=1, kind="stable")
+
+        results = []
+        for row in range(len(questions)):
+            ranked = order[row]
+            results.append({
+                "primary_aspects": [self.aspects[column] for column in ranked if primary[row, column]],
+                "related_aspects": [self.aspects[column] for column in ranked if related[row, column]],
+                "aspect_scores": {
+                    self.aspects[column].value: round(float(scores[row, column]), 4)
+                    for column in ranked if relevant[row, column]
+                },
+            })
+        return results
+
@@ -1,38 +1,114 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
 from .agent import DevOpsAspect, Solution
-from ..core.base_agent import BaseAgent
+from .aspect_classifier import AspectClassifier
+from .solution_cache import SolutionCache
+from .solution_generator import SolutionGenerator
+try:
+    from ..core.base_agent import BaseAgent
+except ImportError:
+    # Imported as a top-level package, e.g. by run_agent.py
+    from core.base_agent import BaseAgent
+
+
+def _load_settings() -> Dict[str, Any]:
+    try:
+        from config.settings import AGENT_SETTINGS
+    except ImportError:
+        return {}
+    return AGENT_SETTINGS
+
 
 class DevOpsReflectiveAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.aspects_checklist = {aspect: False for aspect in DevOpsAspect}
+        self.settings = _load_settings() if settings is None else settings
+        self.classifier = AspectClassifier()
+        self.solution_generator = SolutionGenerator()
+        self.solution_cache: Optional[SolutionCache] = None
+        if self.settings.get('cache_solutions'):
+            path = self.settings.get('solution_cache_path')
+            self.solution_cache = SolutionCache(
+                maxsize=self.settings.get('solution_cache_size', 1024),
+                ttl=self.settings.get('solution_cache_ttl'),
+                path=str(path) if path else None
+            )
+
+    def generate_solution(self, question: str) -> Optional[Solution]:
+        """
+        Generate a solution, reusing the cached one for the same or a near-identical question
+        """
+        if self.solution_cache is not None:
+            cached = self.solution_cache.get(question)
+            if cached is not None:
+                self.logger.info("Using cached solution")
+                return cached
+
+        analysis = self.analyze_question(question)
+        solution = self.solution_generator.generate_solution(analysis)
+        if solution is not None and self.solution_cache is not None:
+            self.solution_cache.put(question, solution)
+        return solution
+
+    def explain_solution(self, solution: Optional[Solution]) -> str:
+        if solution is None:
+            return "No solution could be generated."
+        sections = [
+            ("Implementation steps", solution.implementation_steps),
+            ("Considerations", solution.considerations),
+            ("Risks", solution.risks),
+            ("Tools required", solution.tools_required),
+            ("Prerequisites", solution.prerequisites),
+            ("Validation steps", solution.validation_steps),
+        ]
+        lines = [solution.description, f"Estimated effort: {solution.estimated_effort}"]
+        for title, items in sections:
+            if items:
+                lines.append(f"\n{title}:")
+                lines.extend(f"  - {item}" for item in items)
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Persist the solution cache if it has a path."""
+        if self.solution_cache is not None and self.solution_cache.path:
+            self.solution_cache.save()
 
     def analyze_question(self, question: str) -> Dict:
         """
         Break down the question and identify relevant DevOps aspects
         """
-        analysis = {
-            'primary_aspects': [],
-            'related_aspects': [],
-            'constraints': [],
-            'requirements': [],
-            'context': {}
-        }
-        
+        analysis = _new_analysis()
         self._reflect_on_question(question, analysis)
         return analysis
 
+    def analyze_questions(self, questions: Sequence[str]) -> List[Dict]:
+        """
+        Analyze a batch of questions, scoring all of them against every aspect in one matrix operation
+        """
+        analyses = []
+        for classification in self.classifier.classify_many(questions):
+            analysis = _new_analysis()
+            _apply_classification(analysis, classification)
+            analyses.append(analysis)
+        return analyses
+
     def _reflect_on_question(self, question: str, analysis: Dict) -> None:
-        reflection_questions = [
-            "What is the core problem being addressed?",
-            "What are the implicit requirements?",
-            "What constraints might not be explicitly stated?",
-            "What DevOps best practices apply here?",
-            "What could go wrong with potential solutions?",
-            "Are there any compliance or security implications?",
-            "What dependencies need to be considered?",
-            "How will this scale in the future?"
-        ]
-        
-        for reflection in reflection_questions:
-            self._consider_aspect(reflection, analysis) 
\ No newline at end of file
+        _apply_classification(analysis, self.classifier.classify_many([question])[0])
+
+
+def _new_analysis() -> Dict:
+    return {
+        'primary_aspects': [],
+        'related_aspects': [],
+        'constraints': [],
+        'requirements': [],
+        'context': {}
+    }
+
+
+def _apply_classification(analysis: Dict, classification: Dict) -> None:
+    analysis['primary_aspects'] = classification['primary_aspects']
+    analysis['related_aspects'] = classification['related_aspects']
+    analysis['context']['aspect_scores'] = classification['aspect_scores']
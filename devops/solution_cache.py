@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .agent import Solution
+from .text import stem
+
+# MinHash signatures are split into BANDS bands of ROWS values; questions that agree on
+# a whole band become candidates, which is likely above a Jaccard similarity of ~0.5
+BANDS = 16
+ROWS = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(BANDS * ROWS)]
+
+Signature = Tuple[int, ...]
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "to", "of", "in", "on", "for", "and", "or", "is", "are", "be", "my", "our", "we",
+    "i", "me", "it", "this", "that", "with", "do", "does", "can", "how", "what", "should", "please",
+})
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9_.+-]*")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase the question and keep its content words, so trivial rewordings share a key."""
+    return " ".join(stem(token) for token in TOKEN_PATTERN.findall(question.lower()) if token not in STOPWORDS)
+
+
+def minhash(text: str) -> Signature:
+    """MinHash signature of the text's word set; equal positions estimate Jaccard similarity."""
+    hashes = {int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+              for token in set(text.split())} or {0}
+    return tuple(min((a * value + b) % _PRIME for value in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def _bands(signature: Signature) -> List[Tuple[int, Signature]]:
+    return [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+class SolutionCache:
+    """LRU/TTL cache of generated solutions keyed by normalized question text.
+
+    A question that misses the exact key is matched against cached
+    questions sharing at least ``min_similarity`` of their content words
+    (estimated Jaccard similarity, via MinHash with LSH banding). With
+    ``path`` the cache is loaded from and saved to a JSON file.
+    """
+
+    def __init__(self,
+                 maxsize: int = 1024,
+                 ttl: Optional[float] = None,
+                 min_similarity: float = 0.7,
+                 path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.min_similarity = min_similarity
+        self.path = path
+        # normalized question -> (signature, unix time stored, solution)
+        self._entries: "OrderedDict[str, Tuple[Signature, float, Solution]]" = OrderedDict()
+        self._bands: Dict[Tuple[int, Signature], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                self.load()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # A damaged cache only costs regenerating its solutions
+                logger.warning(f"Ignoring unreadable solution cache {path}: {e}")
+                self.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _remove(self, key: str) -> None:
+        signature, _, _ = self._entries.pop(key)
+        for band in _bands(signature):
+            keys = self._bands.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._bands[band]
+
+    def _insert(self, key: str, stored_at: float, solution: Solution) -> None:
+        if key in self._entries:
+            self._remove(key)
+        signature = minhash(key)
+        self._entries[key] = (signature, stored_at, solution)
+        for band in _bands(signature):
+            self._bands.setdefault(band, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def _nearest(self, signature: Signature) -> Optional[str]:
+        best, best_similarity = None, self.min_similarity
+        candidates = set()
+        for band in _bands(signature):
+            candidates.update(self._bands.get(band, ()))
+        for key in candidates:
+            score = similarity(self._entries[key][0], signature)
+            if score >= best_similarity:
+                best, best_similarity = key, score
+        return best
+
+    def get(self, question: str) -> Optional[Solution]:
+        """The cached solution for ``question`` or a near-duplicate of it, if still fresh."""
+        key = normalize_question(question)
+        with self._lock:
+            exact = key in self._entries
+            if not exact:
+                key = self._nearest(minhash(key))
+            if key is None or self._expired(self._entries[key][1]):
+                if key is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if exact:
+                self.hits += 1
+            else:
+                self.near_hits += 1
+            return self._entries[key][2]
+
+    def put(self, question: str, solution: Solution) -> None:
+        key = normalize_question(question)
+        with self._lock:
+            self._insert(key, time.time(), solution)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write fresh entries to ``path`` (default: the cache's own), oldest first."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the solution cache to")
+        with self._lock:
+            entries = [
+                {"question": key, "stored_at": stored_at, "solution": asdict(solution)}
+                for key, (_, stored_at, solution) in self._entries.items()
+                if not self._expired(stored_at)
+            ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Optional[str] = None) -> None:
+        """Add the fresh entries saved at ``path`` (default: the cache's own)."""
+        with open(path or self.path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)["entries"]
+        with self._lock:
+            for entry in entries:
+                if not self._expired(entry["stored_at"]):
+                    self._insert(entry["question"], entry["stored_at"], Solution(**entry["solution"]))
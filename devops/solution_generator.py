@@ -1,3 +1,4 @@
+from typing import Dict, List, Sequence
 from .agent import Solution
 from .validators import DevOpsValidator
 
@@ -9,6 +10,13 @@ class SolutionGenerator:
         initial_solution = self._create_initial_solution(analysis)
         return self._validate_and_enhance_solution(initial_solution, analysis)
 
+    def rank_solutions(self, candidates: Sequence[Solution]) -> List[Solution]:
+        """Order candidate solutions by how few validation findings they have, best first."""
+        findings = self.validator.validate_many(candidates)
+        counts = [len(result["security"]) + len(result["reliability"]) for result in findings]
+        order = sorted(range(len(candidates)), key=counts.__getitem__)
+        return [candidates[index] for index in order]
+
     def _create_initial_solution(self, analysis: Dict) -> Solution:
         # Implementation details...
         pass
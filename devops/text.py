@@ -0,0 +1,3 @@
+def stem(token: str) -> str:
+    """Strip a plural ``s``, so "logs" and "log" match; "access" and "status" keep theirs."""
+    return token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us")) else token
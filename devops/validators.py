@@ -1,42 +1,105 @@
-from typing import List
+import re
+from typing import Dict, Iterable, List, Sequence, Set
 from .agent import Solution
 
+
+class PhraseMatcher:
+    """Finds which of many phrases occur in a text with a single regex scan.
+
+    Matching is case-insensitive substring matching, like ``phrase.lower() in
+    text.lower()`` for every phrase. The text is lowercased once and scanned
+    by one alternation of all phrases, longest first. A match also implies
+    every phrase it contains, and the scan only steps back inside a match
+    when another phrase could overlap its end.
+    """
+
+    def __init__(self, phrases: Sequence[str]):
+        self.phrases = list(phrases)
+        lowered = [phrase.lower() for phrase in self.phrases]
+        unique = list(dict.fromkeys(lowered))
+        self._implied = {
+            phrase: {index for index, candidate in enumerate(lowered) if candidate in phrase}
+            for phrase in unique
+        }
+        # A suffix of this phrase is a prefix of another, so that one may start inside a match
+        self._overlaps = {
+            phrase: any(other.startswith(phrase[offset:])
+                        for other in unique for offset in range(1, len(phrase)))
+            for phrase in unique
+        }
+        alternatives = sorted(unique, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(phrase) for phrase in alternatives))
+
+    def found(self, text: str) -> Set[int]:
+        """Indexes of the phrases that occur in ``text``."""
+        text = text.lower()
+        found: Set[int] = set()
+        position = 0
+        search = self._pattern.search
+        while len(found) < len(self.phrases):
+            match = search(text, position)
+            if match is None:
+                break
+            phrase = match.group()
+            found |= self._implied[phrase]
+            position = match.start() + 1 if self._overlaps[phrase] else match.end()
+        return found
+
+
 class DevOpsValidator:
-    @staticmethod
-    def validate_security(solution: Solution) -> List[str]:
-        security_checks = [
-            "Authentication mechanisms",
-            "Authorization controls",
-            "Data encryption",
-            "Network security",
-            "Secret management",
-            "Compliance requirements",
-            "Security scanning",
-            "Vulnerability management"
-        ]
-        
-        findings = []
-        for check in security_checks:
-            if not any(check.lower() in step.lower() for step in solution.implementation_steps):
-                findings.append(f"Missing {check} consideration")
-        
-        return findings
-
-    @staticmethod
-    def validate_reliability(solution: Solution) -> List[str]:
-        reliability_checks = [
-            "High availability",
-            "Disaster recovery",
-            "Backup strategies",
-            "Failover mechanisms",
-            "Load balancing",
-            "Circuit breakers",
-            "Rate limiting"
-        ]
-        
-        findings = []
-        for check in reliability_checks:
-            if not any(check.lower() in step.lower() for step in solution.implementation_steps):
-                findings.append(f"Consider adding {check}")
-        
-        return findings 
\ No newline at end of file
+    SECURITY_CHECKS = [
+        "Authentication mechanisms",
+        "Authorization controls",
+        "Data encryption",
+        "Network security",
+        "Secret management",
+        "Compliance requirements",
+        "Security scanning",
+        "Vulnerability management"
+    ]
+
+    RELIABILITY_CHECKS = [
+        "High availability",
+        "Disaster recovery",
+        "Backup strategies",
+        "Failover mechanisms",
+        "Load balancing",
+        "Circuit breakers",
+        "Rate limiting"
+    ]
+
+    # Both check lists compiled once; security phrases first, then reliability
+    _matcher = PhraseMatcher(SECURITY_CHECKS + RELIABILITY_CHECKS)
+
+    @classmethod
+    def _covered(cls, solution: Solution) -> Set[int]:
+        # Steps are joined with a newline, which no phrase contains, so matches stay within a step
+        return cls._matcher.found("\n".join(solution.implementation_steps))
+
+    @classmethod
+    def _findings(cls, covered: Set[int]) -> Dict[str, List[str]]:
+        offset = len(cls.SECURITY_CHECKS)
+        return {
+            "security": [f"Missing {check} consideration"
+                         for index, check in enumerate(cls.SECURITY_CHECKS) if index not in covered],
+            "reliability": [f"Consider adding {check}"
+                            for index, check in enumerate(cls.RELIABILITY_CHECKS) if index + offset not in covered],
+        }
+
+    @classmethod
+    def validate_security(cls, solution: Solution) -> List[str]:
+        return cls._findings(cls._covered(solution))["security"]
+
+    @classmethod
+    def validate_reliability(cls, solution: Solution) -> List[str]:
+        return cls._findings(cls._covered(solution))["reliability"]
+
+    @classmethod
+    def validate(cls, solution: Solution) -> Dict[str, List[str]]:
+        """Security and reliability findings from one scan of the implementation steps."""
+        return cls._findings(cls._covered(solution))
+
+    @classmethod
+    def validate_many(cls, solutions: Iterable[Solution]) -> List[Dict[str, List[str]]]:
+        """``validate`` for each solution, in order."""
+        return [cls._findings(cls._covered(solution)) for solution in solutions]
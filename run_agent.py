@@ -21,6 +21,12 @@ def run_agent():
     print("\n🤖 DevOps AI Agent Ready!")
     print("Type 'exit' to quit\n")
     
+    try:
+        _question_loop(agent, logger)
+    finally:
+        agent.close()
+
+def _question_loop(agent, logger):
     while True:
         try:
             # Get user input
@@ -30,10 +36,7 @@ def run_agent():
                 print("\n👋 Goodbye!")
                 break
                 
-            # Generate and display solution
-            logger.info("Analyzing question...")
-            analysis = agent.analyze_question(question)
-            
+            # Generate and display solution; repeated questions are answered from the solution cache
             logger.info("Generating solution...")
             solution = agent.generate_solution(question)
             
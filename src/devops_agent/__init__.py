@@ -1,11 +1,14 @@
 from .agent import DevOpsAutomationAgent, ScriptType
 from .auth import AuthManager
-from .exceptions import ValidationError, AuthenticationError
+from . import catalog  # registers the "catalog" storage backend
+from .exceptions import ValidationError, AuthenticationError, ExecutionError, ConflictError
 
 __all__ = [
     'DevOpsAutomationAgent',
     'ScriptType',
     'AuthManager',
     'ValidationError',
-    'AuthenticationError'
+    'AuthenticationError',
+    'ExecutionError',
+    'ConflictError'
 ] 
\ No newline at end of file
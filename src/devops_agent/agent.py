@@ -1,15 +1,35 @@
 from __future__ import annotations
 import json
-import os
+from collections.abc import Mapping
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterable, Iterator, List, Optional, Any, TextIO, Tuple, Union
 from enum import Enum
 import hashlib
-from pathlib import Path
+import itertools
 import subprocess
 import logging
-from .exceptions import ValidationError, AuthenticationError
+import asyncio
+import atexit
+import threading
+import time
+import uuid
+from .exceptions import ValidationError, AuthenticationError, ConflictError
 from .auth import AuthManager
+from .search_index import SearchIndex
+from .code_cache import CodeCache
+from .validation import ScriptValidator
+from .result_cache import ResultCache, params_key
+from .execution import ExecutionEngine
+from .fanout import FanOut, LocalTransport, Transport
+from .scheduler import CronTrigger, IntervalTrigger, Schedule, Scheduler
+from .streaming import AsyncOutputStream, OutputStream
+from .versions import VersionStore
+from .storage import StorageBackend, create_backend
+from .records import AutomationRecord, as_automation
+from .metrics import MetricsRegistry, SamplingProfiler
+from .logging_config import configure_logging
 
 class ScriptType(Enum):
     BASH = "bash"
@@ -17,66 +37,451 @@ class ScriptType(Enum):
     POWERSHELL = "powershell"
 
 class DevOpsAutomationAgent:
-    def __init__(self, storage_path: str = "automations_db.json", auth_required: bool = True):
+    def __init__(self,
+                 storage_path: str = "automations_db.json",
+                 auth_required: bool = True,
+                 storage_backend: Union[str, StorageBackend] = "json",
+                 usage_flush_interval: float = 30.0,
+                 usage_flush_threshold: int = 100,
+                 code_cache_size: int = 256,
+                 max_workers: int = 8,
+                 process_workers: int = 0,
+                 max_concurrency: Optional[int] = None,
+                 max_concurrency_per_user: Optional[int] = None,
+                 default_timeout: Optional[float] = None,
+                 worker_max_runs: int = 100,
+                 worker_max_memory_mb: Optional[int] = None,
+                 refresh_interval: Optional[float] = None,
+                 validation_cache_size: int = 65536,
+                 result_cache_size: int = 1024,
+                 logging_config: Optional[Dict[str, Any]] = None):
         self.storage_path = storage_path
+        self.metrics = MetricsRegistry()
+        self._profiler: Optional[SamplingProfiler] = None
+        if isinstance(storage_backend, str):
+            storage_backend = create_backend(storage_backend, storage_path)
+        self.storage = storage_backend
         self.auth_manager = AuthManager()
         self.auth_required = auth_required
+        self.code_cache = CodeCache(maxsize=code_cache_size)
+        self.validator = ScriptValidator(cache_size=validation_cache_size, max_workers=max_workers,
+                                         code_cache=self.code_cache)
+        self.result_cache = ResultCache(maxsize=result_cache_size)
+        self.default_timeout = default_timeout
+        self._engine_settings = {
+            "max_workers": max_workers,
+            "process_workers": process_workers,
+            "max_concurrency": max_concurrency,
+            "max_per_user": max_concurrency_per_user,
+            "worker_max_runs": worker_max_runs,
+            "worker_max_memory_mb": worker_max_memory_mb,
+        }
+        self._engine: Optional[ExecutionEngine] = None
+        self._engine_lock = threading.Lock()
+        self._scheduler: Optional[Scheduler] = None
+        self._scheduler_lock = threading.Lock()
+        self._usage_lock = threading.RLock()
+        self._id_lock = threading.Lock()
+        self.refresh_interval = refresh_interval
+        self._last_refresh = time.monotonic()
         self.automations_db = self._load_database()
-        self._setup_logging()
-
-    def _setup_logging(self) -> None:
-        """Set up logging configuration."""
-        logging.basicConfig(
-            filename='devops_agent.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        self.versions = VersionStore(self.automations_db, self.storage, self._live_script)
+        self.search_index = self.storage.load_search_index()
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            self.search_index.build(self.automations_db["automations"])
+        self.usage_flush_interval = usage_flush_interval
+        self.usage_flush_threshold = usage_flush_threshold
+        self._dirty_usage: Dict[int, int] = {}
+        self._usage_events = 0
+        self._last_usage_flush = time.monotonic()
+        self._setup_logging(logging_config)
+        self._register_metrics()
+        atexit.register(self.close)
+
+    def _setup_logging(self, logging_config: Optional[Dict[str, Any]] = None) -> None:
+        """Set up logging configuration.
+
+        ``logging_config`` is a ``dictConfig`` dict; by default
+        ``config.settings.LOGGING`` is used when importable. Handlers write
+        from a background thread, so logging never waits on disk.
+        """
+        configure_logging(logging_config)
         self.logger = logging.getLogger(__name__)
 
+    def _register_metrics(self) -> None:
+        """Export the counters other components keep themselves, read at scrape time."""
+        caches = {
+            "result": self.result_cache,
+            "code": self.code_cache,
+            "validation": self.validator,
+        }
+
+        def cache_samples(field: str) -> List[Tuple[Dict[str, str], float]]:
+            samples = [({"cache": name}, getattr(cache, field)) for name, cache in caches.items()]
+            samples.append(({"cache": "auth"}, getattr(self.auth_manager, f"cache_{field}")))
+            return samples
+
+        self.metrics.register_callback("cache_hits_total", "counter", "Lookups answered from a cache",
+                                       lambda: cache_samples("hits"))
+        self.metrics.register_callback("cache_misses_total", "counter", "Lookups that missed a cache",
+                                       lambda: cache_samples("misses"))
+        self.metrics.register_callback("result_cache_coalesced_total", "counter",
+                                       "Executions that waited for an identical run in flight",
+                                       lambda: [({}, self.result_cache.coalesced)])
+        self.metrics.register_callback("storage_bytes_written_total", "counter",
+                                       "Bytes written by the storage backend",
+                                       lambda: [({"backend": type(self.storage).__name__}, self.storage.bytes_written)])
+        self.metrics.register_callback("automations", "gauge", "Automations in the catalog",
+                                       lambda: [({}, len(self._automations_by_id))])
+        self.metrics.register_callback(
+            "scheduled_runs_total", "counter", "Scheduled runs by outcome, including skipped and misfired ones",
+            lambda: [({"outcome": outcome}, count) for outcome, count in self._scheduler.counts.items()]
+            if self._scheduler is not None else []
+        )
+        self.metrics.register_callback("schedules", "gauge", "Registered schedules",
+                                       lambda: [({}, len(self._scheduler) if self._scheduler is not None else 0)])
+
+    def stats(self) -> Dict[str, Any]:
+        """In-process snapshot of all metrics: span latencies, executions, cache hits and bytes written."""
+        return self.metrics.stats()
+
+    def render_metrics(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return self.metrics.render()
+
+    def start_metrics_server(self, port: int = 9464, host: str = "127.0.0.1"):
+        """Serve ``/metrics`` for Prometheus to scrape; call ``shutdown()`` on the result to stop."""
+        return self.metrics.serve(port, host)
+
+    def start_profiler(self, interval: float = 0.005) -> SamplingProfiler:
+        """Start sampling the stacks of the agent's threads until ``stop_profiler`` is called."""
+        if self._profiler is None:
+            self._profiler = SamplingProfiler(interval=interval)
+            self._profiler.start()
+        return self._profiler
+
+    def stop_profiler(self) -> Dict[str, int]:
+        """Stop the profiler and return its samples as folded stacks for a flame graph."""
+        if self._profiler is None:
+            return {}
+        profiler, self._profiler = self._profiler, None
+        return profiler.stop()
+
+    def _hash_script(self, script: str) -> str:
+        with self.metrics.span("hash"):
+            return hashlib.sha256(script.encode()).hexdigest()
+
     def _load_database(self) -> Dict[str, Any]:
-        """Load existing automations from JSON file or create new database."""
-        if os.path.exists(self.storage_path):
-            try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {"automations": [], "versions": {}}
-        return {"automations": [], "versions": {}}
+        """Load existing automations from the storage backend and index them by id.
+
+        ``db["automations"]`` is a live view of the records by id.
+        """
+        with self.metrics.span("load"), self.storage.lock():
+            db = self.storage.load()
+        if isinstance(db["automations"], Mapping):
+            # Lazy backends hand out their own table and keep next_id up to date
+            self._automations_by_id = db["automations"]
+            db.setdefault("next_id", 1)
+        else:
+            self._automations_by_id = {automation["id"]: as_automation(automation)
+                                       for automation in db["automations"]}
+            highest_id = max(self._automations_by_id, default=0)
+            db["next_id"] = max(db.get("next_id", 1), highest_id + 1)
+        db["automations"] = self._automations_by_id.values()
+        return db
+
+    def _live_script(self, automation_id: int) -> Optional[str]:
+        automation = self._automations_by_id.get(automation_id)
+        return automation["script"] if automation is not None else None
+
+    def _allocate_id(self) -> int:
+        """Hand out the next automation id; ids are never reused."""
+        with self._id_lock:
+            automation_id = self.automations_db["next_id"]
+            self.automations_db["next_id"] = automation_id + 1
+            return automation_id
 
     def _save_database(self) -> None:
-        """Save automations to JSON file."""
-        with open(self.storage_path, 'w', encoding='utf-8') as f:
-            json.dump(self.automations_db, f, indent=2)
-
-    def _validate_script(self, script: str, script_type: ScriptType) -> bool:
-        """Basic validation of scripts."""
-        if not script.strip():
-            raise ValidationError("Script cannot be empty")
-        
-        if script_type == ScriptType.PYTHON:
-            try:
-                compile(script, '<string>', 'exec')
-            except SyntaxError as e:
-                raise ValidationError(f"Invalid Python syntax: {str(e)}")
-        
+        """Write a full snapshot of the database to the storage backend."""
+        with self.storage.lock():
+            self._pull_changes()
+            with self._saving():
+                self.storage.save_snapshot(self.automations_db)
+
+    def refresh(self) -> int:
+        """Pick up automations that other processes sharing the storage have written.
+
+        Returns how many automation records changed.
+        """
+        with self.storage.lock():
+            return self._pull_changes()
+
+    def _maybe_refresh(self) -> None:
+        if (self.refresh_interval is not None and
+                time.monotonic() - self._last_refresh >= self.refresh_interval):
+            self.refresh()
+
+    def _pull_changes(self) -> int:
+        """Merge records changed by other processes into memory; the storage lock must be held.
+
+        Records are updated in place so references handed out earlier stay
+        current, and usage counted here but not yet flushed is re-applied.
+        """
+        merged = 0
+        with self._usage_lock:
+            for record in self.storage.refresh(self.automations_db):
+                record = as_automation(record)
+                automation_id = record["id"]
+                pending = self._dirty_usage.get(automation_id, 0)
+                automation = self._automations_by_id.get(automation_id)
+                if automation is None:
+                    automation = record
+                    self._automations_by_id[automation_id] = automation
+                elif automation is not record:
+                    # A lazily loaded table may already hold the record it returned
+                    if not pending and automation == record:
+                        continue
+                    automation.assign(record)
+                automation["times_used"] += pending
+                self.search_index.add(automation)
+                self.automations_db["next_id"] = max(self.automations_db["next_id"], automation_id + 1)
+                merged += 1
+        self._last_refresh = time.monotonic()
+        return merged
+
+    def flush_usage(self) -> None:
+        """Persist accumulated times_used counters in one batch.
+
+        Counters are merged with uses other processes flushed in the meantime.
+        """
+        if self._dirty_usage:
+            with self.storage.lock(), self._usage_lock:
+                self._pull_changes()
+                automations = [self._automations_by_id[automation_id] for automation_id in self._dirty_usage]
+                with self._saving(automations):
+                    self.storage.save_automations(self.automations_db, automations)
+        with self._usage_lock:
+            self._usage_events = 0
+            self._last_usage_flush = time.monotonic()
+
+    @contextmanager
+    def _saving(self, automations: Iterable[Dict[str, Any]] = ()) -> Iterator[None]:
+        """Span around a storage write of ``automations``, with the storage lock already held.
+
+        Counters are not bumped meanwhile, so a compaction never drops a
+        record from memory while a use is being counted on it. Once the
+        write succeeds, the uses it persisted are no longer pending: the
+        stored counter already includes them, and re-applying them on the
+        next refresh would count them twice.
+        """
+        with self._usage_lock, self.metrics.span("save"):
+            snapshots = self.storage.snapshots_written
+            yield
+            if self.storage.snapshots_written != snapshots:
+                self._dirty_usage.clear()
+            else:
+                for automation in automations:
+                    self._dirty_usage.pop(automation["id"], None)
+
+    def _record_usage(self, automation_id: int) -> None:
+        """Count a use in memory and flush once the threshold or interval is reached."""
+        with self._usage_lock:
+            self._automations_by_id[automation_id]["times_used"] += 1
+            self._dirty_usage[automation_id] = self._dirty_usage.get(automation_id, 0) + 1
+            self._usage_events += 1
+            due = (self._usage_events >= self.usage_flush_threshold or
+                   time.monotonic() - self._last_usage_flush >= self.usage_flush_interval)
+        if due:
+            # Outside the usage lock: the storage lock is always taken first
+            self.flush_usage()
+
+    @property
+    def engine(self) -> ExecutionEngine:
+        """Worker pools for concurrent execution, created on first use."""
+        with self._engine_lock:
+            if self._engine is None:
+                self._engine = ExecutionEngine(**self._engine_settings)
+            return self._engine
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """Timer for recurring runs, started on first use."""
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = Scheduler(self._dispatch_scheduled)
+                self._scheduler.start()
+            return self._scheduler
+
+    def close(self) -> None:
+        """Stop the scheduler and worker pools, flush pending usage counters and release the storage backend."""
+        atexit.unregister(self.close)
+        if self._scheduler is not None:
+            self._scheduler.stop()
+            self._scheduler = None
+        if self._engine is not None:
+            self._engine.shutdown()
+            self._engine = None
+        self.flush_usage()
+        if self.storage.should_compact_on_close():
+            self._save_database()
+        self.storage.close()
+
+    def __enter__(self) -> DevOpsAutomationAgent:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _validate_script(self,
+                         script: str,
+                         script_type: ScriptType,
+                         script_hash: Optional[str] = None) -> bool:
+        """Syntax-check a script, reusing the verdict for a script hash seen before.
+
+        A successfully compiled Python script is kept in the code cache so its
+        first execution skips compilation.
+        """
+        with self.metrics.span("validate"):
+            error = self.validator.check(script, script_type.value, script_hash)
+        if error is not None:
+            raise ValidationError(error)
         return True
 
+    def revalidate(self, chunk_size: int = 1000) -> List[Dict[str, Any]]:
+        """Re-check every automation without cached verdicts, e.g. after an interpreter upgrade.
+
+        Returns ``{"automation_id", "error"}`` for each automation that no
+        longer validates.
+        """
+        self.validator.clear()
+        automations = self._scan()
+        checked = 0
+        failures = []
+        while True:
+            chunk = list(itertools.islice(automations, chunk_size))
+            if not chunk:
+                break
+            checked += len(chunk)
+            verdicts = self.validator.check_many(
+                (self._peek_script(automation), automation["script_type"], automation["script_hash"])
+                for automation in chunk
+            )
+            failures.extend({"automation_id": automation["id"], "error": error}
+                            for automation, error in zip(chunk, verdicts) if error is not None)
+        self.logger.info(f"Revalidated {checked} automations, {len(failures)} failed")
+        return failures
+
     def add_automation(self, 
                       question: str, 
                       script: str, 
                       tags: List[str], 
                       script_type: ScriptType,
-                      user_id: str) -> Dict[str, Any]:
-        """Add new automation script with associated question and tags."""
-        if self.auth_required and not self.auth_manager.is_authorized(user_id):
-            raise AuthenticationError("User not authorized")
+                      user_id: str,
+                      timeout: Optional[float] = None,
+                      cache_ttl: Optional[float] = None) -> Dict[str, Any]:
+        """Add new automation script with associated question and tags.
 
-        self._validate_script(script, script_type)
-        
-        script_hash = hashlib.sha256(script.encode()).hexdigest()
-        
-        automation = {
-            "id": len(self.automations_db["automations"]) + 1,
+        ``timeout`` caps each execution of this automation in seconds and
+        overrides the agent's ``default_timeout``. Python automations can only
+        be interrupted when they run in worker processes.
+
+        ``cache_ttl`` marks a side-effect-free automation as cacheable: for
+        that many seconds, runs with the same params reuse its last
+        successful result.
+        """
+        self._check_authorized(user_id)
+
+        script_hash = self._hash_script(script)
+        self._validate_script(script, script_type, script_hash)
+        with self.storage.lock():
+            self._pull_changes()
+            automation, version = self._register_automation(
+                question, script, tags, script_type, user_id, script_hash, timeout, cache_ttl
+            )
+            try:
+                with self._saving([automation]):
+                    self.storage.save_batch(self.automations_db, [automation], [(automation["id"], version)])
+            except Exception:
+                self._unregister_automations([automation])
+                raise
+        self.logger.info(f"New automation added: ID {automation['id']}")
+        return automation.to_dict()
+
+    def update_script(self,
+                      automation_id: int,
+                      script: str,
+                      user_id: str,
+                      expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """Replace an automation's script, recording the previous one as a version.
+
+        Pass the ``version`` the edit was based on as ``expected_version`` to
+        raise ``ConflictError`` instead of overwriting a newer script saved
+        meanwhile, possibly by another process.
+        """
+        self._check_authorized(user_id)
+        automation = self._lookup(automation_id)
+        if not automation:
+            raise ValueError(f"Automation with ID {automation_id} not found")
+
+        script_hash = self._hash_script(script)
+        self._validate_script(script, ScriptType(automation["script_type"]), script_hash)
+
+        with self.storage.lock():
+            self._pull_changes()
+            if expected_version is not None and automation["version"] != expected_version:
+                raise ConflictError(
+                    f"Automation {automation_id} is at version {automation['version']}, "
+                    f"expected {expected_version}"
+                )
+            if script_hash == automation["script_hash"]:
+                return automation.to_dict()
+
+            old_hash = automation["script_hash"]
+            version = self.versions.supersede(
+                automation_id, automation["script"], old_hash, script, script_hash, user_id
+            )
+            automation["script"] = script
+            automation["script_hash"] = script_hash
+            automation["version"] = version["version"]
+            with self._saving([automation]):
+                self.storage.save_batch(self.automations_db, [automation], [(automation_id, version)],
+                                        blobs=[old_hash])
+        self.logger.info(f"Automation {automation_id} updated to version {version['version']}")
+        return automation.to_dict()
+
+    def set_cache_ttl(self, automation_id: int, cache_ttl: Optional[float], user_id: str) -> Dict[str, Any]:
+        """Mark an automation as cacheable for ``cache_ttl`` seconds, or not at all with None."""
+        self._check_authorized(user_id)
+        with self.storage.lock():
+            self._pull_changes()
+            automation = self._automations_by_id.get(automation_id)
+            if not automation:
+                raise ValueError(f"Automation with ID {automation_id} not found")
+            if cache_ttl is None:
+                automation.pop("cache_ttl", None)
+            else:
+                automation["cache_ttl"] = cache_ttl
+            with self._saving([automation]):
+                self.storage.save_automation(self.automations_db, automation)
+        return automation.to_dict()
+
+    def get_versions(self, automation_id: int) -> List[Dict[str, Any]]:
+        """Full version history of an automation, oldest first, including script text."""
+        return self.versions.history(automation_id)
+
+    def _register_automation(self,
+                             question: str,
+                             script: str,
+                             tags: List[str],
+                             script_type: ScriptType,
+                             user_id: str,
+                             script_hash: str,
+                             timeout: Optional[float] = None,
+                             cache_ttl: Optional[float] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Create a validated automation and its first version in memory."""
+        automation = AutomationRecord({
+            "id": self._allocate_id(),
             "question": question,
             "script": script,
             "script_type": script_type.value,
@@ -86,64 +491,449 @@ class DevOpsAutomationAgent:
             "times_used": 0,
             "version": 1,
             "script_hash": script_hash
-        }
+        })
+        if timeout is not None:
+            automation["timeout"] = timeout
+        if cache_ttl is not None:
+            automation["cache_ttl"] = cache_ttl
         
-        self.automations_db["automations"].append(automation)
-        self.automations_db["versions"][str(automation["id"])] = [{
-            "version": 1,
+        self._automations_by_id[automation["id"]] = automation
+        try:
+            self.search_index.add(automation)
+            version = self.versions.add(automation["id"], script_hash, user_id)
+        except Exception:
+            self._unregister_automations([automation])
+            raise
+        return automation, version
+
+    def _unregister_automations(self, automations: List[Dict[str, Any]]) -> None:
+        """Undo ``_register_automation`` for automations whose save failed."""
+        for automation in automations:
+            automation_id = automation["id"]
+            self._automations_by_id.pop(automation_id, None)
+            self.search_index.remove(automation_id)
+            self.automations_db["versions"].pop(str(automation_id), None)
+            if self.automations_db["blobs"].get(automation["script_hash"]) == {"live": automation_id}:
+                del self.automations_db["blobs"][automation["script_hash"]]
+
+    def _prepare_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn one bulk record into the arguments for ``_register_automation``, unvalidated.
+
+        Raises ``TypeError`` for fields of the wrong type.
+        """
+        for field in ("question", "script"):
+            if not isinstance(record[field], str):
+                raise TypeError(f"Field {field} must be a string")
+        tags = record.get("tags", [])
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            raise TypeError("Field tags must be a list of strings")
+        for field in ("timeout", "cache_ttl"):
+            value = record.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise TypeError(f"Field {field} must be a number")
+        script = record["script"]
+        script_type = ScriptType(record["script_type"])
+        script_hash = self._hash_script(script)
+        return {
+            "question": record["question"],
             "script": script,
+            "tags": list(tags),
+            "script_type": script_type,
             "script_hash": script_hash,
-            "modified_at": datetime.now().isoformat(),
-            "modified_by": user_id
-        }]
-        
-        self._save_database()
-        self.logger.info(f"New automation added: ID {automation['id']}")
+            "timeout": record.get("timeout"),
+            "cache_ttl": record.get("cache_ttl"),
+        }
+
+    def add_automations_bulk(self, records: Iterable[Dict[str, Any]], user_id: str) -> Dict[str, Any]:
+        """Add many automations with one storage write.
+
+        Each record holds ``question``, ``script``, ``script_type`` and
+        optionally ``tags``, ``timeout`` and ``cache_ttl``. Scripts are syntax-checked
+        concurrently; invalid records are reported under ``errors`` by
+        position without stopping the rest of the batch.
+        """
+        added, errors = self._add_records(records, user_id)
+        return {"added": [automation.to_dict() for automation in added], "errors": errors}
+
+    def _add_records(self,
+                     records: Iterable[Dict[str, Any]],
+                     user_id: str) -> Tuple[List[AutomationRecord], List[Dict[str, Any]]]:
+        """``add_automations_bulk`` returning the stored records themselves rather than copies."""
+        self._check_authorized(user_id)
+
+        prepared: List[Tuple[int, Dict[str, Any]]] = []
+        errors: List[Dict[str, Any]] = []
+        for index, record in enumerate(records):
+            try:
+                prepared.append((index, self._prepare_record(record)))
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                message = f"Missing field {e}" if isinstance(e, KeyError) else str(e)
+                errors.append({"index": index, "error": message})
+
+        with self.metrics.span("validate"):
+            verdicts = self.validator.check_many(
+                (outcome["script"], outcome["script_type"].value, outcome["script_hash"]) for _, outcome in prepared
+            )
+        valid = []
+        for (index, outcome), error in zip(prepared, verdicts):
+            if error is not None:
+                errors.append({"index": index, "error": error})
+            else:
+                valid.append(outcome)
+        errors.sort(key=lambda error: error["index"])
+
+        added: List[AutomationRecord] = []
+        versions: List[Tuple[int, Dict[str, Any]]] = []
+        with self.storage.lock():
+            self._pull_changes()
+            try:
+                for outcome in valid:
+                    automation, version = self._register_automation(user_id=user_id, **outcome)
+                    added.append(automation)
+                    versions.append((automation["id"], version))
+
+                with self._saving(added):
+                    self.storage.save_batch(self.automations_db, added, versions)
+            except Exception:
+                # Nothing of the batch was stored, so none of it may stay in memory either
+                self._unregister_automations(added)
+                raise
+        self.logger.info(f"Bulk import added {len(added)} automations, rejected {len(errors)}")
+        return added, errors
+
+    def import_ndjson(self, source: Union[str, TextIO], user_id: str, batch_size: int = 1000) -> Dict[str, Any]:
+        """Stream automations from a newline-delimited JSON file or file object.
+
+        Lines are read and added ``batch_size`` at a time. Errors carry the
+        1-based line number. Ids are always newly allocated.
+        """
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as f:
+                return self.import_ndjson(f, user_id, batch_size)
+
+        added = 0
+        errors: List[Dict[str, Any]] = []
+        batch: List[Dict[str, Any]] = []
+        line_numbers: List[int] = []
+
+        def flush() -> None:
+            nonlocal added
+            batch_added, batch_errors = self._add_records(batch, user_id)
+            added += len(batch_added)
+            errors.extend({"line": line_numbers[error["index"]], "error": error["error"]}
+                          for error in batch_errors)
+            batch.clear()
+            line_numbers.clear()
+
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                batch.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                errors.append({"line": line_number, "error": f"Invalid JSON: {e}"})
+                continue
+            line_numbers.append(line_number)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        return {"added": added, "errors": errors}
+
+    @staticmethod
+    def _peek_script(automation: AutomationRecord) -> str:
+        """Script of an automation without keeping a lazily loaded body in memory."""
+        return automation.peek("script")
+
+    def _scan(self) -> Iterator[AutomationRecord]:
+        """Every stored record, without keeping ones a lazy table reads from disk in memory."""
+        table = self._automations_by_id
+        # Lazy tables can read a record without caching it; a plain dict holds them all anyway
+        peek = getattr(table, "peek", table.get)
+        for automation_id in list(table):
+            automation = peek(automation_id)
+            if automation is not None:
+                yield automation
+
+    def iter_automations(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over copies of every automation without counting usage."""
+        return (automation.to_dict() for automation in self._scan())
+
+    def export_ndjson(self, destination: Union[str, TextIO]) -> int:
+        """Write one JSON line per automation and return how many were written."""
+        if isinstance(destination, str):
+            with open(destination, 'w', encoding='utf-8') as f:
+                return self.export_ndjson(f)
+
+        count = 0
+        for automation in self.iter_automations():
+            destination.write(json.dumps(automation) + "\n")
+            count += 1
+        return count
+
+    def search_automation(self,
+                          query: str,
+                          tags: Optional[List[str]] = None,
+                          limit: Optional[int] = None,
+                          offset: int = 0) -> List[Dict[str, Any]]:
+        """Search for automations based on question or tags, most relevant first."""
+        self._maybe_refresh()
+        with self.metrics.span("search"):
+            ranked = self.search_index.search(query, tags=tags, limit=limit, offset=offset)
+            return [self._automations_by_id[automation_id].to_dict() for automation_id, _ in ranked]
+
+    def get_automation(self, automation_id: int, count_usage: bool = True) -> Optional[Dict[str, Any]]:
+        """Retrieve specific automation by ID.
+
+        Pass ``count_usage=False`` for previews and listings that should not
+        bump ``times_used``. Returns a copy; changing it does not change the
+        automation.
+        """
+        automation = self._lookup(automation_id, count_usage)
+        return automation.to_dict() if automation is not None else None
+
+    def _lookup(self, automation_id: int, count_usage: bool = False) -> Optional[AutomationRecord]:
+        """The stored record behind ``get_automation``, not a copy."""
+        self._maybe_refresh()
+        with self.metrics.span("lookup"):
+            automation = self._automations_by_id.get(automation_id)
+        if automation is not None and count_usage:
+            self._record_usage(automation_id)
         return automation
 
-    def search_automation(self, query: str) -> List[Dict[str, Any]]:
-        """Search for automations based on question or tags."""
-        results = []
-        query = query.lower()
-        
-        for automation in self.automations_db["automations"]:
-            if (query in automation["question"].lower() or 
-                any(query in tag.lower() for tag in automation["tags"])):
-                results.append(automation)
-        
-        return results
+    def _check_authorized(self, user_id: str) -> Dict[str, Any]:
+        """Return the verified token claims, or an empty dict when auth is disabled."""
+        if not self.auth_required:
+            return {}
+        with self.metrics.span("auth"):
+            claims = self.auth_manager.verify_token(user_id)
+        if claims is None:
+            raise AuthenticationError("User not authorized")
+        return claims
 
-    def get_automation(self, automation_id: int) -> Optional[Dict[str, Any]]:
-        """Retrieve specific automation by ID."""
-        for automation in self.automations_db["automations"]:
-            if automation["id"] == automation_id:
-                automation["times_used"] += 1
-                self._save_database()
-                return automation
-        return None
+    def _concurrency_key(self, user_id: str) -> str:
+        """Identify the caller for per-user limits by its verified user id, not the raw token."""
+        return str(self._check_authorized(user_id).get("user_id", user_id))
 
     def execute_automation(self, 
                          automation_id: int, 
                          user_id: str, 
                          params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute an automation script."""
-        if self.auth_required and not self.auth_manager.is_authorized(user_id):
-            raise AuthenticationError("User not authorized")
+        self._check_authorized(user_id)
+        return self._execute(automation_id, params)
+
+    def execute_many(self,
+                     automation_ids: List[int],
+                     user_id: str,
+                     params: Optional[Dict[str, Any]] = None) -> List[Future]:
+        """Execute several automations concurrently, returning one future per id.
+
+        Each future resolves to the same result dict as ``execute_automation``.
+        Runs beyond the global or per-user concurrency limit queue until a
+        slot frees up.
+        """
+        owner = self._concurrency_key(user_id)
+        return [self.engine.submit(owner, lambda automation_id=automation_id: self._execute(automation_id, params))
+                for automation_id in automation_ids]
+
+    async def execute_automation_async(self,
+                                       automation_id: int,
+                                       user_id: str,
+                                       params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute an automation on the worker pool without blocking the event loop."""
+        owner = self._concurrency_key(user_id)
+        future = self.engine.submit(owner, lambda: self._execute(automation_id, params))
+        return await asyncio.wrap_future(future)
+
+    def execute_fanout(self,
+                       automation_id: int,
+                       user_id: str,
+                       targets: Iterable[Dict[str, Any]],
+                       max_parallel: Optional[int] = None,
+                       max_failures: Optional[int] = None,
+                       transport: Optional[Transport] = None) -> FanOut:
+        """Run one automation once per target param set and stream the results.
+
+        At most ``max_parallel`` targets (default: ``max_workers``) run at
+        once, within the usual global and per-user limits. Iterate over the
+        returned ``FanOut`` for per-target results as they complete and call
+        ``summary()`` for the totals. Once more than ``max_failures`` targets
+        have failed, the remaining ones are skipped. ``transport`` decides
+        where each target runs. By default Python automations run like
+        ``execute_automation``, and shell automations use ``LocalTransport``
+        so each target's params reach the script as environment variables.
+        """
+        owner = self._concurrency_key(user_id)
+        automation = self._automations_by_id.get(automation_id)
+        if automation is None:
+            raise ValueError(f"Automation with ID {automation_id} not found")
+        if transport is None and ScriptType(automation["script_type"]) != ScriptType.PYTHON:
+            # A plain shell run ignores params, so every target would run the same command
+            transport = LocalTransport()
+        fanout = FanOut(
+            list(targets),
+            lambda params: self.engine.submit(owner, lambda: self._execute(automation_id, params, transport)),
+            max_parallel or self._engine_settings["max_workers"],
+            max_failures
+        )
+        self.logger.info(f"Running automation {automation_id} against {len(fanout.targets)} targets")
+        return fanout.start()
+
+    def schedule_automation(self,
+                            automation_id: int,
+                            user_id: str,
+                            interval: Optional[float] = None,
+                            cron: Optional[str] = None,
+                            params: Optional[Dict[str, Any]] = None,
+                            jitter: float = 0.0,
+                            misfire_policy: str = "run_once",
+                            misfire_grace: float = 60.0,
+                            allow_overlap: bool = False) -> Dict[str, Any]:
+        """Run an automation every ``interval`` seconds or on a ``cron`` expression.
+
+        Runs go through the same worker pool and per-user limits as
+        ``execute_many``, on behalf of ``user_id`` as verified now.
+        ``jitter`` delays each run by up to that many seconds. A run more
+        than ``misfire_grace`` seconds late is handled by ``misfire_policy``:
+        ``"run_once"``, ``"run_all"`` or ``"skip"``. While a run is still
+        going, the next one is skipped unless ``allow_overlap`` is set.
+        Schedules live in this process only and are not persisted.
+        """
+        owner = self._concurrency_key(user_id)
+        if automation_id not in self._automations_by_id:
+            raise ValueError(f"Automation with ID {automation_id} not found")
+        if (interval is None) == (cron is None):
+            raise ValueError("Pass exactly one of interval or cron")
+        trigger = IntervalTrigger(interval) if interval is not None else CronTrigger(cron)
+        schedule = self.scheduler.add(automation_id, trigger, params=params, owner=owner, jitter=jitter,
+                                      misfire_policy=misfire_policy, misfire_grace=misfire_grace,
+                                      allow_overlap=allow_overlap)
+        self.logger.info(f"Automation {automation_id} scheduled as schedule {schedule.schedule_id}")
+        return schedule.to_dict()
+
+    def unschedule(self, schedule_id: int, user_id: str) -> bool:
+        """Stop a schedule; returns False when there is no such schedule."""
+        self._check_authorized(user_id)
+        return self._scheduler is not None and self._scheduler.remove(schedule_id)
+
+    def list_schedules(self, automation_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Schedules with their next run time and run counters, optionally for one automation."""
+        if self._scheduler is None:
+            return []
+        return [schedule.to_dict() for schedule in self._scheduler.schedules(automation_id)]
+
+    def _dispatch_scheduled(self, schedule: Schedule) -> Future:
+        return self.engine.submit(schedule.owner, lambda: self._execute(schedule.automation_id, schedule.params))
+
+    def _get_shell_automation(self, automation_id: int) -> AutomationRecord:
+        automation = self._lookup(automation_id, count_usage=True)
+        if not automation:
+            raise ValueError(f"Automation with ID {automation_id} not found")
+        if ScriptType(automation["script_type"]) == ScriptType.PYTHON:
+            raise ValueError("Streaming is only supported for shell automations")
+        return automation
+
+    def stream_automation(self,
+                          automation_id: int,
+                          user_id: str,
+                          chunk_size: int = 65536,
+                          tail_bytes: int = 1 << 20,
+                          spill_path: Optional[str] = None) -> OutputStream:
+        """Run a shell automation and iterate over its output as it is produced.
 
-        automation = self.get_automation(automation_id)
+        The script starts when iteration begins. Iterating yields
+        ``(stream_name, bytes)`` chunks. Only the last
+        ``tail_bytes`` of each stream are retained; pass ``spill_path`` to keep
+        the complete output on disk.
+        """
+        self._check_authorized(user_id)
+        automation = self._get_shell_automation(automation_id)
+        self.logger.info(f"Streaming automation {automation_id}")
+        return OutputStream(automation["script"], chunk_size=chunk_size, tail_bytes=tail_bytes,
+                            spill_path=spill_path, timeout=automation.get("timeout", self.default_timeout))
+
+    def stream_automation_async(self,
+                                automation_id: int,
+                                user_id: str,
+                                chunk_size: int = 65536,
+                                tail_bytes: int = 1 << 20,
+                                spill_path: Optional[str] = None) -> AsyncOutputStream:
+        """Async variant of ``stream_automation`` for use with ``async for``."""
+        self._check_authorized(user_id)
+        automation = self._get_shell_automation(automation_id)
+        self.logger.info(f"Streaming automation {automation_id}")
+        return AsyncOutputStream(automation["script"], chunk_size=chunk_size, tail_bytes=tail_bytes,
+                                 spill_path=spill_path, timeout=automation.get("timeout", self.default_timeout))
+
+    def _execute(self,
+                 automation_id: int,
+                 params: Optional[Dict[str, Any]],
+                 transport: Optional[Transport] = None) -> Dict[str, Any]:
+        automation = self._lookup(automation_id, count_usage=True)
         if not automation:
             raise ValueError(f"Automation with ID {automation_id} not found")
 
+        if transport is not None:
+            # Results depend on where the transport runs, so they are never shared
+            return self._run(automation, params, transport)
+        key = params_key(automation["script_hash"], params) if automation.get("cache_ttl") else None
+        if key is None:
+            return self._run(automation, params)
+        # Identical concurrent calls share one run; successful results are reused until the TTL expires
+        result, shared = self.result_cache.get_or_run(
+            key, automation["cache_ttl"], lambda: self._run(automation, params),
+            should_cache=lambda result: result["success"]
+        )
+        return dict(result, cached=True) if shared else result
+
+    def _run(self,
+             automation: Dict[str, Any],
+             params: Optional[Dict[str, Any]],
+             transport: Optional[Transport] = None) -> Dict[str, Any]:
+        with self.metrics.span("execute"):
+            return self._run_script(automation, params, transport)
+
+    def _record_execution(self,
+                          automation_id: int,
+                          script_type: ScriptType,
+                          execution_id: str,
+                          started: float,
+                          outcome: str) -> Dict[str, Any]:
+        """Count a finished run and return the structured fields for its log record."""
+        self.metrics.counter("executions_total", "Automation runs by script type and outcome",
+                             script_type=script_type.value, outcome=outcome).inc()
+        return {
+            "execution_id": execution_id,
+            "automation_id": automation_id,
+            "script_type": script_type.value,
+            "outcome": outcome,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _run_script(self,
+                    automation: Dict[str, Any],
+                    params: Optional[Dict[str, Any]],
+                    transport: Optional[Transport] = None) -> Dict[str, Any]:
+        automation_id = automation["id"]
         script_type = ScriptType(automation["script_type"])
         script = automation["script"]
+        timeout = automation.get("timeout", self.default_timeout)
+        execution_id = uuid.uuid4().hex
+        started = time.perf_counter()
 
         try:
-            if script_type == ScriptType.PYTHON:
-                # Execute Python script with parameters
+            if transport is not None:
+                result = transport.run(automation, params or {}, timeout)
+            elif script_type == ScriptType.PYTHON and self._engine_settings["process_workers"]:
+                # Run off the GIL in an isolated worker process
+                code = self.code_cache.get_or_compile(automation["script_hash"], script)
+                result = self.engine.run_python(automation["script_hash"], code, params, timeout)
+            elif script_type == ScriptType.PYTHON:
+                # Execute cached bytecode with parameters injected as a global
+                code = self.code_cache.get_or_compile(automation["script_hash"], script)
                 local_vars: Dict[str, Any] = {}
-                if params:
-                    script = f"params = {params}\n" + script
-                exec(script, {}, local_vars)
+                exec(code, {"params": params or {}}, local_vars)
                 result = local_vars.get('result', None)
             else:
                 # Execute shell scripts
@@ -151,20 +941,37 @@ class DevOpsAutomationAgent:
                     script, 
                     shell=True, 
                     capture_output=True, 
-                    text=True
+                    text=True,
+                    timeout=timeout
                 )
                 
-            self.logger.info(f"Automation {automation_id} executed successfully")
+            self.logger.info(f"Automation {automation_id} executed successfully", extra=self._record_execution(
+                automation_id, script_type, execution_id, started, "success"
+            ))
             return {
                 "success": True,
                 "result": result,
-                "automation_id": automation_id
+                "automation_id": automation_id,
+                "execution_id": execution_id
             }
             
+        except (subprocess.TimeoutExpired, FutureTimeoutError, TimeoutError):
+            self.logger.error(f"Automation {automation_id} timed out after {timeout}s", extra=self._record_execution(
+                automation_id, script_type, execution_id, started, "timeout"
+            ))
+            return {
+                "success": False,
+                "error": f"Timed out after {timeout} seconds",
+                "automation_id": automation_id,
+                "execution_id": execution_id
+            }
         except Exception as e:
-            self.logger.error(f"Error executing automation {automation_id}: {str(e)}")
+            self.logger.error(f"Error executing automation {automation_id}: {str(e)}", extra=self._record_execution(
+                automation_id, script_type, execution_id, started, "failure"
+            ))
             return {
                 "success": False,
                 "error": str(e),
-                "automation_id": automation_id
-            } 
\ No newline at end of file
+                "automation_id": automation_id,
+                "execution_id": execution_id
+            }
@@ -1,11 +1,35 @@
 import jwt
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 class AuthManager:
-    def __init__(self, secret_key: str = "your-secret-key"):
-        self.secret_key = secret_key
+    def __init__(self, secret_key: str = "your-secret-key", cache_size: int = 1024):
+        self._secret_key = secret_key
         self.users: Dict = {}  # In production, use a proper database
+        self.cache_size = cache_size
+        # token digest -> (claims, unix time the entry stops being valid)
+        self._token_cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def secret_key(self) -> str:
+        return self._secret_key
+
+    @secret_key.setter
+    def secret_key(self, secret_key: str) -> None:
+        self.rotate_secret(secret_key)
+
+    def rotate_secret(self, secret_key: str) -> None:
+        """Switch to a new signing secret and drop every cached verification."""
+        with self._cache_lock:
+            self._secret_key = secret_key
+            self._token_cache.clear()
 
     def create_user(self, username: str, password: str) -> Dict:
         """Create a new user."""
@@ -32,10 +56,44 @@ class AuthManager:
         
         return jwt.encode(payload, self.secret_key, algorithm="HS256")
 
-    def is_authorized(self, token: str) -> bool:
-        """Verify if the token is valid."""
+    def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the token's claims if it is valid, using the verification cache."""
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+        with self._cache_lock:
+            entry = self._token_cache.get(digest)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at > now:
+                    self._token_cache.move_to_end(digest)
+                    self.cache_hits += 1
+                    return claims
+                del self._token_cache[digest]
+            self.cache_misses += 1
+            secret_key = self._secret_key
+
         try:
-            jwt.decode(token, self.secret_key, algorithms=["HS256"])
-            return True
+            claims = jwt.decode(token, secret_key, algorithms=["HS256"])
         except jwt.InvalidTokenError:
-            return False 
\ No newline at end of file
+            return None
+
+        with self._cache_lock:
+            if secret_key == self._secret_key:
+                self._token_cache[digest] = (claims, float(claims.get("exp", float("inf"))))
+                while len(self._token_cache) > self.cache_size:
+                    self._token_cache.popitem(last=False)
+        return claims
+
+    def is_authorized(self, token: str) -> bool:
+        """Verify if the token is valid."""
+        return self.verify_token(token) is not None
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the token verification cache."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "size": len(self._token_cache)
+        }
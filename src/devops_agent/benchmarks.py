@@ -0,0 +1,287 @@
+"""Reproducible benchmarks for the agent's hot paths.
+
+Run from the repository root so the reflective agent's validators are
+importable too::
+
+    PYTHONPATH=src python -m devops_agent.benchmarks --sizes 1000 10000 \\
+        --output bench.json --baseline bench_baseline.json
+
+Results are written as JSON. With ``--baseline`` every metric is compared
+against a stored run and the process exits non-zero on a regression.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .agent import DevOpsAutomationAgent, ScriptType
+from .auth import AuthManager
+from .scheduler import IntervalTrigger, Scheduler
+
+WORDS = [
+    "disk", "usage", "memory", "cpu", "restart", "service", "nginx", "docker", "container", "image",
+    "cleanup", "logs", "rotate", "backup", "database", "postgres", "kubernetes", "pod", "deploy",
+    "rollback", "certificate", "renew", "dns", "network", "latency", "firewall", "user", "permission",
+    "cache", "queue", "kafka", "redis", "health", "check", "alert", "metrics", "terraform", "ansible",
+]
+TAGS = ["system", "storage", "network", "security", "database", "k8s", "ci", "monitoring"]
+# Distinct bodies are few so generating a large catalog reuses cached validation verdicts
+SCRIPT_VARIANTS = 64
+
+Timings = Dict[str, float]
+
+_DONE: Future = Future()
+_DONE.set_result({"success": True})
+
+
+def measure(operation: Callable[[int], Any], count: int) -> Timings:
+    """Time ``count`` calls of ``operation(i)`` and summarize their latencies."""
+    latencies = []
+    gc.collect()
+    started = time.perf_counter()
+    for i in range(count):
+        begin = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - begin)
+    total = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "ops": count,
+        "total_s": round(total, 6),
+        "ops_per_s": round(count / total, 2) if total else 0.0,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 4),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+    }
+
+
+def synthetic_records(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Deterministic automation records with realistic question and tag spread."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        variant = i % SCRIPT_VARIANTS
+        if i % 4 == 0:
+            record = {"script": f"result = params.get('n', 0) + {variant}", "script_type": "python"}
+        else:
+            record = {"script": f"echo {variant}; test -d /tmp", "script_type": "bash"}
+        record["question"] = " ".join(rng.sample(WORDS, 5)) + f" {i}"
+        record["tags"] = rng.sample(TAGS, 2)
+        records.append(record)
+    return records
+
+
+def bench_catalog(size: int, backend: str, operations: int, workdir: str, seed: int = 0) -> Dict[str, Timings]:
+    """Build a catalog of ``size`` automations and time the catalog-dependent operations."""
+    path = os.path.join(workdir, f"catalog-{size}.{backend}")
+    rng = random.Random(seed)
+    results: Dict[str, Timings] = {}
+
+    agent = DevOpsAutomationAgent(storage_path=path, auth_required=False, storage_backend=backend)
+    chunk = 10000
+    started = time.perf_counter()
+    for start in range(0, size, chunk):
+        agent.add_automations_bulk(synthetic_records(min(chunk, size - start), seed + start), "bench")
+    elapsed = time.perf_counter() - started
+    results["bulk_add"] = {"ops": size, "total_s": round(elapsed, 6), "ops_per_s": round(size / elapsed, 2)}
+
+    results["add"] = measure(lambda i: agent.add_automation(
+        question=f"benchmark added automation {i}", script=f"echo added {i % SCRIPT_VARIANTS}",
+        tags=["bench"], script_type=ScriptType.BASH, user_id="bench"
+    ), operations)
+
+    queries = [" ".join(rng.sample(WORDS, 2)) for _ in range(operations)]
+    results["search"] = measure(lambda i: agent.search_automation(queries[i], limit=20), operations)
+    results["search_tagged"] = measure(
+        lambda i: agent.search_automation(queries[i], tags=[TAGS[i % len(TAGS)]], limit=20), operations
+    )
+    ids = [rng.randint(1, size) for _ in range(operations)]
+    results["get"] = measure(lambda i: agent.get_automation(ids[i], count_usage=False), operations)
+    agent.close()
+
+    startups = []
+    for _ in range(3):
+        gc.collect()
+        started = time.perf_counter()
+        reopened = DevOpsAutomationAgent(storage_path=path, auth_required=False, storage_backend=backend)
+        startups.append(time.perf_counter() - started)
+        reopened.close()
+    results["startup"] = {"ops": 1, "total_s": round(min(startups), 6)}
+    return results
+
+
+def bench_execution(operations: int, workdir: str) -> Dict[str, Timings]:
+    """Time Python and shell execution and token verification, independent of catalog size."""
+    results: Dict[str, Timings] = {}
+    agent = DevOpsAutomationAgent(storage_path=os.path.join(workdir, "execute.json"), auth_required=False)
+    python = agent.add_automation("add one", "result = params['n'] + 1", ["bench"], ScriptType.PYTHON, "bench")
+    shell = agent.add_automation("true", "true", ["bench"], ScriptType.BASH, "bench")
+    results["execute_python"] = measure(
+        lambda i: agent.execute_automation(python["id"], "bench", params={"n": i}), operations
+    )
+    results["execute_shell"] = measure(
+        lambda i: agent.execute_automation(shell["id"], "bench"), max(1, operations // 10)
+    )
+    agent.close()
+
+    auth = AuthManager(secret_key="benchmark-signing-secret-0123456789", cache_size=operations)
+    auth.create_user("bench", "bench")
+    token = auth.generate_token("bench", "bench")
+    results["verify_token_cached"] = measure(lambda i: auth.verify_token(token), operations)
+    fresh = []
+    for i in range(operations):
+        auth.create_user(f"user{i}", "pw")
+        fresh.append(auth.generate_token(f"user{i}", "pw"))
+    results["verify_token_cold"] = measure(lambda i: auth.verify_token(fresh[i]), operations)
+    return results
+
+
+def bench_validator(operations: int) -> Optional[Dict[str, Timings]]:
+    """Time the reflective agent's solution checks; None when ``devops`` is not importable."""
+    try:
+        from devops.agent import Solution
+        from devops.validators import DevOpsValidator
+    except ImportError:
+        return None
+    rng = random.Random(0)
+    solutions = [
+        Solution(
+            description="synthetic",
+            implementation_steps=[" ".join(rng.sample(WORDS, 8)) for _ in range(20)],
+            considerations=[], risks=[], estimated_effort="1d", tools_required=[],
+            prerequisites=[], validation_steps=[]
+        )
+        for _ in range(operations)
+    ]
+    return {
+        "validate_security": measure(lambda i: DevOpsValidator.validate_security(solutions[i]), operations),
+        "validate_reliability": measure(lambda i: DevOpsValidator.validate_reliability(solutions[i]), operations),
+        "validate_many": measure(lambda i: DevOpsValidator.validate_many(solutions), 1),
+    }
+
+
+def bench_scheduler(size: int) -> Dict[str, Timings]:
+    """Time registering ``size`` interval schedules and firing them all in one pass."""
+    now = [0.0]
+    scheduler = Scheduler(lambda schedule: _DONE, clock=lambda: now[0], seed=0)
+    results = {"add": measure(lambda i: scheduler.add(i, IntervalTrigger(60, start=float(i % 60))), size)}
+    now[0] = 120.0
+    results["fire"] = measure(lambda i: scheduler.run_pending(), 1)
+    return results
+
+
+def run_suite(sizes: List[int], backend: str = "sqlite", operations: int = 200, seed: int = 0) -> Dict[str, Any]:
+    """Run every benchmark in a scratch directory and return the JSON-ready report."""
+    workdir = tempfile.mkdtemp(prefix="devops-agent-bench-")
+    previous_cwd = os.getcwd()
+    results: Dict[str, Timings] = {}
+    try:
+        # The agent logs to a file in the working directory
+        os.chdir(workdir)
+        for size in sizes:
+            for name, timings in bench_catalog(size, backend, operations, workdir, seed).items():
+                results[f"catalog_{size}/{name}"] = timings
+            for name, timings in bench_scheduler(size).items():
+                results[f"scheduler_{size}/{name}"] = timings
+        results.update(bench_execution(operations, workdir))
+        results.update(bench_validator(operations) or {})
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "backend": backend,
+            "sizes": sizes,
+            "operations": operations,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any],
+            baseline: Dict[str, Any],
+            threshold: float = 0.2,
+            noise_floor_ms: float = 0.05) -> List[Dict[str, Any]]:
+    """Compare two reports metric by metric.
+
+    Latency metrics use ``p50_ms`` and one-shot metrics ``total_s``. A
+    metric regresses when it is more than ``threshold`` slower than the
+    baseline and by more than ``noise_floor_ms`` in absolute terms, so
+    sub-microsecond jitter does not fail a run. Metrics missing from either
+    report are skipped.
+    """
+    rows = []
+    for name, timings in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        field = "p50_ms" if "p50_ms" in timings else "total_s"
+        if not previous.get(field):
+            continue
+        ratio = timings[field] / previous[field]
+        delta_ms = (timings[field] - previous[field]) * (1 if field == "p50_ms" else 1000)
+        rows.append({
+            "metric": name,
+            "field": field,
+            "baseline": previous[field],
+            "current": timings[field],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold and delta_ms > noise_floor_ms,
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the DevOps automation agent")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="catalog sizes to generate, e.g. 1000 100000 1000000")
+    parser.add_argument("--backend", default="sqlite", help="storage backend for the synthetic catalogs")
+    parser.add_argument("--operations", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing, 0.2 = 20%%")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--save-baseline", action="store_true", help="also write the report to --baseline")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.backend, args.operations, args.seed)
+    regressions = []
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold, args.noise_floor_ms)
+        regressions = [row for row in report["comparison"] if row["regression"]]
+        for row in report["comparison"]:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"{row['metric']:<40} {row['baseline']:>12} -> {row['current']:>12} "
+                  f"x{row['ratio']:<7} {flag}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
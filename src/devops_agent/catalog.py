@@ -0,0 +1,639 @@
+import json
+import mmap
+import os
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .records import AutomationRecord, json_default
+from .search_index import IndexSnapshot, SearchIndex, _copy_rows, _merge_rows
+from .storage import STORAGE_BACKENDS, AppendOnlyLogBackend, _file_identity
+
+CATALOG_FORMAT = "mapped-catalog/2"
+_MAGIC = f"{CATALOG_FORMAT}\n".encode("ascii")
+# Sections start on 8-byte boundaries so they can be used as typed arrays in place
+_ALIGN = 8
+
+Ref = Tuple[int, int]
+
+# One row per automation, sorted by id: where its metadata, script body and
+# version history are in the data file. A version history of length 0 is none.
+ROW_COLUMNS = (("ids", "q"), ("meta_offsets", "Q"), ("meta_lengths", "I"),
+               ("script_offsets", "Q"), ("script_lengths", "I"),
+               ("version_offsets", "Q"), ("version_lengths", "I"))
+BLOB_COLUMNS = (("blob_offsets", "Q"), ("blob_lengths", "I"))
+
+
+def _pad(key: str, width: int) -> Optional[bytes]:
+    """Blob key as stored in the index, or None if it is too long to be there."""
+    encoded = key.encode('utf-8')
+    return encoded.ljust(width, b"\0") if len(encoded) <= width else None
+
+
+def _write_index(path: str, header: Dict[str, Any], sections: Dict[str, Any]) -> int:
+    """Write the magic line, a JSON header line with the section layout and the sections.
+
+    Returns the number of bytes written.
+    """
+    layout = {}
+    offset = 0
+    for name, data in sections.items():
+        size = memoryview(data).nbytes
+        layout[name] = [offset, size]
+        offset += size + -size % _ALIGN
+    head = _MAGIC + json.dumps(dict(header, sections=layout)).encode('utf-8')
+    head += b" " * (-(len(head) + 1) % _ALIGN) + b"\n"
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(head)
+        for data in sections.values():
+            f.write(data)
+            f.write(b"\0" * (-memoryview(data).nbytes % _ALIGN))
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class _FixedWidthKeys:
+    """Sorted keys stored back to back at a fixed width, searchable with ``bisect``."""
+
+    def __init__(self, data: memoryview, width: int):
+        self.data = data
+        self.width = width
+
+    def __len__(self) -> int:
+        return len(self.data) // self.width if self.width else 0
+
+    def __getitem__(self, position: int) -> bytes:
+        start = position * self.width
+        return bytes(self.data[start:start + self.width])
+
+
+class _Snapshot:
+    """An index file mapped into memory; sections are only decoded where they are read."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self._map.find(b"\n", len(_MAGIC))
+        if self._map[:len(_MAGIC)] != _MAGIC or end < 0:
+            self.close()
+            raise ValueError(f"{path} is not a {CATALOG_FORMAT} index")
+        self.header = json.loads(self._map[len(_MAGIC):end])
+        if self.header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written on a {self.header['byteorder']}-endian machine")
+        view = memoryview(self._map)
+        start = end + 1
+        self.sections = {name: view[start + offset:start + offset + size]
+                         for name, (offset, size) in self.header["sections"].items()}
+        for name, typecode in ROW_COLUMNS + BLOB_COLUMNS:
+            setattr(self, name, self.sections[name].cast(typecode))
+        self.columns: List[memoryview] = [getattr(self, name) for name, _ in ROW_COLUMNS]
+        self.blob_keys = _FixedWidthKeys(self.sections["blob_keys"], self.header["blob_key_width"])
+
+    def row(self, automation_id: int) -> Optional[int]:
+        row = bisect_left(self.ids, automation_id)
+        return row if row < len(self.ids) and self.ids[row] == automation_id else None
+
+    def ref(self, row: int, field: str) -> Ref:
+        return getattr(self, f"{field}_offsets")[row], getattr(self, f"{field}_lengths")[row]
+
+    def blob_ref(self, script_hash: str) -> Optional[Ref]:
+        key = _pad(script_hash, self.blob_keys.width)
+        if key is None:
+            return None
+        position = bisect_left(self.blob_keys, key)
+        if position == len(self.blob_keys) or self.blob_keys[position] != key:
+            return None
+        return self.blob_offsets[position], self.blob_lengths[position]
+
+    def search_index(self, describe: Callable[[int], Dict[str, Any]]) -> IndexSnapshot:
+        sections = {name[len("search."):]: section for name, section in self.sections.items()
+                    if name.startswith("search.")}
+        return IndexSnapshot(sections, self.header["search"], describe)
+
+    def close(self) -> None:
+        try:
+            self._map.close()
+        except BufferError:
+            # Views of it are still in use; it is unmapped once they are gone
+            pass
+
+
+class LazyRecord(AutomationRecord):
+    """Automation record whose script body is read from the data file on first access."""
+
+    __slots__ = ("_load_script",)
+
+    def __init__(self, data: Dict[str, Any], load_script: Callable[[], str]):
+        self._load_script = load_script
+        super().__init__(data)
+
+    def _missing(self, key: str) -> Any:
+        if key != "script":
+            raise KeyError(key)
+        script = self._load_script()
+        self.script = script
+        return script
+
+    def _has(self, key: str) -> bool:
+        return key == "script" or hasattr(self, key)
+
+    def peek(self, key: str) -> Any:
+        if key == "script" and not self.script_loaded:
+            return self._load_script()
+        return self[key]
+
+    def assign(self, other: Dict[str, Any]) -> None:
+        if isinstance(other, LazyRecord):
+            self._load_script = other._load_script
+        super().assign(other)
+
+    def __reduce__(self):
+        return (AutomationRecord, (self.to_dict(),))
+
+
+class RecordTable(MutableMapping):
+    """Automations by id, read from the index snapshot when first accessed.
+
+    Records read, replayed from the log or added since the snapshot stay
+    in memory until the next compaction writes them into a new snapshot
+    and the table is rebased onto it. ``peek`` reads one without keeping
+    it, for scans over the whole catalog.
+    """
+
+    def __init__(self, materialize: Callable[[_Snapshot, int], AutomationRecord]):
+        self._materialize = materialize
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._records: Dict[int, AutomationRecord] = {}
+        # Ids not in the snapshot, in the order they were added
+        self._added: Dict[int, None] = {}
+        self._removed: Set[int] = set()
+
+    def rebase(self, snapshot: Optional[_Snapshot]) -> None:
+        """Switch to a newer snapshot, dropping every record held in memory."""
+        with self._lock:
+            self._snapshot = snapshot
+            self._records = {}
+            self._added = {}
+            self._removed = set()
+
+    def _row(self, automation_id: Any) -> Optional[int]:
+        if self._snapshot is None or type(automation_id) is not int:
+            return None
+        return self._snapshot.row(automation_id)
+
+    def __getitem__(self, automation_id: int) -> AutomationRecord:
+        record = self._records.get(automation_id)
+        if record is not None:
+            return record
+        with self._lock:
+            record = self._records.get(automation_id)
+            if record is None:
+                row = self._row(automation_id)
+                if row is None or automation_id in self._removed:
+                    raise KeyError(automation_id)
+                record = self._records[automation_id] = self._materialize(self._snapshot, row)
+            return record
+
+    def peek(self, automation_id: int) -> Optional[AutomationRecord]:
+        """The record for ``automation_id`` or None, without keeping one read from the snapshot in memory."""
+        record = self._records.get(automation_id)
+        if record is not None:
+            return record
+        with self._lock:
+            row = self._row(automation_id)
+            if row is None or automation_id in self._removed:
+                return None
+            snapshot = self._snapshot
+        return self._materialize(snapshot, row)
+
+    def __contains__(self, automation_id: object) -> bool:
+        if automation_id in self._records:
+            return True
+        return self._row(automation_id) is not None and automation_id not in self._removed
+
+    def __setitem__(self, automation_id: int, record: AutomationRecord) -> None:
+        with self._lock:
+            self._records[automation_id] = record
+            self._removed.discard(automation_id)
+            if self._row(automation_id) is None:
+                self._added[automation_id] = None
+
+    def __delitem__(self, automation_id: int) -> None:
+        with self._lock:
+            row = self._row(automation_id)
+            if automation_id not in self._records and (row is None or automation_id in self._removed):
+                raise KeyError(automation_id)
+            self._records.pop(automation_id, None)
+            self._added.pop(automation_id, None)
+            if row is not None:
+                self._removed.add(automation_id)
+
+    def __len__(self) -> int:
+        stored = len(self._snapshot.ids) if self._snapshot is not None else 0
+        return stored - len(self._removed) + len(self._added)
+
+    def __iter__(self) -> Iterator[int]:
+        if self._snapshot is not None:
+            removed = self._removed
+            for automation_id in self._snapshot.ids.tolist():
+                if automation_id not in removed:
+                    yield automation_id
+        yield from list(self._added)
+
+
+class MappedCatalogBackend(AppendOnlyLogBackend):
+    """Catalog split into a memory-mapped index and a data file.
+
+    ``path`` holds the index snapshot: one fixed-width row per automation
+    pointing into ``path + '.data'``, where metadata, script bodies,
+    version histories and script blobs are appended, followed by the
+    search index. ``path + '.log'`` holds the changes since, exactly like
+    the log backend. Opening the catalog maps the index and replays the
+    log; records and search postings are decoded as they are used, so
+    startup cost and resident memory follow the log and the working set
+    rather than the size of the catalog.
+
+    The log is compacted into a new index once it holds ``compact_every``
+    entries or an eighth as many as there are automations, whichever is
+    more, and on close once it holds ``compact_every``. Rows and
+    postings that did not change are copied into the new index as they are.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        super().__init__(path, compact_every)
+        self.data_path = f"{path}.data"
+        self._data_file = None
+        self._map: Optional[mmap.mmap] = None
+        self._data_lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._table = RecordTable(self._materialize)
+        self._search_index: Optional[SearchIndex] = None
+        self._logged_entries = 0
+        # Written since the snapshot, taking precedence over its rows
+        self._script_refs: Dict[int, Tuple[str, int, int]] = {}
+        self._version_refs: Dict[int, Ref] = {}
+        self._blob_refs: Dict[str, Ref] = {}
+
+    def _append_data(self, payloads: List[bytes]) -> List[Ref]:
+        """Append payloads to the data file and fsync before any index entry points at them."""
+        if not payloads:
+            return []
+        with self._data_lock:
+            if self._data_file is None:
+                self._data_file = open(self.data_path, 'ab')
+            offset = self._data_file.seek(0, os.SEEK_END)
+            refs = []
+            for payload in payloads:
+                refs.append((offset, len(payload)))
+                offset += len(payload)
+            self._data_file.write(b"".join(payloads))
+            self.bytes_written += offset - refs[0][0]
+            self._data_file.flush()
+            os.fsync(self._data_file.fileno())
+        return refs
+
+    def _read(self, ref: Ref) -> bytes:
+        offset, length = ref
+        with self._data_lock:
+            if self._map is None or offset + length > len(self._map):
+                if self._map is not None:
+                    self._map.close()
+                with open(self.data_path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map[offset:offset + length]
+
+    def _read_json(self, ref: Ref) -> Any:
+        return json.loads(self._read(ref))
+
+    def _snapshot_meta(self, snapshot: _Snapshot, automation_id: int) -> Dict[str, Any]:
+        """Metadata of an automation as of ``snapshot``."""
+        return self._read_json(snapshot.ref(snapshot.row(automation_id), "meta"))
+
+    def read_script(self, automation_id: int) -> str:
+        if automation_id in self._script_refs:
+            ref = self._script_refs[automation_id][1:]
+        else:
+            ref = self._snapshot.ref(self._snapshot.row(automation_id), "script")
+        return self._read(ref).decode('utf-8')
+
+    def _lazy_record(self, meta: Dict[str, Any]) -> LazyRecord:
+        automation_id = meta["id"]
+        return LazyRecord(meta, lambda: self.read_script(automation_id))
+
+    def _materialize(self, snapshot: _Snapshot, row: int) -> LazyRecord:
+        return self._lazy_record(self._read_json(snapshot.ref(row, "meta")))
+
+    def _search_base(self, snapshot: Optional[_Snapshot]) -> Optional[IndexSnapshot]:
+        if snapshot is None:
+            return None
+        return snapshot.search_index(lambda automation_id: self._snapshot_meta(snapshot, automation_id))
+
+    def _rebase(self, snapshot: Optional[_Snapshot]) -> None:
+        """Make ``snapshot`` the base of the table and the search index and forget refs written before it."""
+        previous, self._snapshot = self._snapshot, snapshot
+        self._table.rebase(snapshot)
+        if self._search_index is not None:
+            self._search_index.rebase(self._search_base(snapshot))
+        self._script_refs = {}
+        self._version_refs = {}
+        self._blob_refs = {}
+        if previous is not None:
+            previous.close()
+
+    def _replay(self, db: Dict[str, Any], automations: Dict[int, Dict[str, Any]], entry: Dict[str, Any]) -> None:
+        if entry["op"] == "batch":
+            for nested in entry["entries"]:
+                self._replay(db, automations, nested)
+            return
+        self._logged_entries += 1
+        if entry["op"] == "automation":
+            meta = entry["data"]
+            if "script" in entry:
+                self._script_refs[meta["id"]] = (meta["script_hash"], *entry["script"])
+            automations[meta["id"]] = meta
+        elif entry["op"] == "versions":
+            self._version_refs[entry["id"]] = tuple(entry["ref"])
+            db["versions"].pop(str(entry["id"]), None)
+        elif entry["op"] == "blob":
+            self._blob_refs[entry["hash"]] = tuple(entry["ref"])
+            db["blobs"].pop(entry["hash"], None)
+
+    def _open(self) -> Dict[int, Dict[str, Any]]:
+        """Map the current index and replay the whole log, returning the automations it changed."""
+        self._snapshot_identity = _file_identity(self.path)
+        self._pending_entries = 0
+        self._logged_entries = 0
+        self._log_offset = 0
+        self._rebase(_Snapshot(self.path) if os.path.exists(self.path) else None)
+        replayed: Dict[int, Dict[str, Any]] = {}
+        if os.path.exists(self.log_path):
+            self._replay_log({"versions": {}, "blobs": {}}, replayed)
+        return replayed
+
+    def load(self) -> Dict[str, Any]:
+        """Open the catalog; ``automations`` is a ``RecordTable`` rather than a list."""
+        next_id = 1
+        for meta in self._open().values():
+            self._table[meta["id"]] = self._lazy_record(meta)
+            next_id = max(next_id, meta["id"] + 1)
+        if self._snapshot is not None:
+            next_id = max(next_id, self._snapshot.header["next_id"])
+        return {"automations": self._table, "versions": {}, "blobs": {}, "next_id": next_id}
+
+    def load_search_index(self) -> SearchIndex:
+        """Search index over the snapshot's persisted postings and the automations replayed from the log."""
+        self._search_index = SearchIndex(base=self._search_base(self._snapshot))
+        for record in list(self._table._records.values()):
+            self._search_index.add(record)
+        return self._search_index
+
+    def refresh(self, db: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not self._compacted_elsewhere():
+            changed: Dict[int, Dict[str, Any]] = {}
+            if os.path.exists(self.log_path):
+                self._replay_log(db, changed)
+            return [self._lazy_record(meta) for meta in changed.values()]
+
+        # Another process wrote a new index. Records held in memory are kept
+        # and returned as they are now for the caller to merge. Any other
+        # automation whose metadata was rewritten changed since our snapshot;
+        # those are read into the table and returned as the table holds them.
+        previous = self._snapshot
+        known = set(previous.meta_offsets) if previous is not None else set()
+        held = dict(self._table._records)
+        replayed = self._open()
+        for automation_id, record in held.items():
+            self._table[automation_id] = record
+        db["versions"].clear()
+        db["blobs"].clear()
+
+        changed: Dict[int, Dict[str, Any]] = {}
+        snapshot = self._snapshot
+        if snapshot is not None:
+            for automation_id, offset in zip(snapshot.ids.tolist(), snapshot.meta_offsets.tolist()):
+                if automation_id in held:
+                    changed[automation_id] = self._materialize(snapshot, snapshot.row(automation_id))
+                elif offset not in known:
+                    changed[automation_id] = self._table[automation_id]
+            db["next_id"] = max(db.get("next_id", 1), snapshot.header["next_id"])
+        changed.update((automation_id, self._lazy_record(meta)) for automation_id, meta in replayed.items())
+        return list(changed.values())
+
+    def load_versions(self, automation_id: int) -> List[Dict[str, Any]]:
+        ref = self._version_refs.get(automation_id)
+        if ref is None and self._snapshot is not None:
+            row = self._snapshot.row(automation_id)
+            ref = self._snapshot.ref(row, "version") if row is not None else None
+        return self._read_json(ref) if ref is not None and ref[1] else []
+
+    def load_blob(self, script_hash: str) -> Optional[Dict[str, Any]]:
+        ref = self._blob_refs.get(script_hash)
+        if ref is None and self._snapshot is not None:
+            ref = self._snapshot.blob_ref(script_hash)
+        return self._read_json(ref) if ref is not None else None
+
+    def _meta(self, automation: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(automation, AutomationRecord):
+            return automation.metadata()
+        return {key: value for key, value in automation.items() if key != "script"}
+
+    def _stored_script_hash(self, automation: Dict[str, Any]) -> Optional[str]:
+        """Hash of the script body stored for an automation, if any."""
+        if isinstance(automation, LazyRecord) and not automation.script_loaded:
+            # A body that was never loaded cannot have changed
+            return automation["script_hash"]
+        if automation["id"] in self._script_refs:
+            return self._script_refs[automation["id"]][0]
+        if self._snapshot is not None and self._snapshot.row(automation["id"]) is not None:
+            return self._snapshot_meta(self._snapshot, automation["id"])["script_hash"]
+        return None
+
+    def _automation_entries(self, automations: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Index entries for automations, appending any script body not yet in the data file."""
+        automations = list(automations)
+        changed = [automation for automation in automations
+                   if self._stored_script_hash(automation) != automation["script_hash"]]
+        refs = self._append_data([automation["script"].encode('utf-8') for automation in changed])
+        for automation, ref in zip(changed, refs):
+            self._script_refs[automation["id"]] = (automation["script_hash"], *ref)
+
+        entries = []
+        changed_ids = {automation["id"] for automation in changed}
+        for automation in automations:
+            entry = {"op": "automation", "data": self._meta(automation)}
+            if automation["id"] in changed_ids:
+                entry["script"] = list(self._script_refs[automation["id"]][1:])
+            entries.append(entry)
+        return entries
+
+    def _append(self, db: Dict[str, Any], entries: List[Dict[str, Any]]) -> None:
+        self._logged_entries += len(entries)
+        super()._append(db, entries)
+
+    def _compaction_due(self) -> bool:
+        return self._logged_entries >= max(self.compact_every, len(self._table) // 8)
+
+    def should_compact_on_close(self) -> bool:
+        return self._logged_entries >= self.compact_every
+
+    def save_automation(self, db: Dict[str, Any], automation: Dict[str, Any]) -> None:
+        self._append(db, self._automation_entries([automation]))
+
+    def save_automations(self, db: Dict[str, Any], automations: List[Dict[str, Any]]) -> None:
+        self._append(db, self._automation_entries(automations))
+
+    def save_batch(self,
+                   db: Dict[str, Any],
+                   automations: List[Dict[str, Any]],
+                   versions: List[Tuple[int, Dict[str, Any]]],
+                   blobs: Iterable[str] = ()) -> None:
+        entries = self._automation_entries(automations)
+
+        history_ids = list(dict.fromkeys(int(automation_id) for automation_id, _ in versions))
+        hashes = [script_hash for script_hash in dict.fromkeys(
+            [version["script_hash"] for _, version in versions] + list(blobs)) if script_hash in db["blobs"]]
+        payloads = [json.dumps(db["versions"][str(automation_id)], default=json_default).encode('utf-8') for automation_id in history_ids]
+        payloads.extend(json.dumps(db["blobs"][script_hash]).encode('utf-8') for script_hash in hashes)
+        refs = self._append_data(payloads)
+
+        for automation_id, ref in zip(history_ids, refs):
+            self._version_refs[automation_id] = ref
+            entries.append({"op": "versions", "id": automation_id, "ref": list(ref)})
+        for script_hash, ref in zip(hashes, refs[len(history_ids):]):
+            self._blob_refs[script_hash] = ref
+            entries.append({"op": "blob", "hash": script_hash, "ref": list(ref)})
+        self._append(db, entries)
+
+    def _changed_rows(self, records: Dict[int, AutomationRecord]) -> List[Tuple[int, ...]]:
+        """Index rows of automations changed since the snapshot, appending their metadata to the data file."""
+        snapshot = self._snapshot
+        self._automation_entries(record for record in records.values()
+                                 if not isinstance(record, LazyRecord) or record.script_loaded)
+        meta_refs: Dict[int, Ref] = {}
+        payloads: Dict[int, bytes] = {}
+        for automation_id in sorted(records):
+            payload = json.dumps(self._meta(records[automation_id]), default=json_default).encode('utf-8')
+            row = snapshot.row(automation_id) if snapshot is not None else None
+            if row is not None and self._read(snapshot.ref(row, "meta")) == payload:
+                # Unchanged metadata keeps its place, so other processes can tell it did not change
+                meta_refs[automation_id] = snapshot.ref(row, "meta")
+            else:
+                payloads[automation_id] = payload
+        meta_refs.update(zip(payloads, self._append_data(list(payloads.values()))))
+
+        rows = []
+        for automation_id in sorted(set(records) | set(self._script_refs) | set(self._version_refs)):
+            row = snapshot.row(automation_id) if snapshot is not None else None
+            if row is None and automation_id not in meta_refs:
+                continue
+            meta = meta_refs[automation_id] if automation_id in meta_refs else snapshot.ref(row, "meta")
+            if automation_id in self._script_refs:
+                script = self._script_refs[automation_id][1:]
+            else:
+                script = snapshot.ref(row, "script")
+            if automation_id in self._version_refs:
+                versions = self._version_refs[automation_id]
+            else:
+                versions = snapshot.ref(row, "version") if row is not None else (0, 0)
+            rows.append((automation_id, *meta, *script, *versions))
+        return rows
+
+    def _blob_sections(self) -> Tuple[bytes, List[array], int]:
+        """Blob keys and refs of the snapshot merged with the ones written since."""
+        snapshot = self._snapshot
+        columns = [array(typecode) for _, typecode in BLOB_COLUMNS]
+        if snapshot is not None:
+            keys = snapshot.blob_keys
+            sources = [getattr(snapshot, name) for name, _ in BLOB_COLUMNS]
+        else:
+            keys = _FixedWidthKeys(memoryview(b""), 0)
+            sources = [memoryview(array(typecode)) for _, typecode in BLOB_COLUMNS]
+        width = max([keys.width] + [len(key.encode('utf-8')) for key in self._blob_refs])
+        changed = {_pad(key, width): ref for key, ref in self._blob_refs.items()}
+        if width != keys.width:
+            # Every key is padded anew, so none can be copied as they are
+            for position in range(len(keys)):
+                key = _pad(keys[position].rstrip(b"\0").decode('utf-8'), width)
+                changed.setdefault(key, (sources[0][position], sources[1][position]))
+            keys = _FixedWidthKeys(memoryview(b""), width)
+
+        merged = bytearray()
+        position = 0
+        for key in sorted(changed):
+            found = bisect_left(keys, key, position)
+            merged += keys.data[position * width:found * width]
+            _copy_rows(columns, sources, position, found)
+            if found < len(keys) and keys[found] == key:
+                found += 1
+            merged += key
+            for column, value in zip(columns, changed[key]):
+                column.append(value)
+            position = found
+        merged += keys.data[position * width:len(keys) * width]
+        _copy_rows(columns, sources, position, len(keys))
+        return bytes(merged), columns, width
+
+    def save_snapshot(self, db: Dict[str, Any]) -> None:
+        """Compact the log into a new index; the data file is only ever appended to."""
+        snapshot, table = self._snapshot, self._table
+        records = dict(table._records)
+        columns = [array(typecode) for _, typecode in ROW_COLUMNS]
+        if snapshot is not None:
+            sources = snapshot.columns
+        else:
+            sources = [memoryview(array(typecode)) for _, typecode in ROW_COLUMNS]
+        _merge_rows(columns, sources, 0, len(sources[0]), table._removed, self._changed_rows(records))
+        blob_keys, blob_columns, width = self._blob_sections()
+
+        search_index = self._search_index
+        if search_index is None:
+            search_index = SearchIndex(base=self._search_base(snapshot))
+            for automation_id in table._removed:
+                search_index.remove(automation_id)
+            for record in records.values():
+                search_index.add(record)
+        search_header, search_sections = search_index.export()
+
+        sections: Dict[str, Any] = {name: column for (name, _), column in zip(ROW_COLUMNS, columns)}
+        sections["blob_keys"] = blob_keys
+        sections.update((name, column) for (name, _), column in zip(BLOB_COLUMNS, blob_columns))
+        sections.update((f"search.{name}", section) for name, section in search_sections.items())
+        header = {
+            "format": CATALOG_FORMAT,
+            "byteorder": sys.byteorder,
+            "next_id": db.get("next_id", 1),
+            "blob_key_width": width,
+            "search": search_header,
+        }
+        self.bytes_written += _write_index(self.path, header, sections)
+        self._truncate_log()
+        self._rebase(_Snapshot(self.path))
+
+    def _truncate_log(self) -> None:
+        super()._truncate_log()
+        self._logged_entries = 0
+
+    def close(self) -> None:
+        super().close()
+        with self._data_lock:
+            if self._data_file is not None:
+                self._data_file.close()
+                self._data_file = None
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+
+STORAGE_BACKENDS["catalog"] = MappedCatalogBackend
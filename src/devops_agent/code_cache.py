@@ -0,0 +1,40 @@
+import threading
+from collections import OrderedDict
+from types import CodeType
+
+
+class CodeCache:
+    """LRU cache of compiled Python automation code objects keyed by script hash."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CodeType]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, script_hash: str) -> bool:
+        return script_hash in self._entries
+
+    def put(self, script_hash: str, code: CodeType) -> None:
+        with self._lock:
+            self._entries[script_hash] = code
+            self._entries.move_to_end(script_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compile(self, script_hash: str, script: str) -> CodeType:
+        """Return the cached code object for ``script_hash``, compiling on a miss."""
+        with self._lock:
+            code = self._entries.get(script_hash)
+            if code is not None:
+                self._entries.move_to_end(script_hash)
+                self.hits += 1
+                return code
+            self.misses += 1
+        code = compile(script, '<string>', 'exec')
+        self.put(script_hash, code)
+        return code
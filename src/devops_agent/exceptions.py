@@ -4,4 +4,12 @@ class ValidationError(Exception):
 
 class AuthenticationError(Exception):
     """Raised when authentication fails."""
-    pass 
\ No newline at end of file
+    pass
+
+class ExecutionError(Exception):
+    """Raised when an automation fails inside a worker process."""
+    pass
+
+class ConflictError(Exception):
+    """Raised when a record changed since the version an update was based on."""
+    pass
@@ -0,0 +1,106 @@
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import CodeType
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .workers import PythonWorkerPool
+
+
+class ExecutionEngine:
+    """Runs automations on bounded worker pools with global and per-user limits.
+
+    Submissions beyond either limit wait in a FIFO queue instead of occupying
+    a worker thread, so one busy user cannot starve the others.
+    """
+
+    def __init__(self,
+                 max_workers: int = 8,
+                 process_workers: int = 0,
+                 max_concurrency: Optional[int] = None,
+                 max_per_user: Optional[int] = None,
+                 worker_max_runs: int = 100,
+                 worker_max_memory_mb: Optional[int] = None):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self.max_per_user = max_per_user
+        self.thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="automation")
+        self.process_pool = PythonWorkerPool(
+            size=process_workers,
+            max_runs=worker_max_runs,
+            max_memory_mb=worker_max_memory_mb
+        ) if process_workers else None
+        # Re-entrant: a task that finishes immediately runs its done callback
+        # while the submitting thread still holds the lock.
+        self._lock = threading.RLock()
+        self._running = 0
+        self._running_per_user: Dict[str, int] = defaultdict(int)
+        self._pending: Deque[Tuple[str, Callable[[], Any], Future]] = deque()
+        self._closed = False
+
+    def _can_start(self, user_id: str) -> bool:
+        if self._running >= self.max_concurrency:
+            return False
+        return self.max_per_user is None or self._running_per_user[user_id] < self.max_per_user
+
+    def _start(self, user_id: str, task: Callable[[], Any], future: Future) -> None:
+        self._running += 1
+        self._running_per_user[user_id] += 1
+        inner = self.thread_pool.submit(task)
+        inner.add_done_callback(lambda done: self._finish(user_id, done, future))
+
+    def _finish(self, user_id: str, done: Future, future: Future) -> None:
+        # Resolve first, so a failure to start the next task cannot leave this one hanging
+        if done.cancelled():
+            future.cancel()
+        elif done.exception() is not None:
+            future.set_exception(done.exception())
+        else:
+            future.set_result(done.result())
+        with self._lock:
+            self._running -= 1
+            self._running_per_user[user_id] -= 1
+            if not self._running_per_user[user_id]:
+                del self._running_per_user[user_id]
+            self._drain()
+
+    def _drain(self) -> None:
+        """Start queued tasks whose users are under their limit, oldest first."""
+        if self._closed:
+            return
+        skipped: Deque[Tuple[str, Callable[[], Any], Future]] = deque()
+        while self._pending and self._running < self.max_concurrency:
+            user_id, task, future = self._pending.popleft()
+            if future.cancelled():
+                continue
+            if not self._can_start(user_id):
+                skipped.append((user_id, task, future))
+            elif future.set_running_or_notify_cancel():
+                self._start(user_id, task, future)
+        self._pending.extendleft(reversed(skipped))
+
+    def submit(self, user_id: str, task: Callable[[], Any]) -> Future:
+        """Schedule ``task`` on behalf of ``user_id`` and return its future."""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot schedule new automations after shutdown")
+            self._pending.append((user_id, task, future))
+            self._drain()
+        return future
+
+    def run_python(self, script_hash: str, code: CodeType, params: Optional[Dict[str, Any]],
+                   timeout: Optional[float]) -> Any:
+        """Run a Python automation in a worker process, waiting at most ``timeout`` seconds."""
+        return self.process_pool.run(script_hash, code, params, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting tasks and cancel the queued ones; tasks already started run to completion."""
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, deque()
+        for _, _, future in pending:
+            future.cancel()
+        self.thread_pool.shutdown(wait=wait)
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
@@ -0,0 +1,238 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from .exceptions import ExecutionError
+
+# Runs a Python automation in a fresh interpreter: the request arrives as JSON on
+# stdin and the result leaves as JSON on stdout, so the script's own prints go to stderr
+_PYTHON_RUNNER = """\
+import contextlib, json, sys
+request = json.load(sys.stdin)
+scope = {"params": request["params"]}
+with contextlib.redirect_stdout(sys.stderr):
+    exec(compile(request["script"], "<automation>", "exec"), scope)
+json.dump({"result": scope.get("result")}, sys.stdout, default=repr)
+"""
+
+
+class Transport(ABC):
+    """Carries one run of an automation to a target, e.g. a host reached over SSH.
+
+    ``run`` returns the run's result or raises on failure; the agent turns
+    either into the usual result dict.
+    """
+
+    @abstractmethod
+    def run(self, automation: Mapping[str, Any], params: Dict[str, Any], timeout: Optional[float]) -> Any:
+        ...
+
+
+class LocalTransport(Transport):
+    """Runs every target in a local subprocess, standing in for remote hosts.
+
+    Shell scripts see each target param as an environment variable named
+    ``env_prefix`` plus the upper-cased key; Python scripts get the usual
+    ``params`` global in a fresh interpreter. A non-zero exit is a failure.
+    """
+
+    def __init__(self,
+                 env_prefix: str = "",
+                 shells: Optional[Dict[str, Sequence[str]]] = None,
+                 python: str = sys.executable):
+        self.env_prefix = env_prefix
+        self.shells = shells or {"bash": ["bash", "-c"], "powershell": ["pwsh", "-NoProfile", "-Command"]}
+        self.python = python
+
+    def _environment(self, params: Dict[str, Any]) -> Dict[str, str]:
+        env = dict(os.environ)
+        for key, value in params.items():
+            env[f"{self.env_prefix}{key}".upper()] = value if isinstance(value, str) else json.dumps(value)
+        return env
+
+    def run(self, automation: Mapping[str, Any], params: Dict[str, Any], timeout: Optional[float]) -> Any:
+        script_type = automation["script_type"]
+        if script_type == "python":
+            completed = subprocess.run(
+                [self.python, "-c", _PYTHON_RUNNER],
+                input=json.dumps({"script": automation["script"], "params": params}),
+                capture_output=True, text=True, timeout=timeout
+            )
+        else:
+            completed = subprocess.run(
+                [*self.shells[script_type], automation["script"]],
+                env=self._environment(params), capture_output=True, text=True, timeout=timeout
+            )
+        if completed.returncode != 0:
+            detail = completed.stderr.strip().splitlines()[-1:] or [completed.stdout.strip()[-200:]]
+            raise ExecutionError(f"Exited with status {completed.returncode}: {detail[0]}")
+        if script_type == "python":
+            return json.loads(completed.stdout)["result"]
+        return {"returncode": completed.returncode, "stdout": completed.stdout, "stderr": completed.stderr}
+
+
+def _outcome(done: Future) -> Dict[str, Any]:
+    if done.cancelled():
+        return {"success": False, "skipped": True, "error": "Cancelled"}
+    if done.exception() is not None:
+        return {"success": False, "error": str(done.exception())}
+    return done.result()
+
+
+class FanOut:
+    """One automation run against many targets, at most ``max_parallel`` at a time.
+
+    Iterating yields one record per target as it finishes: the run's
+    result dict plus ``target`` (its index) and ``params``. Once more than
+    ``max_failures`` targets have failed, no further targets are started.
+    Each of those is reported with ``"skipped": True``, as are targets that
+    could not be started at all, e.g. because the agent shut down. Runs
+    already in flight still finish and are reported as usual.
+
+    Targets are started from one launcher thread. Completions only record
+    the result and wake the launcher, so a run that finishes as soon as it
+    is submitted never starts the next one from its own call stack.
+    """
+
+    def __init__(self,
+                 targets: List[Dict[str, Any]],
+                 submit: Callable[[Dict[str, Any]], Future],
+                 max_parallel: int,
+                 max_failures: Optional[int] = None):
+        if max_parallel < 1:
+            raise ValueError("max_parallel must be at least 1")
+        self.targets = targets
+        self.max_parallel = max_parallel
+        self.max_failures = max_failures
+        self._submit = submit
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._records: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._done = threading.Event()
+        self._next = 0
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.failed_targets: List[int] = []
+        self.aborted: Optional[str] = None
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    def start(self) -> "FanOut":
+        if self.targets:
+            threading.Thread(target=self._launch, name="fanout-launcher", daemon=True).start()
+        self._check_finished()
+        return self
+
+    def _launch(self) -> None:
+        """Start targets whenever the window has room, until none are left or the run was aborted."""
+        while True:
+            with self._slot_freed:
+                while not self.aborted and self._next < len(self.targets) and self.running >= self.max_parallel:
+                    self._slot_freed.wait()
+                if self.aborted or self._next >= len(self.targets):
+                    return
+                index = self._next
+                self._next += 1
+                self.running += 1
+            try:
+                future = self._submit(self.targets[index])
+            except Exception as e:
+                # Not the target's fault, so it and the rest are skipped rather than failed
+                reason = f"Could not start target {index}: {e}"
+                with self._lock:
+                    self.running -= 1
+                    if self.aborted:
+                        self.skipped += 1
+                        pending = range(index, index + 1)
+                    else:
+                        self._next = index
+                        pending = self._stop(reason)
+                self._report_skipped(pending, reason)
+                self._check_finished()
+                return
+            future.add_done_callback(lambda done, index=index: self._complete(index, _outcome(done)))
+
+    def _complete(self, index: int, result: Dict[str, Any]) -> None:
+        record = dict(result, target=index, params=self.targets[index])
+        pending, reason = range(0), None
+        with self._slot_freed:
+            self.running -= 1
+            if record.get("skipped"):
+                self.skipped += 1
+            elif record["success"]:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+                self.failed_targets.append(index)
+                if self.max_failures is not None and self.failed > self.max_failures and not self.aborted:
+                    # Decided before the launcher wakes, so no further target slips in
+                    reason = f"Aborted after {self.failed} failed targets"
+                    pending = self._stop(reason)
+            self._slot_freed.notify()
+        self._records.put(record)
+        self._report_skipped(pending, reason)
+        self._check_finished()
+
+    def abort(self, reason: str = "Aborted") -> None:
+        """Start no further targets; runs in flight still finish."""
+        with self._lock:
+            if self.aborted:
+                return
+            pending = self._stop(reason)
+        self._report_skipped(pending, reason)
+        self._check_finished()
+
+    def _stop(self, reason: str) -> range:
+        """Mark the run aborted and return the targets it skips; the lock must be held."""
+        self.aborted = reason
+        pending = range(self._next, len(self.targets))
+        self._next = len(self.targets)
+        self.skipped += len(pending)
+        self._slot_freed.notify()
+        return pending
+
+    def _report_skipped(self, pending: range, reason: Optional[str]) -> None:
+        for index in pending:
+            self._records.put({"success": False, "skipped": True, "error": reason,
+                               "target": index, "params": self.targets[index]})
+
+    def _check_finished(self) -> None:
+        with self._lock:
+            if self.succeeded + self.failed + self.skipped < len(self.targets):
+                return
+            if self._finished is None:
+                self._finished = time.perf_counter()
+        self._done.set()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Per-target records in completion order; meant to be consumed once."""
+        for _ in range(len(self.targets)):
+            yield self._records.get()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every target has finished or been skipped."""
+        return self._done.wait(timeout)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate counts so far; ``aborted`` holds the reason once the run was cut short."""
+        with self._lock:
+            end = self._finished if self._finished is not None else time.perf_counter()
+            return {
+                "total": len(self.targets),
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "running": self.running,
+                "failed_targets": list(self.failed_targets),
+                "aborted": self.aborted,
+                "duration_s": round(end - self._started, 6),
+            }
@@ -0,0 +1,178 @@
+import atexit
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+DEFAULT_LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'devops_agent.logging_config.JSONFormatter',
+        },
+    },
+    'handlers': {
+        'file': {
+            'class': 'devops_agent.logging_config.RotatingLogHandler',
+            'filename': 'devops_agent.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        '': {
+            'handlers': ['file'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# (logger, queue handler, listener) for every logger moved behind a queue
+_queued: List[Tuple[logging.Logger, logging.Handler, logging.handlers.QueueListener]] = []
+_configure_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed with ``extra=``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file reaches ``maxBytes`` and, with ``interval`` seconds, also by age.
+
+    Backups are numbered as with ``RotatingFileHandler``, so a size-triggered
+    rollover never overwrites a time-triggered one. Missing parent
+    directories are created.
+    """
+
+    def __init__(self,
+                 filename: str,
+                 maxBytes: int = 0,
+                 backupCount: int = 0,
+                 interval: Optional[float] = None,
+                 encoding: Optional[str] = 'utf-8',
+                 delay: bool = True):
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=delay)
+        self.interval = interval
+        self.rollover_at = time.time() + interval if interval else None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.interval:
+            self.rollover_at = time.time() + self.interval
+
+
+def _resolve_local(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Point references to this module at the loaded classes.
+
+    The package is importable both as ``devops_agent`` and ``src.devops_agent``,
+    so dotted names in a config may not resolve on their own.
+    """
+    config = copy.deepcopy(config)
+    prefix = "devops_agent.logging_config."
+    for section in ("formatters", "handlers"):
+        for entry in config.get(section, {}).values():
+            for key in ("()", "class"):
+                name = entry.get(key)
+                if isinstance(name, str) and name.startswith(prefix):
+                    # Only factories ("()") may be given as objects rather than dotted names
+                    del entry[key]
+                    entry["()"] = globals()[name[len(prefix):]]
+    return config
+
+
+def default_config() -> Dict[str, Any]:
+    """``config.settings.LOGGING`` when the project settings are importable, else ``DEFAULT_LOGGING``."""
+    try:
+        from config.settings import LOGGING
+    except ImportError:
+        return DEFAULT_LOGGING
+    return LOGGING
+
+
+def _move_behind_queue(logger: logging.Logger) -> None:
+    """Swap the logger's handlers for a queue drained by a background listener thread."""
+    handlers = [handler for handler in logger.handlers if not isinstance(handler, logging.handlers.QueueHandler)]
+    if not handlers:
+        return
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    queue_handler = logging.handlers.QueueHandler(records)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    listener.start()
+    _queued.append((logger, queue_handler, listener))
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> None:
+    """Apply a ``logging.config.dictConfig`` configuration with queued, non-blocking handlers.
+
+    Callers only enqueue records; the configured handlers write them from a
+    listener thread. Without ``config``, logging is left alone if the
+    application already configured the root logger, like ``logging.basicConfig``.
+    """
+    with _configure_lock:
+        if config is None:
+            if _queued or logging.getLogger().handlers:
+                return
+            config = default_config()
+        _stop_listeners()
+        config = _resolve_local(config)
+        for handler in config.get("handlers", {}).values():
+            if "filename" in handler:
+                Path(handler["filename"]).parent.mkdir(parents=True, exist_ok=True)
+        logging.config.dictConfig(config)
+        for name in config.get("loggers", {}):
+            _move_behind_queue(logging.getLogger(name or None))
+        if "root" in config:
+            _move_behind_queue(logging.getLogger())
+
+
+def _stop_listeners() -> None:
+    while _queued:
+        logger, queue_handler, listener = _queued.pop()
+        logger.removeHandler(queue_handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener threads."""
+    with _configure_lock:
+        _stop_listeners()
+
+
+atexit.register(shutdown_logging)
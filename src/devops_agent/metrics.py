@@ -0,0 +1,253 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as Tally
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds, from sub-millisecond lookups to long-running scripts
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Latency distribution over fixed buckets, as Prometheus expects."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile, capped at the observed maximum."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if seen >= rank:
+                    return min(bound, self.max)
+            return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum_s": round(self.sum, 6),
+            "mean_ms": round(self.sum / self.count * 1000, 4) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 4),
+            "p95_ms": round(self.quantile(0.95) * 1000, 4),
+            "max_ms": round(self.max * 1000, 4),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Counters, histograms and timing spans, exportable as Prometheus text.
+
+    Values that other components already count (cache hits, bytes written)
+    are pulled at export time through callbacks instead of being mirrored.
+    """
+
+    def __init__(self, namespace: str = "devops_agent"):
+        self.namespace = namespace
+        self._families: Dict[str, Dict[str, Any]] = {}
+        self._callbacks: Dict[str, Tuple[str, str, Callable[[], List[Sample]]]] = {}
+        self._lock = threading.Lock()
+
+    def _series(self, kind: str, name: str, help_text: str, labels: Dict[str, str], factory: Callable[[], Any]):
+        key: Labels = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is not None:
+            series = family["series"].get(key)
+            if series is not None:
+                return series
+        with self._lock:
+            family = self._families.setdefault(name, {"kind": kind, "help": help_text, "series": {}})
+            return family["series"].setdefault(key, factory())
+
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Counter:
+        return self._series("counter", name, help_text, labels, Counter)
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> Histogram:
+        return self._series("histogram", name, help_text, labels, Histogram)
+
+    def register_callback(self, name: str, kind: str, help_text: str, collect: Callable[[], List[Sample]]) -> None:
+        """Export ``collect()``'s ``(labels, value)`` samples as a counter or gauge named ``name``."""
+        with self._lock:
+            self._callbacks[name] = (kind, help_text, collect)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block into the ``span_seconds`` histogram."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram("span_seconds", "Time spent in instrumented agent operations",
+                           span=name).observe(time.perf_counter() - started)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            families = [(name, family["kind"], family["help"], list(family["series"].items()))
+                        for name, family in sorted(self._families.items())]
+            callbacks = sorted(self._callbacks.items())
+        for name, kind, help_text, series in families:
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for key, metric in series:
+                labels = dict(key)
+                if kind == "counter":
+                    lines.append(f"{full_name}{_format_labels(labels)} {metric.value}")
+                    continue
+                with metric._lock:
+                    counts, total, count = list(metric.counts), metric.sum, metric.count
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{full_name}_bucket{_format_labels(dict(labels, le=le))} {cumulative}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+        for name, (kind, help_text, collect) in callbacks:
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in collect():
+                lines.append(f"{full_name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of every metric as plain data, keyed by name and then by label values
+        joined in label-name order, e.g. ``stats()["executions_total"]["success,python"]``.
+        """
+        result: Dict[str, Any] = {}
+        with self._lock:
+            families = [(name, family["kind"], list(family["series"].items()))
+                        for name, family in self._families.items()]
+            callbacks = list(self._callbacks.items())
+        for name, kind, series in families:
+            entries = result.setdefault(name, {})
+            for key, metric in series:
+                label = ",".join(value for _, value in key) or "total"
+                entries[label] = metric.value if kind == "counter" else metric.summary()
+        for name, (_, _, collect) in callbacks:
+            entries = result.setdefault(name, {})
+            for labels, value in collect():
+                entries[",".join(labels.values()) or "total"] = value
+        return result
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve ``/metrics`` over HTTP from a daemon thread; call ``shutdown()`` on the result to stop."""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of every other thread at a fixed interval.
+
+    ``folded()`` returns the samples in the collapsed-stack format that
+    flame graph tools read; ``top()`` counts the innermost frames.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Tally = Tally()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="devops-agent-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.folded()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> Dict[str, int]:
+        return dict(self.samples)
+
+    def top(self, limit: int = 20) -> List[Tuple[str, int]]:
+        leaves: Tally = Tally()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
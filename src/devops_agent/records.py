@@ -0,0 +1,229 @@
+import sys
+from collections.abc import Mapping, MutableMapping, ValuesView
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# Every distinct tag combination is stored once and shared by all records using it
+_TAG_SETS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def intern_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    """Shared tuple of interned tag strings for ``tags``."""
+    key = tuple(_intern(tag) for tag in tags)
+    return _TAG_SETS.setdefault(key, key)
+
+
+def _pack_hash(value: Any) -> Any:
+    """Hex digests as raw bytes; anything that would not round-trip is kept as is."""
+    if type(value) is str:
+        try:
+            packed = bytes.fromhex(value)
+        except ValueError:
+            return value
+        if packed.hex() == value:
+            return packed
+    return value
+
+
+def _unpack_hash(value: Any) -> Any:
+    return value.hex() if type(value) is bytes else value
+
+
+def _pack_timestamp(value: Any) -> Any:
+    """ISO timestamps as datetimes, which are smaller than their text; others are kept as is."""
+    if type(value) is str:
+        try:
+            packed = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if packed.isoformat() == value:
+            return packed
+    return value
+
+
+def _unpack_timestamp(value: Any) -> Any:
+    return value.isoformat() if type(value) is datetime else value
+
+
+class SlottedRecord(MutableMapping):
+    """Mapping over ``__slots__`` fields, for records held in memory by the million.
+
+    Each name in ``_fields`` is a slot of the same name; a slot that was
+    never set is a missing key. ``_encoders`` compact values on the way in
+    and ``_decoders`` restore their public form on the way out, so callers
+    see the same values a plain dict would hold. Keys outside ``_fields``
+    go to a small overflow dict that only exists when needed.
+    """
+
+    __slots__ = ("_extra",)
+
+    _fields: Tuple[str, ...] = ()
+    _field_set: frozenset = frozenset()
+    _encoders: Dict[str, Callable[[Any], Any]] = {}
+    _decoders: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self, data: Mapping = ()):
+        self._extra: Optional[Dict[str, Any]] = None
+        for key, value in dict(data).items():
+            self[key] = value
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls._fields)
+
+    def _missing(self, key: str) -> Any:
+        raise KeyError(key)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                return self._missing(key)
+            decode = self._decoders.get(key)
+            return value if decode is None else decode(value)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            encode = self._encoders.get(key)
+            setattr(self, key, value if encode is None else encode(value))
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+            if not self._extra:
+                self._extra = None
+        else:
+            raise KeyError(key)
+
+    def _has(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._field_set:
+            return self._has(key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._fields:
+            if self._has(key):
+                yield key
+        if self._extra is not None:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def clear(self) -> None:
+        for key in self._fields:
+            if hasattr(self, key):
+                delattr(self, key)
+        self._extra = None
+
+    def peek(self, key: str) -> Any:
+        """Read a field without keeping a lazily loaded value in memory."""
+        return self[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy of the record, e.g. for JSON."""
+        return {key: self.peek(key) for key in self}
+
+    copy = to_dict
+
+    def __reduce__(self):
+        return (type(self), (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class AutomationRecord(SlottedRecord):
+    """In-memory automation: tags and ``script_type`` are interned, ``script_hash`` is kept as bytes."""
+
+    _fields = ("id", "question", "script", "script_type", "tags", "created_at",
+               "created_by", "times_used", "version", "script_hash")
+    __slots__ = _fields
+    _encoders = {
+        "script_type": _intern,
+        "tags": intern_tags,
+        "created_at": _pack_timestamp,
+        "created_by": _intern,
+        "script_hash": _pack_hash,
+    }
+    _decoders = {
+        "tags": list,
+        "created_at": _unpack_timestamp,
+        "script_hash": _unpack_hash,
+    }
+
+    @property
+    def script_loaded(self) -> bool:
+        """Whether the script body is held in memory."""
+        return hasattr(self, "script")
+
+    def metadata(self) -> Dict[str, Any]:
+        """Every field except the script body, without loading it."""
+        return {key: self[key] for key in self if key != "script"}
+
+    def assign(self, other: Mapping) -> None:
+        """Replace all fields with ``other``'s in place, keeping references to this record valid."""
+        self.clear()
+        if isinstance(other, AutomationRecord):
+            for key in self._fields:
+                if hasattr(other, key):
+                    setattr(self, key, getattr(other, key))
+            self._extra = dict(other._extra) if other._extra else None
+        else:
+            self.update({key: value for key, value in other.items() if key != "script"})
+        if "script" not in self and "script" in other:
+            self["script"] = other["script"]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, AutomationRecord):
+            # script_hash identifies the script, so a body that is not loaded need not be read
+            return self.metadata() == other.metadata()
+        return super().__eq__(other)
+
+    __hash__ = None
+
+
+class VersionRecord(SlottedRecord):
+    """One entry of an automation's version history."""
+
+    _fields = ("version", "script_hash", "modified_at", "modified_by")
+    __slots__ = _fields
+    _encoders = {"modified_at": _pack_timestamp, "modified_by": _intern, "script_hash": _pack_hash}
+    _decoders = {"modified_at": _unpack_timestamp, "script_hash": _unpack_hash}
+
+
+def as_automation(data: Mapping) -> AutomationRecord:
+    return data if isinstance(data, AutomationRecord) else AutomationRecord(data)
+
+
+def as_version(data: Mapping) -> VersionRecord:
+    return data if isinstance(data, VersionRecord) else VersionRecord(data)
+
+
+def json_default(value: Any) -> Any:
+    """``default`` for ``json.dump`` so records serialize like the dicts they stand in for."""
+    if isinstance(value, SlottedRecord):
+        return value.to_dict()
+    if isinstance(value, ValuesView):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def params_key(script_hash: str, params: Optional[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+    """Cache key for a run of ``script_hash`` with ``params``, or None if params are not JSON."""
+    try:
+        canonical = json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return (script_hash, canonical)
+
+
+class ResultCache:
+    """TTL cache of execution results with single-flight coalescing.
+
+    While a result is being computed, identical requests wait for it instead
+    of starting their own run, and all of them receive the same value.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_run(self,
+                   key: Hashable,
+                   ttl: float,
+                   run: Callable[[], Any],
+                   should_cache: Callable[[Any], bool] = lambda value: True) -> Tuple[Any, bool]:
+        """Return ``(value, shared)`` for ``key``, calling ``run`` only if nobody else is.
+
+        ``shared`` is False only for the caller whose ``run`` produced the
+        value. Values for which ``should_cache`` is false are still handed to
+        concurrent waiters but not kept afterwards.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], True
+                del self._entries[key]
+            pending = self._inflight.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._inflight[key] = Future()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            return pending.result(), True
+
+        try:
+            value = run()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            if ttl > 0 and should_cache(value):
+                self._entries[key] = (time.monotonic() + ttl, value)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        pending.set_result(value)
+        return value, False
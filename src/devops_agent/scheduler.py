@@ -0,0 +1,381 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+MISFIRE_POLICIES = ("run_once", "run_all", "skip")
+
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class IntervalTrigger:
+    """Fires every ``seconds`` on a fixed grid anchored at ``start`` (default: creation time)."""
+
+    def __init__(self, seconds: float, start: Optional[float] = None):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.start = time.time() if start is None else start
+
+    def next_after(self, moment: float) -> float:
+        """First fire time strictly after ``moment``."""
+        if moment < self.start:
+            return self.start
+        following = self.start + ((moment - self.start) // self.seconds + 1) * self.seconds
+        # Rounding can land back on ``moment`` itself
+        return following if following > moment else following + self.seconds
+
+    def describe(self) -> Dict[str, Any]:
+        return {"interval": self.seconds}
+
+
+class CronTrigger:
+    """Five-field cron expression (minute hour day-of-month month day-of-week) in local time.
+
+    Fields accept ``*``, numbers, ``a-b`` ranges, ``/step`` and comma lists;
+    day-of-week counts from 0 (Sunday), with 7 also meaning Sunday. As in
+    cron, when both day fields are restricted a day matching either fires.
+    The ``@hourly``/``@daily``/``@weekly``/``@monthly``/``@yearly`` aliases
+    are understood.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = CRON_ALIASES.get(self.expression, self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression {expression!r} must have 5 fields")
+        self._minutes = sorted(self._parse(fields[0], 0, 59))
+        self.hours = self._parse(fields[1], 0, 23)
+        self.days = self._parse(fields[2], 1, 31)
+        self.months = self._parse(fields[3], 1, 12)
+        self.weekdays = {day % 7 for day in self._parse(fields[4], 0, 7)}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> set:
+        values = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            try:
+                step_size = int(step) if step else 1
+                if span == "*":
+                    start, end = low, high
+                elif "-" in span:
+                    start, end = (int(value) for value in span.split("-", 1))
+                else:
+                    start = int(span)
+                    end = high if step else start
+            except ValueError:
+                raise ValueError(f"Invalid cron field {field!r}") from None
+            if step_size < 1 or start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+            values.update(range(start, end + 1, step_size))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: float) -> float:
+        """First fire time strictly after ``moment``."""
+        candidate = datetime.fromtimestamp(moment).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        last_year = candidate.year + 5
+        while candidate.year <= last_year:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            else:
+                index = bisect_left(self._minutes, candidate.minute)
+                if index == len(self._minutes):
+                    candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                else:
+                    return candidate.replace(minute=self._minutes[index]).timestamp()
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def describe(self) -> Dict[str, Any]:
+        return {"cron": self.expression}
+
+
+Trigger = Union[IntervalTrigger, CronTrigger]
+
+# Longest sleep between checks, so a wall clock that jumps is noticed
+MAX_WAIT = 60.0
+
+
+class Schedule:
+    """One recurring run of an automation; state is owned by its ``Scheduler``."""
+
+    __slots__ = ("schedule_id", "automation_id", "trigger", "params", "owner", "jitter",
+                 "misfire_policy", "misfire_grace", "allow_overlap", "next_nominal", "next_run",
+                 "generation", "running", "runs", "failures", "skipped", "misfires",
+                 "last_run", "last_outcome")
+
+    def __init__(self, schedule_id: int, automation_id: int, trigger: Trigger,
+                 params: Optional[Dict[str, Any]], owner: str, jitter: float,
+                 misfire_policy: str, misfire_grace: float, allow_overlap: bool):
+        self.schedule_id = schedule_id
+        self.automation_id = automation_id
+        self.trigger = trigger
+        self.params = params
+        self.owner = owner
+        self.jitter = jitter
+        self.misfire_policy = misfire_policy
+        self.misfire_grace = misfire_grace
+        self.allow_overlap = allow_overlap
+        self.next_nominal = 0.0
+        self.next_run = 0.0
+        self.generation = 0
+        self.running = 0
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.misfires = 0
+        self.last_run: Optional[float] = None
+        self.last_outcome: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            self.trigger.describe(),
+            schedule_id=self.schedule_id,
+            automation_id=self.automation_id,
+            params=self.params,
+            jitter=self.jitter,
+            misfire_policy=self.misfire_policy,
+            allow_overlap=self.allow_overlap,
+            next_run=self.next_run,
+            last_run=self.last_run,
+            last_outcome=self.last_outcome,
+            running=self.running,
+            runs=self.runs,
+            failures=self.failures,
+            skipped=self.skipped,
+            misfires=self.misfires,
+        )
+
+
+class Scheduler:
+    """Fires recurring runs from one timer heap, on a single background thread.
+
+    The heap holds ``(run_at, schedule_id, generation)`` entries, so adding
+    or firing a schedule is O(log n) however many there are, and the thread
+    sleeps until the earliest one is due. Removed schedules leave stale entries behind that are skipped
+    when popped and compacted away once they make up half the heap.
+
+    Due runs are handed to ``dispatch``, which must return a future and
+    should not block, e.g. by submitting to a bounded worker pool. A run is
+    delayed by a random ``jitter`` of up to that many seconds. A run found
+    more than ``misfire_grace`` seconds late, e.g. after the process was
+    suspended, follows its ``misfire_policy``:
+
+    - ``run_once``: run once now for all missed occurrences
+    - ``run_all``: run every missed occurrence
+    - ``skip``: drop the missed occurrences and wait for the next one
+
+    Unless ``allow_overlap`` is set, an occurrence that comes due while the
+    previous run of the same schedule is still going is skipped.
+    """
+
+    def __init__(self,
+                 dispatch: Callable[[Schedule], Future],
+                 clock: Callable[[], float] = time.time,
+                 seed: Optional[int] = None):
+        self.dispatch = dispatch
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._heap: List[Tuple[float, int, int]] = []
+        self._stale = 0
+        self._schedules: Dict[int, Schedule] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self.counts: Dict[str, int] = {
+            "success": 0, "failure": 0, "error": 0, "overlap": 0, "misfire": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def _push(self, schedule: Schedule, nominal: float) -> None:
+        """Queue the occurrence at ``nominal``; the lock must be held."""
+        schedule.next_nominal = nominal
+        schedule.next_run = nominal + (self._random.uniform(0, schedule.jitter) if schedule.jitter else 0.0)
+        schedule.generation += 1
+        heapq.heappush(self._heap, (schedule.next_run, schedule.schedule_id, schedule.generation))
+
+    def add(self,
+            automation_id: int,
+            trigger: Trigger,
+            params: Optional[Dict[str, Any]] = None,
+            owner: str = "",
+            jitter: float = 0.0,
+            misfire_policy: str = "run_once",
+            misfire_grace: float = 60.0,
+            allow_overlap: bool = False) -> Schedule:
+        """Register a schedule and return it; its first run is the trigger's next fire time."""
+        if misfire_policy not in MISFIRE_POLICIES:
+            raise ValueError(f"Unknown misfire policy {misfire_policy!r}, expected one of {MISFIRE_POLICIES}")
+        if jitter < 0 or misfire_grace < 0:
+            raise ValueError("jitter and misfire_grace must not be negative")
+        first = trigger.next_after(self.clock())
+        with self._lock:
+            schedule = Schedule(next(self._ids), automation_id, trigger, params, owner, jitter,
+                                misfire_policy, misfire_grace, allow_overlap)
+            self._schedules[schedule.schedule_id] = schedule
+            self._push(schedule, first)
+            if self._heap[0][1] == schedule.schedule_id:
+                self._wakeup.notify()
+        return schedule
+
+    def remove(self, schedule_id: int) -> bool:
+        """Stop a schedule; a run already in progress is not interrupted."""
+        with self._lock:
+            if self._schedules.pop(schedule_id, None) is None:
+                return False
+            self._stale += 1
+            if self._stale > len(self._heap) // 2:
+                self._heap = [entry for entry in self._heap if self._current(entry)]
+                heapq.heapify(self._heap)
+                self._stale = 0
+        return True
+
+    def remove_automation(self, automation_id: int) -> int:
+        """Stop every schedule of an automation and return how many there were."""
+        with self._lock:
+            ids = [schedule.schedule_id for schedule in self._schedules.values()
+                   if schedule.automation_id == automation_id]
+        return sum(self.remove(schedule_id) for schedule_id in ids)
+
+    def get(self, schedule_id: int) -> Optional[Schedule]:
+        return self._schedules.get(schedule_id)
+
+    def schedules(self, automation_id: Optional[int] = None) -> List[Schedule]:
+        with self._lock:
+            return [schedule for schedule in self._schedules.values()
+                    if automation_id is None or schedule.automation_id == automation_id]
+
+    def _current(self, entry: Tuple[float, int, int]) -> bool:
+        schedule = self._schedules.get(entry[1])
+        return schedule is not None and schedule.generation == entry[2]
+
+    def _peek(self) -> Optional[float]:
+        """Time of the earliest live entry, dropping stale ones; the lock must be held."""
+        while self._heap and not self._current(self._heap[0]):
+            heapq.heappop(self._heap)
+            self._stale = max(0, self._stale - 1)
+        return self._heap[0][0] if self._heap else None
+
+    def next_run_time(self) -> Optional[float]:
+        with self._lock:
+            return self._peek()
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Dispatch every run due at ``now`` and return how many were started."""
+        now = self.clock() if now is None else now
+        due: List[Schedule] = []
+        with self._lock:
+            while True:
+                run_at = self._peek()
+                if run_at is None or run_at > now:
+                    break
+                _, schedule_id, _ = heapq.heappop(self._heap)
+                schedule = self._schedules[schedule_id]
+                trigger = schedule.trigger
+                if now - run_at > schedule.misfire_grace:
+                    schedule.misfires += 1
+                    self.counts["misfire"] += 1
+                    if schedule.misfire_policy == "run_all":
+                        self._push(schedule, trigger.next_after(schedule.next_nominal))
+                    else:
+                        self._push(schedule, trigger.next_after(now))
+                        if schedule.misfire_policy == "skip":
+                            continue
+                else:
+                    self._push(schedule, trigger.next_after(schedule.next_nominal))
+                if schedule.running and not schedule.allow_overlap:
+                    schedule.skipped += 1
+                    self.counts["overlap"] += 1
+                    continue
+                schedule.running += 1
+                schedule.runs += 1
+                schedule.last_run = now
+                due.append(schedule)
+
+        for schedule in due:
+            try:
+                future = self.dispatch(schedule)
+            except Exception as e:
+                logger.error(f"Could not dispatch schedule {schedule.schedule_id}: {e}")
+                self._finished(schedule, "error")
+                continue
+            future.add_done_callback(lambda done, schedule=schedule: self._finished(schedule, self._outcome(done)))
+        return len(due)
+
+    @staticmethod
+    def _outcome(done: Future) -> str:
+        if done.cancelled() or done.exception() is not None:
+            return "error"
+        result = done.result()
+        return "success" if isinstance(result, dict) and result.get("success") else "failure"
+
+    def _finished(self, schedule: Schedule, outcome: str) -> None:
+        with self._lock:
+            schedule.running -= 1
+            schedule.last_outcome = outcome
+            if outcome != "success":
+                schedule.failures += 1
+            self.counts[outcome] += 1
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                if self._stopped:
+                    return
+                run_at = self._peek()
+                delay = None if run_at is None else run_at - self.clock()
+                if delay is None or delay > 0:
+                    self._wakeup.wait(MAX_WAIT if delay is None else min(delay, MAX_WAIT))
+                    continue
+            self.run_pending()
+
+    def start(self) -> None:
+        """Fire due runs from a daemon thread until ``stop`` is called."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="automation-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop firing runs; runs already dispatched keep going."""
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
@@ -0,0 +1,463 @@
+import json
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, Any
+
+from .records import intern_tags
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Array typecodes of the persisted sections: ids and offsets are 64-bit,
+# frequencies and lengths 32-bit
+SNAPSHOT_TYPES = {
+    "doc_ids": "q",
+    "doc_lengths": "I",
+    "term_offsets": "Q",
+    "term_docs": "q",
+    "term_freqs": "I",
+    "term_lengths": "I",
+    "tag_offsets": "Q",
+    "tag_docs": "q",
+}
+# Row columns of the term and tag posting lists
+POSTING_COLUMNS = {"term": ("term_docs", "term_freqs", "term_lengths"), "tag": ("tag_docs",)}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _copy_rows(columns: List[array], sources: List[memoryview], start: int, stop: int) -> None:
+    """Append rows ``start:stop`` of typed views to arrays of the same type as raw bytes."""
+    if start < stop:
+        for column, source in zip(columns, sources):
+            column.frombytes(source[start:stop].cast("B"))
+
+
+def _merge_rows(columns: List[array],
+                sources: List[memoryview],
+                start: int,
+                stop: int,
+                drop: Collection[int],
+                rows: List[Tuple[int, ...]]) -> None:
+    """Append source rows ``start:stop`` and ``rows`` in key order, leaving out keys in ``drop``.
+
+    Source rows are sorted by the key in their first column; runs between
+    dropped or inserted keys are copied without decoding.
+    """
+    keys = sources[0]
+    inserts = {row[0]: row for row in rows}
+    position = start
+    for key in sorted(set(drop) | set(inserts)):
+        found = bisect_left(keys, key, position, stop)
+        _copy_rows(columns, sources, position, found)
+        if found < stop and keys[found] == key:
+            found += 1
+        row = inserts.get(key)
+        if row is not None:
+            for column, value in zip(columns, row):
+                column.append(value)
+        position = found
+    _copy_rows(columns, sources, position, stop)
+
+
+def _merge_lists(names: List[str],
+                 offsets: memoryview,
+                 sources: List[memoryview],
+                 changed: Dict[str, List[Tuple[int, ...]]],
+                 hidden: Mapping[str, Set[int]],
+                 typecodes: List[str]) -> Tuple[List[str], array, List[array]]:
+    """Merge sorted posting lists with in-memory changes into new flat arrays.
+
+    ``names`` is the sorted list of keys whose postings are stored back to
+    back in ``sources``, delimited by ``offsets``. Keys in ``changed`` get
+    those rows added and keys in ``hidden`` lose those documents; all other
+    lists are copied as they are.
+    """
+    merged_names: List[str] = []
+    merged_offsets = array("Q", [0])
+    columns = [array(typecode) for typecode in typecodes]
+
+    def copy_lists(first: int, last: int) -> None:
+        if first >= last:
+            return
+        merged_names.extend(names[first:last])
+        shift = len(columns[0]) - offsets[first]
+        merged_offsets.extend([offset + shift for offset in offsets[first + 1:last + 1]])
+        _copy_rows(columns, sources, offsets[first], offsets[last])
+
+    position = 0
+    for name in sorted(set(changed) | set(hidden)):
+        found = bisect_left(names, name, position)
+        copy_lists(position, found)
+        size = len(columns[0])
+        rows = changed.get(name, [])
+        if found < len(names) and names[found] == name:
+            _merge_rows(columns, sources, offsets[found], offsets[found + 1], hidden.get(name, ()), rows)
+            found += 1
+        else:
+            for row in sorted(rows):
+                for column, value in zip(columns, row):
+                    column.append(value)
+        if len(columns[0]) > size:
+            merged_names.append(name)
+            merged_offsets.append(len(columns[0]))
+        position = found
+    copy_lists(position, len(names))
+    return merged_names, merged_offsets, columns
+
+
+class IndexSnapshot:
+    """Read-only search index persisted as flat arrays, e.g. sections of a memory-mapped file.
+
+    Each posting carries its document's length so ranking needs nothing
+    else. The vocabulary and tag lists are decoded on first use;
+    ``describe`` returns the indexed fields of a document as they were when
+    the snapshot was written, for substring matching.
+    """
+
+    def __init__(self,
+                 sections: Mapping[str, memoryview],
+                 header: Dict[str, Any],
+                 describe: Callable[[int], Dict[str, Any]]):
+        self.doc_count: int = header["doc_count"]
+        self.total_length: int = header["total_length"]
+        self.describe = describe
+        for name, typecode in SNAPSHOT_TYPES.items():
+            setattr(self, name, sections[name].cast(typecode))
+        self._terms_section = sections["terms"]
+        self._tags_section = sections["tags"]
+        self._terms: Optional[List[str]] = None
+        self._tags: Optional[List[str]] = None
+
+    @property
+    def terms(self) -> List[str]:
+        """Sorted vocabulary."""
+        if self._terms is None:
+            text = bytes(self._terms_section).decode("utf-8")
+            self._terms = text.split("\n") if text else []
+        return self._terms
+
+    @property
+    def tags(self) -> List[str]:
+        """Sorted lowercase tags."""
+        if self._tags is None:
+            self._tags = json.loads(bytes(self._tags_section)) if len(self._tags_section) else []
+        return self._tags
+
+    def length(self, doc_id: int) -> Optional[int]:
+        """Length in tokens of an indexed document, or None if it is not in the snapshot."""
+        row = bisect_left(self.doc_ids, doc_id)
+        if row < len(self.doc_ids) and self.doc_ids[row] == doc_id:
+            return self.doc_lengths[row]
+        return None
+
+    def postings(self, term: str) -> Iterator[Tuple[int, int, int]]:
+        """``(doc_id, frequency, length)`` for every document containing ``term``."""
+        position = bisect_left(self.terms, term)
+        if position == len(self.terms) or self.terms[position] != term:
+            return iter(())
+        start, stop = self.term_offsets[position], self.term_offsets[position + 1]
+        return zip(self.term_docs[start:stop], self.term_freqs[start:stop], self.term_lengths[start:stop])
+
+    def tagged(self, tag: str) -> memoryview:
+        position = bisect_left(self.tags, tag)
+        if position == len(self.tags) or self.tags[position] != tag:
+            return self.tag_docs[0:0]
+        return self.tag_docs[self.tag_offsets[position]:self.tag_offsets[position + 1]]
+
+    def sources(self, kind: str) -> Tuple[List[str], memoryview, List[memoryview]]:
+        """Names, offsets and row columns of the ``term`` or ``tag`` posting lists."""
+        return (getattr(self, f"{kind}s"), getattr(self, f"{kind}_offsets"),
+                [getattr(self, name) for name in POSTING_COLUMNS[kind]])
+
+
+class SearchIndex:
+    """Inverted index over automation questions and tags with BM25 ranking.
+
+    With a ``base`` snapshot only documents added or removed since are held
+    in memory; they shadow their snapshot entries, which are otherwise read
+    from the snapshot as queries need them.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, base: Optional[IndexSnapshot] = None):
+        self.k1 = k1
+        self.b = b
+        self._base = base
+        self._reset()
+
+    def _reset(self) -> None:
+        self._documents: Dict[int, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_lengths: Dict[int, int] = {}
+        self._total_length = 0
+        self._tag_index: Dict[str, Set[int]] = defaultdict(set)
+        self._questions: Dict[int, str] = {}
+        self._doc_tags: Dict[int, Tuple[str, ...]] = {}
+        self._sorted_terms: Optional[List[str]] = None
+        # Snapshot documents replaced or removed since, by the terms and tags they were indexed under
+        self._shadowed: Set[int] = set()
+        self._shadowed_length = 0
+        self._shadowed_terms: Dict[str, Set[int]] = defaultdict(set)
+        self._shadowed_tags: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        if self._base is None:
+            return len(self._documents)
+        return len(self._documents) + self._base.doc_count - len(self._shadowed)
+
+    def build(self, automations: Iterable[Dict[str, Any]]) -> None:
+        """Rebuild the index from scratch."""
+        self._base = None
+        self._reset()
+        for automation in automations:
+            self.add(automation)
+
+    def rebase(self, base: Optional[IndexSnapshot]) -> None:
+        """Switch to a newer snapshot, dropping every in-memory change."""
+        self._base = base
+        self._reset()
+
+    @staticmethod
+    def _analyze(automation: Dict[str, Any]) -> Tuple[str, Tuple[str, ...], List[str]]:
+        question = automation["question"].lower()
+        tags = intern_tags(tag.lower() for tag in automation["tags"])
+        terms = tokenize(question)
+        for tag in tags:
+            terms.extend(tokenize(tag))
+        return question, tags, terms
+
+    def _shadow(self, doc_id: int) -> None:
+        """Hide a document's snapshot entry, if it has one."""
+        if self._base is None or doc_id in self._shadowed:
+            return
+        length = self._base.length(doc_id)
+        if length is None:
+            return
+        _, tags, terms = self._analyze(self._base.describe(doc_id))
+        self._shadowed.add(doc_id)
+        self._shadowed_length += length
+        for term in set(terms):
+            self._shadowed_terms[term].add(doc_id)
+        for tag in tags:
+            self._shadowed_tags[tag].add(doc_id)
+
+    def add(self, automation: Dict[str, Any]) -> None:
+        """Index a single automation, replacing any previous entry with the same id."""
+        doc_id = automation["id"]
+        question, tags, terms = self._analyze(automation)
+        if doc_id in self._documents:
+            self.remove(doc_id)
+        else:
+            self._shadow(doc_id)
+
+        frequencies: Dict[str, int] = defaultdict(int)
+        for term in terms:
+            frequencies[term] += 1
+        for term, count in frequencies.items():
+            if term not in self._postings:
+                self._sorted_terms = None
+            self._postings[term][doc_id] = count
+        for tag in tags:
+            self._tag_index[tag].add(doc_id)
+
+        self._documents[doc_id] = automation
+        self._questions[doc_id] = question
+        self._doc_tags[doc_id] = tags
+        self._doc_lengths[doc_id] = len(terms)
+        self._total_length += len(terms)
+
+    def remove(self, doc_id: int) -> None:
+        """Drop an automation from the index."""
+        self._shadow(doc_id)
+        if doc_id not in self._documents:
+            return
+        for term in set(tokenize(self._questions[doc_id] + " " + " ".join(self._doc_tags[doc_id]))):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+        for tag in self._doc_tags[doc_id]:
+            self._tag_index[tag].discard(doc_id)
+            if not self._tag_index[tag]:
+                del self._tag_index[tag]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        del self._documents[doc_id]
+        del self._questions[doc_id]
+        del self._doc_tags[doc_id]
+
+    def _terms(self) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        return self._sorted_terms
+
+    @staticmethod
+    def _starting_with(terms: List[str], prefix: str) -> List[str]:
+        matches = []
+        for position in range(bisect_left(terms, prefix), len(terms)):
+            if not terms[position].startswith(prefix):
+                break
+            matches.append(terms[position])
+        return matches
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        matches = self._starting_with(self._terms(), prefix)
+        if self._base is not None:
+            matches = list(dict.fromkeys(matches + self._starting_with(self._base.terms, prefix)))
+        return matches
+
+    def _term_postings(self, term: str) -> List[Tuple[int, int, int]]:
+        """``(doc_id, frequency, length)`` of every current document containing ``term``."""
+        postings = [(doc_id, frequency, self._doc_lengths[doc_id])
+                    for doc_id, frequency in self._postings.get(term, {}).items()]
+        if self._base is not None:
+            hidden = self._shadowed_terms.get(term, ())
+            postings.extend(posting for posting in self._base.postings(term) if posting[0] not in hidden)
+        return postings
+
+    def _average_length(self) -> float:
+        total = self._total_length
+        if self._base is not None:
+            total += self._base.total_length - self._shadowed_length
+        return total / len(self) if len(self) else 0.0
+
+    def _bm25(self, terms: List[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        doc_count = len(self)
+        average_length = self._average_length()
+        for term in terms:
+            postings = self._term_postings(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency, length in postings:
+                length_norm = 1 - self.b + self.b * length / (average_length or 1)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        return scores
+
+    def _all_ids(self) -> Set[int]:
+        ids = set(self._documents)
+        if self._base is not None:
+            ids.update(set(self._base.doc_ids) - self._shadowed)
+        return ids
+
+    def _tagged(self, tag: str) -> Set[int]:
+        tagged = set(self._tag_index.get(tag, ()))
+        if self._base is not None:
+            tagged.update(set(self._base.tagged(tag)) - self._shadowed_tags.get(tag, set()))
+        return tagged
+
+    def _substring_candidates(self, query: str) -> Set[int]:
+        """Documents whose question or tags may contain ``query`` as a substring."""
+        fragments = tokenize(query)
+        if not fragments:
+            return self._all_ids()
+        # Any document containing the query must have a term containing its
+        # longest fragment, so only the vocabulary is scanned, not the catalog.
+        fragment = max(fragments, key=len)
+        candidates: Set[int] = set()
+        for term, postings in self._postings.items():
+            if fragment in term:
+                candidates.update(postings)
+        if self._base is not None:
+            for term in [term for term in self._base.terms if fragment in term]:
+                hidden = self._shadowed_terms.get(term, ())
+                candidates.update(doc_id for doc_id, _, _ in self._base.postings(term) if doc_id not in hidden)
+        return candidates
+
+    def _matches_substring(self, doc_id: int, query: str) -> bool:
+        if doc_id in self._questions:
+            question, tags = self._questions[doc_id], self._doc_tags[doc_id]
+        else:
+            question, tags, _ = self._analyze(self._base.describe(doc_id))
+        return query in question or any(query in tag for tag in tags)
+
+    def search(self,
+               query: str,
+               tags: Optional[List[str]] = None,
+               limit: Optional[int] = None,
+               offset: int = 0) -> List[Tuple[int, float]]:
+        """Return ``(id, score)`` pairs ranked by relevance.
+
+        BM25 matches on whole tokens rank first, followed by prefix matches and
+        finally plain substring matches on the question or tags.
+        """
+        query = query.lower().strip()
+        allowed: Optional[Set[int]] = None
+        for tag in tags or []:
+            tagged = self._tagged(tag.lower())
+            allowed = tagged if allowed is None else allowed & tagged
+
+        end = offset + limit if limit is not None else None
+        if not query:
+            ids = sorted(allowed if allowed is not None else self._all_ids())
+            return [(doc_id, 0.0) for doc_id in ids[offset:end]]
+
+        terms = tokenize(query)
+        scores = self._bm25(terms)
+
+        if terms:
+            prefix_terms = [term for term in self._prefix_terms(terms[-1]) if term != terms[-1]]
+            for doc_id, score in self._bm25(prefix_terms).items():
+                if doc_id not in scores:
+                    scores[doc_id] = score * 0.5
+
+        for doc_id in self._substring_candidates(query):
+            if doc_id not in scores and self._matches_substring(doc_id, query):
+                scores[doc_id] = 0.0
+
+        if allowed is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in allowed}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[offset:end]
+
+    def get(self, doc_id: int) -> Optional[Dict[str, Any]]:
+        return self._documents.get(doc_id)
+
+    def export(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """The whole index as a header and flat sections for ``IndexSnapshot``.
+
+        Parts of the base snapshot that did not change are copied over
+        without being decoded, so writing a snapshot costs little more than
+        copying the previous one.
+        """
+        base = self._base
+        sections: Dict[str, Any] = {"doc_ids": array("q"), "doc_lengths": array("I")}
+        if base is not None:
+            doc_sources = [base.doc_ids, base.doc_lengths]
+        else:
+            doc_sources = [memoryview(array("q")), memoryview(array("I"))]
+        _merge_rows([sections["doc_ids"], sections["doc_lengths"]], doc_sources, 0, len(doc_sources[0]),
+                    self._shadowed, list(self._doc_lengths.items()))
+
+        changes = {
+            "term": ({term: [(doc_id, frequency, self._doc_lengths[doc_id]) for doc_id, frequency in postings.items()]
+                      for term, postings in self._postings.items()}, self._shadowed_terms),
+            "tag": ({tag: [(doc_id,) for doc_id in docs] for tag, docs in self._tag_index.items()},
+                    self._shadowed_tags),
+        }
+        names: Dict[str, List[str]] = {}
+        for kind, (changed, hidden) in changes.items():
+            columns = POSTING_COLUMNS[kind]
+            if base is not None:
+                base_names, offsets, sources = base.sources(kind)
+            else:
+                base_names, offsets = [], memoryview(array("Q", [0]))
+                sources = [memoryview(array(SNAPSHOT_TYPES[name])) for name in columns]
+            names[kind], sections[f"{kind}_offsets"], merged = _merge_lists(
+                base_names, offsets, sources, changed, hidden, [SNAPSHOT_TYPES[name] for name in columns]
+            )
+            sections.update(zip(columns, merged))
+
+        sections["terms"] = "\n".join(names["term"]).encode("utf-8")
+        sections["tags"] = json.dumps(names["tag"]).encode("utf-8")
+        total_length = self._total_length + (base.total_length - self._shadowed_length if base else 0)
+        return {"doc_count": len(self), "total_length": total_length}, sections
@@ -0,0 +1,492 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Any, Optional, Tuple, Type
+
+from .locking import InterProcessLock
+from .records import json_default
+from .search_index import SearchIndex
+
+
+def empty_database() -> Dict[str, Any]:
+    return {"automations": [], "versions": {}, "blobs": {}}
+
+
+def _write_atomic(path: str, data: Dict[str, Any], indent: Optional[int] = 2) -> int:
+    """Write JSON to a temporary file and swap it in so readers never see a partial dump.
+
+    Returns the number of bytes written.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, default=json_default)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int, int]]:
+    """Inode, size and mtime of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class StorageBackend(ABC):
+    """Persists the automation catalog.
+
+    Backends receive the in-memory database alongside each mutation so that
+    snapshot-style backends can rewrite it, while incremental backends only
+    write the changed record. Saving a version also saves the script blob
+    for its hash from ``db["blobs"]``.
+
+    Several processes may share one catalog. They serialize mutations with
+    ``lock()`` and pick up each other's writes with ``refresh()``.
+    ``snapshots_written`` counts writes that persisted every record held in
+    memory, not just the ones passed in.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = InterProcessLock(f"{path}.lock")
+        self.bytes_written = 0
+        self.snapshots_written = 0
+
+    def lock(self) -> InterProcessLock:
+        """Lock held while reading or writing the catalog shared with other processes."""
+        return self._lock
+
+    @abstractmethod
+    def load(self) -> Dict[str, Any]:
+        """The stored database; ``automations`` is a list, or a mapping by id for lazy backends."""
+        pass
+
+    @abstractmethod
+    def save_automation(self, db: Dict[str, Any], automation: Dict[str, Any]) -> None:
+        pass
+
+    def save_automations(self, db: Dict[str, Any], automations: List[Dict[str, Any]]) -> None:
+        """Persist several automations as one write."""
+        for automation in automations:
+            self.save_automation(db, automation)
+
+    def save_version(self, db: Dict[str, Any], automation_id: int, version: Dict[str, Any]) -> None:
+        self.save_batch(db, [], [(automation_id, version)])
+
+    @abstractmethod
+    def save_batch(self,
+                   db: Dict[str, Any],
+                   automations: List[Dict[str, Any]],
+                   versions: List[Tuple[int, Dict[str, Any]]],
+                   blobs: Iterable[str] = ()) -> None:
+        """Persist automations, versions and extra script blobs as one atomic write."""
+        pass
+
+    def refresh(self, db: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Bring ``db`` up to date with writes made by other processes.
+
+        Version history and blobs are updated in ``db`` directly; changed
+        automation records are returned for the caller to merge into its
+        indexes. Call with ``lock()`` held.
+        """
+        return []
+
+    def load_versions(self, automation_id: int) -> List[Dict[str, Any]]:
+        """Version history of an automation that ``load`` left out, for lazy backends."""
+        return []
+
+    def load_blob(self, script_hash: str) -> Optional[Dict[str, Any]]:
+        """A script blob that ``load`` left out, for lazy backends."""
+        return None
+
+    def load_search_index(self) -> Optional[SearchIndex]:
+        """A search index over the loaded automations that the backend persists, or None to build one."""
+        return None
+
+    def should_compact_on_close(self) -> bool:
+        """Whether a snapshot written on close would make the next load noticeably faster."""
+        return False
+
+    @abstractmethod
+    def save_snapshot(self, db: Dict[str, Any]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JSONFileBackend(StorageBackend):
+    """Legacy backend that rewrites the whole JSON file on every mutation.
+
+    ``refresh`` re-reads the whole file, but only after another process
+    replaced it.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._identity: Optional[Tuple[int, int, int]] = None
+
+    def load(self) -> Dict[str, Any]:
+        self._identity = _file_identity(self.path)
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    db = json.load(f)
+                db.setdefault("blobs", {})
+                return db
+            except json.JSONDecodeError:
+                return empty_database()
+        return empty_database()
+
+    def save_automation(self, db: Dict[str, Any], automation: Dict[str, Any]) -> None:
+        self.save_snapshot(db)
+
+    def save_automations(self, db: Dict[str, Any], automations: List[Dict[str, Any]]) -> None:
+        if automations:
+            self.save_snapshot(db)
+
+    def save_batch(self,
+                   db: Dict[str, Any],
+                   automations: List[Dict[str, Any]],
+                   versions: List[Tuple[int, Dict[str, Any]]],
+                   blobs: Iterable[str] = ()) -> None:
+        self.save_snapshot(db)
+
+    def refresh(self, db: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if _file_identity(self.path) == self._identity:
+            return []
+        fresh = self.load()
+        db["versions"] = fresh["versions"]
+        db["blobs"] = fresh["blobs"]
+        db["next_id"] = max(db.get("next_id", 1), fresh.get("next_id", 1))
+        return fresh["automations"]
+
+    def save_snapshot(self, db: Dict[str, Any]) -> None:
+        self.bytes_written += _write_atomic(self.path, db)
+        self.snapshots_written += 1
+        self._identity = _file_identity(self.path)
+
+
+class AppendOnlyLogBackend(StorageBackend):
+    """Appends one JSON line per mutation and periodically compacts into a snapshot.
+
+    The snapshot lives at ``path`` in the legacy JSON format and the log at
+    ``path + '.log'``. A mutation that touches several records is written as
+    a single ``batch`` line so it is applied all or nothing. Replaying the log
+    is idempotent, so a crash between writing a snapshot and truncating the
+    log loses nothing, and a torn final line from a crash mid-append is
+    ignored.
+
+    ``refresh`` replays only the lines appended since this process last read
+    the log, and reloads everything after another process compacted it.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        super().__init__(path)
+        self.log_path = f"{path}.log"
+        self.compact_every = compact_every
+        self._pending_entries = 0
+        self._log_file = None
+        self._log_offset = 0
+        self._snapshot_identity: Optional[Tuple[int, int, int]] = None
+
+    def load(self) -> Dict[str, Any]:
+        db = JSONFileBackend(self.path).load()
+        self._snapshot_identity = _file_identity(self.path)
+        self._pending_entries = 0
+        self._log_offset = 0
+        if not os.path.exists(self.log_path):
+            return db
+
+        automations = {automation["id"]: automation for automation in db["automations"]}
+        self._replay_log(db, automations)
+        db["automations"] = list(automations.values())
+        return db
+
+    def _replay_log(self, db: Dict[str, Any], automations: Dict[int, Dict[str, Any]]) -> None:
+        """Replay complete log lines from ``_log_offset`` on, advancing it past each."""
+        with open(self.log_path, 'r+b') as f:
+            f.seek(self._log_offset)
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self._replay(db, automations, entry)
+                self._pending_entries += 1
+                self._log_offset += len(line)
+            if f.seek(0, os.SEEK_END) != self._log_offset:
+                # Drop a torn tail so later appends start on a clean line.
+                f.truncate(self._log_offset)
+
+    def _compacted_elsewhere(self) -> bool:
+        """Whether another process rewrote the snapshot and truncated the log since we last read it."""
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        return _file_identity(self.path) != self._snapshot_identity or log_size < self._log_offset
+
+    def refresh(self, db: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if self._compacted_elsewhere():
+            fresh = self.load()
+            db["versions"] = fresh["versions"]
+            db["blobs"] = fresh["blobs"]
+            db["next_id"] = max(db.get("next_id", 1), fresh.get("next_id", 1))
+            return fresh["automations"]
+        if not os.path.exists(self.log_path):
+            return []
+        changed: Dict[int, Dict[str, Any]] = {}
+        self._replay_log(db, changed)
+        return list(changed.values())
+
+    @classmethod
+    def _replay(cls, db: Dict[str, Any], automations: Dict[int, Dict[str, Any]], entry: Dict[str, Any]) -> None:
+        if entry["op"] == "batch":
+            for nested in entry["entries"]:
+                cls._replay(db, automations, nested)
+        elif entry["op"] == "blob":
+            db["blobs"][entry["hash"]] = entry["data"]
+        elif entry["op"] == "automation":
+            automation = entry["data"]
+            automations[automation["id"]] = automation
+        elif entry["op"] == "version":
+            history = db["versions"].setdefault(str(entry["id"]), [])
+            version = entry["data"]
+            if all(existing["version"] != version["version"] for existing in history):
+                history.append(version)
+
+    def _append(self, db: Dict[str, Any], entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        if self._log_file is None:
+            self._log_file = open(self.log_path, 'a', encoding='utf-8')
+        entry = entries[0] if len(entries) == 1 else {"op": "batch", "entries": entries}
+        line = json.dumps(entry, default=json_default) + "\n"
+        self._log_file.write(line)
+        self._log_file.flush()
+        os.fsync(self._log_file.fileno())
+        self._log_offset = os.fstat(self._log_file.fileno()).st_size
+        self.bytes_written += len(line.encode('utf-8'))
+        self._pending_entries += 1
+        if self._compaction_due():
+            self.save_snapshot(db)
+
+    def _compaction_due(self) -> bool:
+        return self._pending_entries >= self.compact_every
+
+    def save_automation(self, db: Dict[str, Any], automation: Dict[str, Any]) -> None:
+        self._append(db, [{"op": "automation", "data": automation}])
+
+    def save_automations(self, db: Dict[str, Any], automations: List[Dict[str, Any]]) -> None:
+        self._append(db, [{"op": "automation", "data": automation} for automation in automations])
+
+    @staticmethod
+    def _blob_entries(db: Dict[str, Any], script_hashes: Iterable[str]) -> List[Dict[str, Any]]:
+        return [{"op": "blob", "hash": script_hash, "data": db["blobs"][script_hash]}
+                for script_hash in dict.fromkeys(script_hashes) if script_hash in db["blobs"]]
+
+    def save_batch(self,
+                   db: Dict[str, Any],
+                   automations: List[Dict[str, Any]],
+                   versions: List[Tuple[int, Dict[str, Any]]],
+                   blobs: Iterable[str] = ()) -> None:
+        hashes = [version["script_hash"] for _, version in versions] + list(blobs)
+        entries = self._blob_entries(db, hashes)
+        entries.extend({"op": "automation", "data": automation} for automation in automations)
+        entries.extend({"op": "version", "id": automation_id, "data": version}
+                       for automation_id, version in versions)
+        self._append(db, entries)
+
+    def save_snapshot(self, db: Dict[str, Any]) -> None:
+        """Compact the log into a fresh snapshot."""
+        self.bytes_written += _write_atomic(self.path, db)
+        self._truncate_log()
+
+    def _truncate_log(self) -> None:
+        """Start an empty log after a new snapshot has been written."""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._snapshot_identity = _file_identity(self.path)
+        self.snapshots_written += 1
+        self._pending_entries = 0
+        self._log_offset = 0
+
+    def close(self) -> None:
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+
+class SQLiteBackend(StorageBackend):
+    """Stores each automation, version and script blob as its own row.
+
+    Only automations are read at load time; version history and blobs are
+    queried per automation when first needed.
+
+    Every write stamps its automation and blob rows with a new sequence
+    number, so ``refresh`` only selects rows written after the last one this
+    process has seen.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS automations ("
+            "id INTEGER PRIMARY KEY, data TEXT NOT NULL, seq INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            "automation_id INTEGER NOT NULL, version INTEGER NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (automation_id, version))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "hash TEXT PRIMARY KEY, data TEXT NOT NULL, seq INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        for table in ("automations", "blobs"):
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "seq" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_seq ON {table} (seq)")
+        self._conn.commit()
+        self._seen_seq = 0
+
+    def _meta_value(self, key: str) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row is not None else None
+
+    def load(self) -> Dict[str, Any]:
+        db = empty_database()
+        self._seen_seq = self._meta_value("seq") or 0
+        for (data,) in self._conn.execute("SELECT data FROM automations WHERE seq <= ? ORDER BY id",
+                                          (self._seen_seq,)):
+            db["automations"].append(json.loads(data))
+        next_id = self._meta_value("next_id")
+        if next_id is not None:
+            db["next_id"] = next_id
+        return db
+
+    def refresh(self, db: Dict[str, Any]) -> List[Dict[str, Any]]:
+        seq = self._meta_value("seq") or 0
+        if seq == self._seen_seq:
+            return []
+        window = (self._seen_seq, seq)
+        changed = [json.loads(data) for (data,) in self._conn.execute(
+            "SELECT data FROM automations WHERE seq > ? AND seq <= ? ORDER BY id", window
+        )]
+        for script_hash, data in self._conn.execute("SELECT hash, data FROM blobs WHERE seq > ? AND seq <= ?", window):
+            if script_hash in db["blobs"]:
+                db["blobs"][script_hash] = json.loads(data)
+        for automation in changed:
+            # Reloaded lazily with the new versions on next access
+            db["versions"].pop(str(automation["id"]), None)
+        next_id = self._meta_value("next_id")
+        if next_id is not None:
+            db["next_id"] = max(db.get("next_id", 1), next_id)
+        self._seen_seq = seq
+        return changed
+
+    def _save_next_id(self, db: Dict[str, Any]) -> None:
+        if "next_id" in db:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (str(db["next_id"]),)
+            )
+
+    def save_automation(self, db: Dict[str, Any], automation: Dict[str, Any]) -> None:
+        self.save_automations(db, [automation])
+
+    def save_automations(self, db: Dict[str, Any], automations: List[Dict[str, Any]]) -> None:
+        self.save_batch(db, automations, [])
+
+    def load_versions(self, automation_id: int) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT data FROM versions WHERE automation_id = ? ORDER BY version", (automation_id,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def load_blob(self, script_hash: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT data FROM blobs WHERE hash = ?", (script_hash,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _write(self,
+               db: Dict[str, Any],
+               automations: Iterable[Dict[str, Any]],
+               versions: Iterable[Tuple[int, Dict[str, Any]]],
+               blobs: Iterable[str]) -> int:
+        """Write rows under a new sequence number and return it."""
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('seq', '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        seq = self._meta_value("seq")
+        versions = list(versions)
+        hashes = dict.fromkeys([version["script_hash"] for _, version in versions] + list(blobs))
+        automation_rows = [(automation["id"], json.dumps(automation, default=json_default), seq) for automation in automations]
+        version_rows = [(int(automation_id), version["version"], json.dumps(version, default=json_default))
+                        for automation_id, version in versions]
+        blob_rows = [(script_hash, json.dumps(db["blobs"][script_hash]), seq) for script_hash in hashes
+                     if script_hash in db["blobs"]]
+        self._conn.executemany("INSERT OR REPLACE INTO automations (id, data, seq) VALUES (?, ?, ?)", automation_rows)
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO versions (automation_id, version, data) VALUES (?, ?, ?)", version_rows
+        )
+        self._conn.executemany("INSERT OR REPLACE INTO blobs (hash, data, seq) VALUES (?, ?, ?)", blob_rows)
+        self.bytes_written += (sum(len(row[1]) for row in automation_rows) + sum(len(row[2]) for row in version_rows) +
+                               sum(len(row[1]) for row in blob_rows))
+        self._save_next_id(db)
+        return seq
+
+    def _saw(self, seq: int) -> None:
+        """Skip our own committed write on the next refresh unless others wrote before it."""
+        if seq == self._seen_seq + 1:
+            self._seen_seq = seq
+
+    def save_batch(self,
+                   db: Dict[str, Any],
+                   automations: List[Dict[str, Any]],
+                   versions: List[Tuple[int, Dict[str, Any]]],
+                   blobs: Iterable[str] = ()) -> None:
+        with self._conn:
+            seq = self._write(db, automations, versions, blobs)
+        self._saw(seq)
+
+    def save_snapshot(self, db: Dict[str, Any]) -> None:
+        """Upsert everything held in memory; rows that were never loaded are kept."""
+        with self._conn:
+            seq = self._write(
+                db,
+                db["automations"],
+                ((automation_id, version) for automation_id, history in db["versions"].items()
+                 for version in history),
+                db["blobs"]
+            )
+        self.snapshots_written += 1
+        self._saw(seq)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+STORAGE_BACKENDS: Dict[str, Type[StorageBackend]] = {
+    "json": JSONFileBackend,
+    "log": AppendOnlyLogBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def create_backend(name: str, path: str) -> StorageBackend:
+    """Instantiate a storage backend by name."""
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: {name}")
+    return STORAGE_BACKENDS[name](path)
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import queue
+import signal
+import subprocess
+import threading
+from collections import deque
+from typing import AsyncIterator, BinaryIO, Deque, Dict, Iterator, Optional, Tuple
+
+Chunk = Tuple[str, bytes]
+
+STREAMS = ("stdout", "stderr")
+
+
+def _kill(process) -> None:
+    """Kill the shell and anything it started, which may still hold the pipes open."""
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+
+
+class TailBuffer:
+    """Keeps only the most recent ``max_bytes`` of a byte stream."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._chunks: Deque[bytes] = deque()
+        self._size = 0
+
+    def append(self, data: bytes) -> None:
+        if self.max_bytes <= 0:
+            return
+        if len(data) >= self.max_bytes:
+            self._chunks = deque([data[-self.max_bytes:]])
+            self._size = self.max_bytes
+            return
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size - len(self._chunks[0]) >= self.max_bytes:
+            self._size -= len(self._chunks.popleft())
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)[-self.max_bytes:] if self.max_bytes > 0 else b""
+
+
+class _StreamSink:
+    """Shared bookkeeping for the sync and async streams: tails and spill file."""
+
+    def __init__(self, tail_bytes: int, spill_path: Optional[str]):
+        self.tails: Dict[str, TailBuffer] = {name: TailBuffer(tail_bytes) for name in STREAMS}
+        self.spill_path = spill_path
+        self._spill: Optional[BinaryIO] = None
+        self.returncode: Optional[int] = None
+        self.timed_out = False
+
+    def begin(self) -> None:
+        """Open the spill file once the script actually starts."""
+        if self.spill_path:
+            self._spill = open(self.spill_path, 'wb')
+
+    def record(self, name: str, data: bytes) -> None:
+        self.tails[name].append(data)
+        if self._spill is not None:
+            self._spill.write(data)
+
+    def finish(self, returncode: Optional[int]) -> None:
+        self.returncode = returncode
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def tail(self, name: str = "stdout") -> str:
+        """Retained tail of a stream, decoded as text."""
+        return self.tails[name].getvalue().decode(errors='replace')
+
+
+class OutputStream(_StreamSink):
+    """Iterates over ``(stream_name, bytes)`` chunks of a running shell script.
+
+    The script starts when iteration does, so a stream that is never
+    iterated runs nothing. Memory use is bounded by the tail buffers; the
+    full output is only kept if ``spill_path`` is given. ``returncode`` is
+    set once iteration finishes or is abandoned.
+    """
+
+    def __init__(self,
+                 script: str,
+                 chunk_size: int = 65536,
+                 tail_bytes: int = 1 << 20,
+                 spill_path: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        super().__init__(tail_bytes, spill_path)
+        self.script = script
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self._queue: "queue.Queue[Optional[Chunk]]" = queue.Queue(maxsize=64)
+
+    def _pump(self, name: str, pipe: BinaryIO) -> None:
+        try:
+            while True:
+                data = pipe.read1(self.chunk_size)
+                if not data:
+                    break
+                self._queue.put((name, data))
+        finally:
+            pipe.close()
+            self._queue.put(None)
+
+    def _time_out(self) -> None:
+        self.timed_out = True
+        _kill(self.process)
+
+    def __iter__(self) -> Iterator[Chunk]:
+        if self.process is not None:
+            raise RuntimeError("Output streams can only be iterated once")
+        self.begin()
+        try:
+            self.process = subprocess.Popen(self.script, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            start_new_session=True)
+        except BaseException:
+            self.finish(None)
+            raise
+        for name in STREAMS:
+            threading.Thread(target=self._pump, args=(name, getattr(self.process, name)), daemon=True).start()
+        timer: Optional[threading.Timer] = None
+        if self.timeout is not None:
+            timer = threading.Timer(self.timeout, self._time_out)
+            timer.daemon = True
+            timer.start()
+        open_streams = len(STREAMS)
+        try:
+            while open_streams:
+                item = self._queue.get()
+                if item is None:
+                    open_streams -= 1
+                    continue
+                self.record(*item)
+                yield item
+        finally:
+            if open_streams:
+                # Abandoned mid-stream: stop the script and unblock the readers.
+                _kill(self.process)
+                while open_streams:
+                    if self._queue.get() is None:
+                        open_streams -= 1
+            if timer is not None:
+                timer.cancel()
+            self.finish(self.process.wait())
+
+
+class AsyncOutputStream(_StreamSink):
+    """Async counterpart of :class:`OutputStream` built on asyncio subprocesses.
+
+    As with the sync stream, the script starts when iteration does.
+    """
+
+    def __init__(self,
+                 script: str,
+                 chunk_size: int = 65536,
+                 tail_bytes: int = 1 << 20,
+                 spill_path: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        super().__init__(tail_bytes, spill_path)
+        self.script = script
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    async def _pump(self, name: str, reader: asyncio.StreamReader, chunks: "asyncio.Queue[Optional[Chunk]]") -> None:
+        try:
+            while True:
+                data = await reader.read(self.chunk_size)
+                if not data:
+                    break
+                await chunks.put((name, data))
+        finally:
+            await chunks.put(None)
+
+    async def __aiter__(self) -> AsyncIterator[Chunk]:
+        self.begin()
+        try:
+            process = await asyncio.create_subprocess_shell(
+                self.script, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+        except BaseException:
+            self.finish(None)
+            raise
+        chunks: "asyncio.Queue[Optional[Chunk]]" = asyncio.Queue(maxsize=64)
+        pumps = [asyncio.ensure_future(self._pump(name, getattr(process, name), chunks)) for name in STREAMS]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout if self.timeout is not None else None
+        open_streams = len(pumps)
+        try:
+            while open_streams:
+                remaining = deadline - loop.time() if deadline is not None else None
+                try:
+                    item = await asyncio.wait_for(chunks.get(), remaining)
+                except asyncio.TimeoutError:
+                    self.timed_out = True
+                    _kill(process)
+                    deadline = None
+                    continue
+                if item is None:
+                    open_streams -= 1
+                    continue
+                self.record(*item)
+                yield item
+        finally:
+            # Also reached when the consumer breaks out early or is cancelled
+            if process.returncode is None:
+                _kill(process)
+            try:
+                await process.wait()
+            finally:
+                for pump in pumps:
+                    pump.cancel()
+                self.finish(process.returncode)
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .code_cache import CodeCache
+
+# Reads a JSON array of scripts on stdin and prints a JSON array holding the
+# parse errors of each one, or an empty string when it parsed cleanly.
+POWERSHELL_PARSE = (
+    "$scripts = @([Console]::In.ReadToEnd() | ConvertFrom-Json); "
+    "$results = foreach ($script in $scripts) { "
+    "$errors = $null; "
+    "[void][System.Management.Automation.Language.Parser]::ParseInput($script, [ref]$null, [ref]$errors); "
+    "($errors | ForEach-Object { $_.Message }) -join '; ' }; "
+    "ConvertTo-Json -InputObject @($results) -Compress"
+)
+
+Check = Tuple[str, str, Optional[str]]
+
+
+class ScriptValidator:
+    """Syntax checks for automation scripts with verdicts memoized by script hash.
+
+    Python is compiled in-process (priming ``code_cache`` when given), bash
+    scripts go through ``bash -n`` and PowerShell through the parser of
+    ``pwsh``, many scripts per process. Shell checks are skipped when the
+    interpreter is not installed. Only definite verdicts are cached, so a
+    check that could not run is retried next time.
+    """
+
+    def __init__(self,
+                 cache_size: int = 65536,
+                 max_workers: Optional[int] = None,
+                 code_cache: Optional[CodeCache] = None,
+                 check_timeout: float = 30.0,
+                 powershell_batch_size: int = 200):
+        self.cache_size = cache_size
+        self.max_workers = max_workers
+        self.code_cache = code_cache
+        self.check_timeout = check_timeout
+        self.powershell_batch_size = powershell_batch_size
+        self.bash_path = shutil.which("bash")
+        self.powershell_path = shutil.which("pwsh") or shutil.which("powershell")
+        self._verdicts: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Forget cached verdicts, e.g. after an interpreter upgrade."""
+        with self._lock:
+            self._verdicts.clear()
+
+    def _cached(self, key: Tuple[str, str]) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            if key in self._verdicts:
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+                return True, self._verdicts[key]
+            self.misses += 1
+            return False, None
+
+    def _remember(self, key: Tuple[str, str], error: Optional[str]) -> None:
+        with self._lock:
+            self._verdicts[key] = error
+            self._verdicts.move_to_end(key)
+            while len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+
+    def _check_python(self, script: str, script_hash: str) -> Optional[str]:
+        try:
+            code = compile(script, '<string>', 'exec')
+        except SyntaxError as e:
+            return f"Invalid Python syntax: {str(e)}"
+        if self.code_cache is not None:
+            self.code_cache.put(script_hash, code)
+        return None
+
+    def _check_bash(self, script: str) -> Tuple[bool, Optional[str]]:
+        """Parse without executing; returns whether a verdict was reached and the error."""
+        if self.bash_path is None:
+            return False, None
+        try:
+            completed = subprocess.run([self.bash_path, "-n"], input=script, capture_output=True,
+                                       text=True, timeout=self.check_timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            return False, None
+        if completed.returncode != 0:
+            return True, f"Invalid bash syntax: {completed.stderr.strip()}"
+        return True, None
+
+    def _check_powershell(self, scripts: List[str]) -> Optional[List[Optional[str]]]:
+        """Parse a batch in one ``pwsh`` process; None when no verdict could be reached."""
+        if self.powershell_path is None:
+            return None
+        try:
+            completed = subprocess.run(
+                [self.powershell_path, "-NoProfile", "-NonInteractive", "-Command", POWERSHELL_PARSE],
+                input=json.dumps(scripts), capture_output=True, text=True, timeout=self.check_timeout
+            )
+            messages = json.loads(completed.stdout)
+        except (OSError, subprocess.TimeoutExpired, ValueError):
+            return None
+        if completed.returncode != 0 or len(messages) != len(scripts):
+            return None
+        return [f"Invalid PowerShell syntax: {message}" if message else None for message in messages]
+
+    def check(self, script: str, script_type: str, script_hash: Optional[str] = None) -> Optional[str]:
+        """Return an error message for an invalid script, or None if it is valid."""
+        return self.check_many([(script, script_type, script_hash)])[0]
+
+    def check_many(self, checks: Iterable[Check]) -> List[Optional[str]]:
+        """Validate ``(script, script_type, script_hash)`` triples, returning one verdict each.
+
+        Uncached scripts are checked concurrently; identical scripts are only
+        checked once.
+        """
+        checks = list(checks)
+        verdicts: List[Optional[str]] = [None] * len(checks)
+        pending: Dict[Tuple[str, str], List[int]] = {}
+        scripts: Dict[Tuple[str, str], str] = {}
+        for index, (script, script_type, script_hash) in enumerate(checks):
+            if not script.strip():
+                verdicts[index] = "Script cannot be empty"
+                continue
+            key = (script_type, script_hash or hashlib.sha256(script.encode()).hexdigest())
+            if key in pending:
+                pending[key].append(index)
+                continue
+            found, error = self._cached(key)
+            if found:
+                verdicts[index] = error
+            else:
+                pending[key] = [index]
+                scripts[key] = script
+
+        if pending:
+            for key, (decided, error) in self._run(scripts).items():
+                if decided:
+                    self._remember(key, error)
+                for index in pending[key]:
+                    verdicts[index] = error
+        return verdicts
+
+    def _run(self, scripts: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], Tuple[bool, Optional[str]]]:
+        results: Dict[Tuple[str, str], Tuple[bool, Optional[str]]] = {}
+        bash_keys = []
+        powershell_keys = []
+        for key, script in scripts.items():
+            script_type, script_hash = key
+            if script_type == "python":
+                results[key] = (True, self._check_python(script, script_hash))
+            elif script_type == "bash":
+                bash_keys.append(key)
+            elif script_type == "powershell":
+                powershell_keys.append(key)
+            else:
+                results[key] = (True, None)
+
+        batches = [powershell_keys[start:start + self.powershell_batch_size]
+                   for start in range(0, len(powershell_keys), self.powershell_batch_size)]
+        if len(bash_keys) + len(batches) <= 1:
+            # A single check runs inline; a pool would only add latency
+            for key in bash_keys:
+                results[key] = self._check_bash(scripts[key])
+            for batch in batches:
+                results.update(self._powershell_results(batch, scripts))
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            bash_futures = {key: pool.submit(self._check_bash, scripts[key]) for key in bash_keys}
+            batch_futures = [pool.submit(self._powershell_results, batch, scripts) for batch in batches]
+            for key, future in bash_futures.items():
+                results[key] = future.result()
+            for future in batch_futures:
+                results.update(future.result())
+        return results
+
+    def _powershell_results(self,
+                            keys: List[Tuple[str, str]],
+                            scripts: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], Tuple[bool, Optional[str]]]:
+        errors = self._check_powershell([scripts[key] for key in keys])
+        if errors is None:
+            return {key: (False, None) for key in keys}
+        return {key: (True, error) for key, error in zip(keys, errors)}
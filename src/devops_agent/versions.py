@@ -0,0 +1,153 @@
+import difflib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .records import VersionRecord, as_version
+from .storage import StorageBackend
+
+# Every KEYFRAME_INTERVAL-th version stores a superseded script in full so
+# delta chains stay short.
+KEYFRAME_INTERVAL = 16
+
+
+def make_delta(base: str, target: str) -> List[Any]:
+    """Encode ``target`` as line-level edits against ``base``."""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops: List[Any] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i1, i2])
+        elif j2 > j1:
+            ops.append(["+", target_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(base: str, ops: List[Any]) -> str:
+    base_lines = base.splitlines(keepends=True)
+    out: List[str] = []
+    for op in ops:
+        if op[0] == "=":
+            out.extend(base_lines[op[1]:op[2]])
+        else:
+            out.extend(op[1])
+    return "".join(out)
+
+
+class VersionStore:
+    """Content-addressed script history for automations.
+
+    ``db["versions"]`` holds per-automation metadata only; script text lives
+    once per ``script_hash`` in ``db["blobs"]``. A blob is one of:
+
+    - ``{"live": id}``: the current script of automation ``id``, read from the
+      live record so the newest text is never stored twice
+    - ``{"base": hash, "delta": ops}``: a reverse delta against a newer script
+    - ``{"text": script}``: a full copy, written at keyframes
+
+    History and blobs the backend did not load eagerly are fetched on first
+    access.
+    """
+
+    def __init__(self,
+                 db: Dict[str, Any],
+                 storage: StorageBackend,
+                 live_script: Callable[[int], Optional[str]]):
+        self.db = db
+        self.storage = storage
+        self.live_script = live_script
+        db.setdefault("blobs", {})
+        for automation_id in list(db["versions"]):
+            self._migrate(automation_id)
+
+    def _migrate(self, automation_id: str) -> None:
+        """Move script text out of legacy version entries into blobs and compact the entries."""
+        history = self.db["versions"][automation_id]
+        for entry in history:
+            script = entry.pop("script", None)
+            if script is None or entry["script_hash"] in self.db["blobs"]:
+                continue
+            if self.live_script(int(automation_id)) == script:
+                self.db["blobs"][entry["script_hash"]] = {"live": int(automation_id)}
+            else:
+                self.db["blobs"][entry["script_hash"]] = {"text": script}
+        history[:] = [as_version(entry) for entry in history]
+
+    def _history(self, automation_id: int) -> List[Dict[str, Any]]:
+        key = str(automation_id)
+        if key not in self.db["versions"]:
+            self.db["versions"][key] = self.storage.load_versions(automation_id)
+            self._migrate(key)
+        return self.db["versions"][key]
+
+    def _blob(self, script_hash: str) -> Dict[str, Any]:
+        blob = self.db["blobs"].get(script_hash)
+        if blob is None:
+            blob = self.storage.load_blob(script_hash)
+            if blob is None:
+                raise KeyError(f"Unknown script hash {script_hash}")
+            self.db["blobs"][script_hash] = blob
+        return blob
+
+    def script(self, script_hash: str) -> str:
+        """Reconstruct the script text stored under ``script_hash``."""
+        pending: List[List[Any]] = []
+        blob = self._blob(script_hash)
+        while "base" in blob:
+            pending.append(blob["delta"])
+            blob = self._blob(blob["base"])
+        text = blob["text"] if "text" in blob else self.live_script(blob["live"])
+        for ops in reversed(pending):
+            text = apply_delta(text, ops)
+        return text
+
+    def add(self, automation_id: int, script_hash: str, user_id: str) -> Dict[str, Any]:
+        """Record a brand-new automation whose live script has ``script_hash``."""
+        self.db["blobs"].setdefault(script_hash, {"live": automation_id})
+        version = VersionRecord({
+            "version": 1,
+            "script_hash": script_hash,
+            "modified_at": datetime.now().isoformat(),
+            "modified_by": user_id
+        })
+        self.db["versions"][str(automation_id)] = [version]
+        return version
+
+    def supersede(self,
+                  automation_id: int,
+                  old_script: str,
+                  old_hash: str,
+                  new_script: str,
+                  new_hash: str,
+                  user_id: str) -> Dict[str, Any]:
+        """Record a new script for an automation before its live record changes.
+
+        Returns the new version entry. The blobs of ``old_hash`` and
+        ``new_hash`` may both change and must be persisted with it.
+        """
+        history = self._history(automation_id)
+        number = history[-1]["version"] + 1 if history else 1
+
+        current = self.db["blobs"].get(new_hash) or self.storage.load_blob(new_hash)
+        if current is None or "live" not in current:
+            self.db["blobs"][new_hash] = {"live": automation_id}
+
+        if self._blob(old_hash) == {"live": automation_id}:
+            if number % KEYFRAME_INTERVAL == 0:
+                self.db["blobs"][old_hash] = {"text": old_script}
+            else:
+                self.db["blobs"][old_hash] = {"base": new_hash, "delta": make_delta(new_script, old_script)}
+
+        version = VersionRecord({
+            "version": number,
+            "script_hash": new_hash,
+            "modified_at": datetime.now().isoformat(),
+            "modified_by": user_id
+        })
+        history.append(version)
+        return version
+
+    def history(self, automation_id: int) -> List[Dict[str, Any]]:
+        """Version entries of one automation with their script text filled in."""
+        return [dict(entry, script=self.script(entry["script_hash"])) for entry in self._history(automation_id)]
@@ -0,0 +1,143 @@
+import marshal
+import multiprocessing
+import os
+import pickle
+import queue
+import sys
+from types import CodeType
+from typing import Any, Dict, Optional, Set
+
+from .exceptions import ExecutionError
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _resident_memory() -> int:
+    """Current resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _worker_main(conn) -> None:
+    """Worker loop: receive marshalled code plus params, reply with the pickled result."""
+    # Bounded by the pool's max_runs, after which the worker is replaced.
+    code_objects: Dict[str, CodeType] = {}
+    while True:
+        try:
+            request = conn.recv_bytes()
+        except EOFError:
+            return
+        script_hash, code_bytes, params = pickle.loads(request)
+        try:
+            if code_bytes is not None:
+                code_objects[script_hash] = marshal.loads(code_bytes)
+            local_vars: Dict[str, Any] = {}
+            exec(code_objects[script_hash], {"params": params or {}}, local_vars)
+            reply = pickle.dumps(("ok", local_vars.get('result', None), _resident_memory()),
+                                 pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            reply = pickle.dumps(("error", f"{type(e).__name__}: {e}", _resident_memory()),
+                                 pickle.HIGHEST_PROTOCOL)
+        conn.send_bytes(reply)
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+        self.known_hashes: Set[str] = set()
+
+    def stop(self) -> None:
+        self.conn.close()
+        self.process.terminate()
+        self.process.join()
+
+
+class PythonWorkerPool:
+    """Pre-started worker processes that run compiled Python automations.
+
+    Code objects are marshalled to a worker only the first time it sees a
+    script hash. Workers are replaced after ``max_runs`` executions, when
+    their resident memory exceeds ``max_memory_mb``, or when a run times out.
+    """
+
+    def __init__(self,
+                 size: Optional[int] = None,
+                 max_runs: int = 100,
+                 max_memory_mb: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        self.size = size or os.cpu_count() or 1
+        self.max_runs = max_runs
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(_Worker(self._context))
+        self.recycled = 0
+
+    def _recycle(self, worker: _Worker) -> _Worker:
+        worker.stop()
+        self.recycled += 1
+        return _Worker(self._context)
+
+    def run(self, script_hash: str, code: CodeType, params: Optional[Dict[str, Any]],
+            timeout: Optional[float] = None) -> Any:
+        """Execute ``code`` in a worker and return its ``result`` variable."""
+        worker = self._idle.get()
+        # Unless the exchange finishes cleanly, the pipe may hold half a message
+        clean = False
+        memory = 0
+        try:
+            code_bytes = None if script_hash in worker.known_hashes else marshal.dumps(code)
+            try:
+                request = pickle.dumps((script_hash, code_bytes, params), pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                # Nothing was sent, so the worker is still in a known state
+                clean = True
+                raise ExecutionError(f"Params cannot be sent to a worker process: {type(e).__name__}: {e}") from e
+            worker.conn.send_bytes(request)
+            worker.known_hashes.add(script_hash)
+            if worker.conn.poll(timeout):
+                reply = worker.conn.recv_bytes()
+                clean = True
+                try:
+                    status, value, memory = pickle.loads(reply)
+                except Exception as e:
+                    raise ExecutionError(f"Result cannot be read back: {type(e).__name__}: {e}") from e
+            else:
+                status, value, memory = "timeout", None, 0
+        except (EOFError, OSError):
+            status, value, memory = "crashed", None, 0
+        finally:
+            worker.runs += 1
+            if (not clean or worker.runs >= self.max_runs or
+                    (self.max_memory_bytes is not None and memory > self.max_memory_bytes)):
+                worker = self._recycle(worker)
+            self._idle.put(worker)
+
+        if status == "timeout":
+            raise TimeoutError(f"Timed out after {timeout} seconds")
+        if status == "crashed":
+            raise ExecutionError("Worker process exited unexpectedly")
+        if status == "error":
+            raise ExecutionError(value)
+        return value
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().stop()
+            except queue.Empty:
+                return
@@ -14,6 +14,7 @@ class TestDevOpsAutomationAgent(unittest.TestCase):
 
     def tearDown(self):
         """Clean up after each test"""
+        self.agent.close()
         if os.path.exists(self.test_storage):
             os.remove(self.test_storage)
 
@@ -65,5 +66,72 @@ class TestDevOpsAutomationAgent(unittest.TestCase):
         )
         self.assertIn("test successful", result)
 
+    def test_usage_counters_are_batched(self):
+        """Test that times_used is kept in memory until a flush"""
+        automation = self.agent.add_automation(
+            question="Echo test",
+            script="echo 'test successful'",
+            tags=["test"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+        self.agent.get_automation(automation["id"])
+        self.agent.get_automation(automation["id"], count_usage=False)
+
+        with open(self.test_storage, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["automations"][0]["times_used"], 0)
+        self.assertEqual(self.agent.get_automation(automation["id"], count_usage=False)["times_used"], 1)
+
+        self.agent.close()
+        with open(self.test_storage, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["automations"][0]["times_used"], 1)
+
+    def test_ids_are_not_reused_after_reload(self):
+        """Test that the id allocator survives a restart and skips used ids"""
+        for question in ["First", "Second"]:
+            self.agent.add_automation(
+                question=question,
+                script="echo ok",
+                tags=["test"],
+                script_type=ScriptType.BASH,
+                user_id="test_user"
+            )
+        self.agent.close()
+
+        with open(self.test_storage, encoding="utf-8") as f:
+            db = json.load(f)
+        db["automations"] = db["automations"][:1]
+        with open(self.test_storage, "w", encoding="utf-8") as f:
+            json.dump(db, f)
+
+        self.agent = DevOpsAutomationAgent(storage_path=self.test_storage, auth_required=False)
+        automation = self.agent.add_automation(
+            question="Third",
+            script="echo ok",
+            tags=["test"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+        self.assertEqual(automation["id"], 3)
+        self.assertEqual(self.agent.get_automation(1, count_usage=False)["question"], "First")
+
+    def test_python_execution_uses_code_cache(self):
+        """Test that Python automations compile once and receive params as globals"""
+        automation = self.agent.add_automation(
+            question="Double a number",
+            script="result = params['value'] * 2",
+            tags=["test"],
+            script_type=ScriptType.PYTHON,
+            user_id="test_user"
+        )
+        self.assertIn(automation["script_hash"], self.agent.code_cache)
+
+        first = self.agent.execute_automation(automation["id"], "test_user", params={"value": 2})
+        second = self.agent.execute_automation(automation["id"], "test_user", params={"value": 5})
+        self.assertEqual(first["result"], 4)
+        self.assertEqual(second["result"], 10)
+        self.assertEqual(self.agent.code_cache.misses, 0)
+        self.assertEqual(self.agent.code_cache.hits, 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
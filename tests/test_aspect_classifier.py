@@ -0,0 +1,54 @@
+import unittest
+from devops.agent import DevOpsAspect
+from devops.aspect_classifier import AspectClassifier
+from devops.reflective_agent import DevOpsReflectiveAgent
+
+
+class TestAspectClassifier(unittest.TestCase):
+    def setUp(self):
+        """Build the classifier once per test"""
+        self.classifier = AspectClassifier()
+
+    def test_questions_map_to_their_aspects(self):
+        """Test primary aspects for questions with an obvious focus"""
+        cases = {
+            "How do I build a CI/CD pipeline with GitHub Actions?": DevOpsAspect.CI_CD,
+            "Our cloud bill is too expensive, how do we cut costs?": DevOpsAspect.COST_OPTIMIZATION,
+            "Set up Prometheus alerting and Grafana dashboards": DevOpsAspect.MONITORING,
+            "Plan disaster recovery and backups for the database": DevOpsAspect.RELIABILITY,
+            "Rotate secrets and enforce TLS encryption": DevOpsAspect.SECURITY,
+            "Prepare for a SOC2 audit": DevOpsAspect.COMPLIANCE,
+        }
+        results = self.classifier.classify_many(list(cases))
+        for (question, aspect), result in zip(cases.items(), results):
+            with self.subTest(question=question):
+                self.assertEqual(result["primary_aspects"][0], aspect)
+
+    def test_secondary_aspects_are_related(self):
+        """Test that weaker matches are reported as related, strongest first"""
+        result = self.classifier.classify_many(["Deploy the release pipeline to the Kubernetes cluster"])[0]
+        self.assertEqual(result["primary_aspects"], [DevOpsAspect.CI_CD])
+        self.assertIn(DevOpsAspect.INFRASTRUCTURE, result["related_aspects"])
+        scores = list(result["aspect_scores"].values())
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_batch_matches_single_questions(self):
+        """Test that batch scoring gives the same answers as one question at a time"""
+        questions = ["scale the web tier for holiday traffic", "nothing relevant here", "automate nightly cron job"]
+        batch = self.classifier.classify_many(questions * 1000)
+        self.assertEqual(len(batch), 3000)
+        for index, question in enumerate(questions):
+            self.assertEqual(batch[index], self.classifier.classify_many([question])[0])
+        self.assertEqual(batch[1]["primary_aspects"], [])
+
+    def test_agent_analysis(self):
+        """Test analyze_question and analyze_questions on the reflective agent"""
+        agent = DevOpsReflectiveAgent(settings={})
+        analysis = agent.analyze_question("Autoscaling for peak load")
+        self.assertEqual(analysis["primary_aspects"], [DevOpsAspect.SCALABILITY])
+        self.assertIn("aspect_scores", analysis["context"])
+        self.assertEqual(agent.analyze_questions(["Autoscaling for peak load"]), [analysis])
+
+
+if __name__ == '__main__':
+    unittest.main()
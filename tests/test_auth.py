@@ -0,0 +1,37 @@
+import time
+import unittest
+import jwt
+from devops_agent.auth import AuthManager
+
+
+class TestAuthManager(unittest.TestCase):
+    def setUp(self):
+        """Create a user and a token"""
+        self.auth = AuthManager(secret_key="test-secret")
+        self.auth.create_user("admin", "password")
+        self.token = self.auth.generate_token("admin", "password")
+
+    def test_verification_is_cached(self):
+        """Test that repeated checks of the same token hit the cache"""
+        claims = self.auth.verify_token(self.token)
+        self.assertEqual(claims["user_id"], "1")
+        self.assertTrue(self.auth.is_authorized(self.token))
+        self.assertTrue(self.auth.is_authorized(self.token))
+        stats = self.auth.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertFalse(self.auth.is_authorized("not-a-token"))
+
+    def test_rotation_and_expiry_invalidate_entries(self):
+        """Test that a new secret or an expired token is never served from cache"""
+        self.assertTrue(self.auth.is_authorized(self.token))
+        self.auth.rotate_secret("new-secret")
+        self.assertFalse(self.auth.is_authorized(self.token))
+
+        short_lived = jwt.encode({"user_id": "1", "exp": int(time.time()) + 1}, "new-secret", algorithm="HS256")
+        self.assertTrue(self.auth.is_authorized(short_lived))
+        time.sleep(1.1)
+        self.assertFalse(self.auth.is_authorized(short_lived))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import unittest
+from devops_agent.benchmarks import compare, run_suite, synthetic_records
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_suite_produces_json_report(self):
+        """Test a tiny run end to end"""
+        report = run_suite([50], backend="log", operations=5)
+        json.dumps(report)
+        for metric in ("bulk_add", "add", "search", "search_tagged", "get", "startup"):
+            self.assertIn(f"catalog_50/{metric}", report["results"])
+        self.assertEqual(report["results"]["execute_python"]["ops"], 5)
+        self.assertIn("verify_token_cold", report["results"])
+        self.assertEqual(report["results"]["scheduler_50/add"]["ops"], 50)
+
+    def test_synthetic_catalog_is_deterministic(self):
+        """Test that the same seed yields the same catalog"""
+        self.assertEqual(synthetic_records(20, seed=3), synthetic_records(20, seed=3))
+        self.assertNotEqual(synthetic_records(20, seed=3), synthetic_records(20, seed=4))
+
+    def test_compare_flags_regressions_above_noise(self):
+        """Test threshold and noise floor handling in the baseline comparison"""
+        baseline = {"results": {
+            "search": {"p50_ms": 10.0},
+            "get": {"p50_ms": 0.001},
+            "startup": {"total_s": 1.0},
+            "removed": {"p50_ms": 1.0},
+        }}
+        current = {"results": {
+            "search": {"p50_ms": 13.0},
+            "get": {"p50_ms": 0.003},
+            "startup": {"total_s": 1.1},
+            "added": {"p50_ms": 1.0},
+        }}
+        rows = {row["metric"]: row for row in compare(current, baseline, threshold=0.2)}
+        self.assertEqual(set(rows), {"search", "get", "startup"})
+        self.assertTrue(rows["search"]["regression"])
+        self.assertFalse(rows["get"]["regression"])
+        self.assertFalse(rows["startup"]["regression"])
+
+
+if __name__ == '__main__':
+    unittest.main()
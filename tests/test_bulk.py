@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent
+
+
+class TestBulkImportExport(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment before each test"""
+        self.test_storage = "test_automations.json"
+        self.agent = DevOpsAutomationAgent(storage_path=self.test_storage, auth_required=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.agent.close()
+        if os.path.exists(self.test_storage):
+            os.remove(self.test_storage)
+
+    def test_bulk_add_reports_errors_without_aborting(self):
+        """Test that bad records are reported while good ones are stored"""
+        outcome = self.agent.add_automations_bulk([
+            {"question": "Disk", "script": "df -h", "script_type": "bash", "tags": ["disk"]},
+            {"question": "Broken", "script": "def (", "script_type": "python"},
+            {"question": "No script", "script_type": "bash"},
+            {"question": "Sum", "script": "result = 1 + 1", "script_type": "python"},
+        ], "test_user")
+
+        self.assertEqual([a["question"] for a in outcome["added"]], ["Disk", "Sum"])
+        self.assertEqual([error["index"] for error in outcome["errors"]], [1, 2])
+        with open(self.test_storage, encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["automations"]), 2)
+        self.assertEqual(len(self.agent.search_automation("disk")), 1)
+
+    def test_mistyped_records_are_reported(self):
+        """Test that fields of the wrong type are per-record errors, not batch failures"""
+        source = io.StringIO("\n".join(json.dumps(record) for record in [
+            {"question": 5, "script": "df -h", "script_type": "bash"},
+            {"question": "Disk", "script": "df -h", "script_type": "bash", "tags": ["disk"]},
+            {"question": "Tags", "script": "uptime", "script_type": "bash", "tags": [1]},
+            {"question": "Tag string", "script": "uptime", "script_type": "bash", "tags": "ops"},
+            {"question": "Timeout", "script": "uptime", "script_type": "bash", "timeout": "soon"},
+            {"question": "Script", "script": ["uptime"], "script_type": "bash"},
+        ]) + "\n")
+        outcome = self.agent.import_ndjson(source, "test_user")
+        self.assertEqual(outcome["added"], 1)
+        self.assertEqual([error["line"] for error in outcome["errors"]], [1, 3, 4, 5, 6])
+        self.assertIn("question", outcome["errors"][0]["error"])
+        with open(self.test_storage, encoding="utf-8") as f:
+            self.assertEqual([a["question"] for a in json.load(f)["automations"]], ["Disk"])
+
+    def test_failed_save_leaves_nothing_in_memory(self):
+        """Test that a batch whose save fails is rolled back in memory"""
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        self.agent.storage.save_batch = fail
+        with self.assertRaises(OSError):
+            self.agent.add_automations_bulk([
+                {"question": f"Check {n}", "script": f"echo {n}", "script_type": "bash"} for n in range(3)
+            ], "test_user")
+        self.assertEqual(list(self.agent.iter_automations()), [])
+        self.assertEqual(self.agent.search_automation("check"), [])
+        self.assertEqual(self.agent.automations_db["versions"], {})
+        self.assertEqual(self.agent.automations_db["blobs"], {})
+
+    def test_ndjson_round_trip(self):
+        """Test exporting the catalog and importing it into another agent"""
+        self.agent.add_automations_bulk([
+            {"question": f"Check {n}", "script": f"echo {n}", "script_type": "bash"} for n in range(5)
+        ], "test_user")
+        exported = io.StringIO()
+        self.assertEqual(self.agent.export_ndjson(exported), 5)
+
+        source = io.StringIO(exported.getvalue() + "not json\n")
+        other_storage = "test_automations_import.json"
+        other = DevOpsAutomationAgent(storage_path=other_storage, auth_required=False)
+        try:
+            outcome = other.import_ndjson(source, "test_user", batch_size=2)
+            self.assertEqual(outcome["added"], 5)
+            self.assertEqual(outcome["errors"][0]["line"], 6)
+            self.assertEqual(other.get_automation(5, count_usage=False)["script"], "echo 4")
+        finally:
+            other.close()
+            os.remove(other_storage)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.catalog import LazyRecord, MappedCatalogBackend
+from devops_agent.search_index import SearchIndex
+
+
+class TestMappedCatalog(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for catalog files"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "catalog.idx")
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        shutil.rmtree(self.tmp_dir)
+
+    def _agent(self, **kwargs):
+        return DevOpsAutomationAgent(storage_path=self.path, auth_required=False,
+                                     storage_backend=kwargs.pop("backend", "catalog"), **kwargs)
+
+    def _populate(self, agent):
+        agent.add_automation(
+            question="Disk usage",
+            script="result = params.get('n', 1) * 2",
+            tags=["disk"],
+            script_type=ScriptType.PYTHON,
+            user_id="test_user"
+        )
+        agent.add_automation(
+            question="Uptime",
+            script="uptime",
+            tags=["system"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+        agent.update_script(2, "uptime -p", "test_user")
+
+    def test_scripts_load_on_access(self):
+        """Test that reopened records hold metadata only until the script is needed"""
+        agent = self._agent()
+        self._populate(agent)
+        agent.close()
+
+        reopened = self._agent()
+        record = reopened._automations_by_id[1]
+        self.assertIsInstance(record, LazyRecord)
+        self.assertFalse(record.script_loaded)
+        self.assertEqual(reopened.search_automation("disk")[0]["id"], 1)
+        self.assertEqual(reopened.execute_automation(1, "test_user", params={"n": 4})["result"], 8)
+        self.assertTrue(record.script_loaded)
+        self.assertEqual([v["script"] for v in reopened.get_versions(2)], ["uptime", "uptime -p"])
+        reopened.close()
+
+    def test_compaction_and_export(self):
+        """Test that a compacted index reopens and exports complete records"""
+        agent = self._agent(backend=MappedCatalogBackend(self.path, compact_every=1))
+        self._populate(agent)
+        agent.close()
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.readline(), b"mapped-catalog/2\n")
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+
+        reopened = self._agent()
+        exported = io.StringIO()
+        reopened.export_ndjson(exported)
+        lines = [json.loads(line) for line in exported.getvalue().splitlines()]
+        self.assertEqual(lines[1]["script"], "uptime -p")
+        self.assertFalse(reopened._automations_by_id[2].script_loaded)
+        reopened.close()
+
+    def test_reopened_index_is_read_lazily(self):
+        """Test that a compacted catalog reopens without decoding records and searches like a rebuilt index"""
+        words = ["disk", "nginx", "backup", "certificate"]
+        records = [{"question": f"{words[n % 4]} check on host{n}", "script": f"echo {n}",
+                    "script_type": "bash", "tags": [words[(n + 1) % 4]]} for n in range(40)]
+        agent = self._agent(backend=MappedCatalogBackend(self.path, compact_every=4))
+        agent.add_automations_bulk(records[:30], "test_user")
+        agent.add_automations_bulk(records[30:], "test_user")
+        agent.update_script(3, "echo changed", "test_user")
+        agent.get_automation(7)
+        agent.close()
+
+        reopened = self._agent()
+        self.assertEqual(len(reopened._automations_by_id), 40)
+        self.assertEqual(reopened._automations_by_id._records, {})
+        self.assertEqual(reopened.export_ndjson(io.StringIO()), 40)
+        self.assertEqual(reopened.revalidate(), [])
+        self.assertEqual(reopened._automations_by_id._records, {})
+        self.assertEqual(reopened.get_automation(7, count_usage=False)["times_used"], 1)
+        rebuilt = SearchIndex()
+        rebuilt.build(reopened.iter_automations())
+        for query, tags in [("disk", None), ("host1", None), ("ost2", None), ("nginx", ["backup"]), ("", ["disk"])]:
+            with self.subTest(query=query, tags=tags):
+                self.assertEqual(reopened.search_index.search(query, tags=tags), rebuilt.search(query, tags=tags))
+        self.assertEqual([v["script"] for v in reopened.get_versions(3)], ["echo 2", "echo changed"])
+
+        added = reopened.add_automation("Rotate nginx logs", "logrotate -f", ["web"], ScriptType.BASH, "test_user")
+        self.assertEqual(added["id"], 41)
+        self.assertEqual(reopened.search_automation("logrotate rotate")[0]["id"], 41)
+        reopened.close()
+
+    def test_compaction_by_another_agent(self):
+        """Test that an agent picks up a new index written by another agent sharing the catalog"""
+        first = self._agent(backend=MappedCatalogBackend(self.path, compact_every=1))
+        second = self._agent()
+        self._populate(second)
+        second.get_automation(1)
+        second.flush_usage()
+        first.add_automation("Rotate logs", "logrotate -f", ["logs"], ScriptType.BASH, "test_user")
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+
+        self.assertEqual(second.refresh(), 1)
+        self.assertEqual(second.search_automation("rotate")[0]["id"], 3)
+        self.assertEqual([v["script"] for v in second.get_versions(2)], ["uptime", "uptime -p"])
+        second.get_automation(1)
+        second.close()
+        first.close()
+
+        reopened = self._agent()
+        self.assertEqual(reopened.get_automation(1, count_usage=False)["times_used"], 2)
+        self.assertEqual(reopened.get_automation(3, count_usage=False)["script"], "logrotate -f")
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import threading
+import time
+import unittest
+from compliance_checks import (
+    ComplianceEngine, Control, check_pci_compliance, check_soc2_compliance, evaluate_controls, setting_check
+)
+
+COMPLIANT_CONFIG = {
+    'access_control': {'rbac_enabled': True, 'mfa_enabled': True},
+    'encryption': {'at_rest': True, 'in_transit': True},
+    'logging': {'audit_enabled': True, 'retention_days': 400},
+    'availability': {'uptime_target': 99.95, 'dr_plan': True},
+    'processing': {'input_validation': True, 'error_handling': True},
+    'data': {'classification': True, 'retention_policy': True, 'cardholder_data_encrypted': True},
+    'privacy': {'data_protection': True, 'consent': True},
+    'security': {'incident_response_plan': True, 'integrity_monitoring': True, 'policies_documented': True,
+                 'vulnerability_scanning': True},
+    'assets': {'inventory': True},
+    'network': {'firewall_enabled': True},
+    'monitoring': {'security_alerts': True},
+}
+
+
+def passing(status=True):
+    return {'status': status, 'finding': None if status else 'bad', 'severity': 'high',
+            'recommendation': None if status else 'fix'}
+
+
+class TestComplianceEngine(unittest.TestCase):
+    def _engine(self, checks, frameworks, **kwargs):
+        """Engine over controls built from plain functions"""
+        controls = {name: Control(name, check, depends_on=depends_on, timeout=timeout)
+                    for name, (check, depends_on, timeout) in checks.items()}
+        return ComplianceEngine(controls=controls, frameworks=frameworks, **kwargs)
+
+    def test_builtin_frameworks(self):
+        """Test all four frameworks against a compliant and a weak config"""
+        reports = ComplianceEngine().audit(COMPLIANT_CONFIG)
+        self.assertEqual(set(reports), {'soc2', 'fedramp', 'iso', 'pci'})
+        self.assertTrue(all(report['compliant'] for report in reports.values()))
+
+        weak = dict(COMPLIANT_CONFIG, encryption={'at_rest': False, 'in_transit': True})
+        pci = check_pci_compliance(weak)
+        self.assertFalse(pci['compliant'])
+        self.assertEqual({finding['control'] for finding in pci['findings']}, {'cardholder_data'})
+        self.assertIn('encryption_at_rest', pci['findings'][0]['finding'])
+        self.assertEqual(check_soc2_compliance(weak)['findings'][0]['control'], 'encryption')
+
+    def test_shared_controls_run_once_and_concurrently(self):
+        """Test deduplication across frameworks and that the audit costs about one slow control"""
+        calls = []
+        lock = threading.Lock()
+
+        def slow(system_config):
+            with lock:
+                calls.append(threading.current_thread().name)
+            time.sleep(0.3)
+            return passing()
+
+        checks = {name: (slow, (), None) for name in ('access', 'logging', 'crypto', 'network')}
+        frameworks = {
+            'a': {'security': {'access': 'access', 'logging': 'logging'}},
+            'b': {'security': {'access': 'access', 'crypto': 'crypto'}},
+            'c': {'ops': {'logging': 'logging', 'network': 'network'}},
+        }
+        started = time.perf_counter()
+        reports = self._engine(checks, frameworks).audit({})
+        elapsed = time.perf_counter() - started
+        self.assertEqual(len(calls), 4)
+        self.assertLess(elapsed, 0.9)
+        self.assertTrue(all(report['compliant'] for report in reports.values()))
+
+    def test_dependencies_timeouts_and_errors(self):
+        """Test that failed dependencies short-circuit and slow or broken checks fail"""
+        ran = []
+
+        def dependent(system_config):
+            ran.append('dependent')
+            return passing()
+
+        def hang(system_config):
+            time.sleep(1)
+            return passing()
+
+        def broken(system_config):
+            raise KeyError('missing')
+
+        checks = {
+            'base': (lambda system_config: passing(False), (), None),
+            'dependent': (dependent, ('base',), None),
+            'slow': (hang, (), 0.1),
+            'broken': (broken, (), None),
+        }
+        frameworks = {'f': {'all': {'dependent': 'dependent', 'slow': 'slow', 'broken': 'broken'}}}
+        engine = self._engine(checks, frameworks)
+        self.assertEqual(engine.plan(['f']), [['base', 'slow', 'broken'], ['dependent']])
+
+        started = time.perf_counter()
+        report = engine.audit({})['f']
+        self.assertLess(time.perf_counter() - started, 0.8)
+        findings = {finding['control']: finding['finding'] for finding in report['findings']}
+        self.assertEqual(ran, [])
+        self.assertIn('depends on failing base', findings['dependent'])
+        self.assertIn('timed out', findings['slow'])
+        self.assertIn('KeyError', findings['broken'])
+
+    def test_results_are_cached_per_config(self):
+        """Test TTL caching of control results keyed by the system config"""
+        calls = []
+
+        def check(system_config):
+            calls.append(system_config['value'])
+            return passing()
+
+        engine = self._engine({'only': (check, (), None)}, {'f': {'all': {'only': 'only'}}}, cache_ttl=60)
+        engine.audit({'value': 1})
+        engine.audit({'value': 1})
+        engine.audit({'value': 2})
+        self.assertEqual(calls, [1, 2])
+        engine.clear_cache()
+        engine.audit({'value': 1})
+        self.assertEqual(calls, [1, 2, 1])
+
+    def test_evaluate_controls_and_setting_checks(self):
+        """Test the nested evaluation helper with a setting check"""
+        check = setting_check('logging.retention_days', 'too short', 'keep longer', passes=lambda days: days >= 30)
+        report = evaluate_controls({'logging': {'retention': check({'logging': {'retention_days': 7}})}})
+        self.assertFalse(report['compliant'])
+        self.assertEqual(report['recommendations'], ['keep longer'])
+
+
+if __name__ == '__main__':
+    unittest.main()
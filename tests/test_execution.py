@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.execution import ExecutionEngine
+
+
+class TestExecutionEngine(unittest.TestCase):
+    def test_per_user_limit_queues_excess_runs(self):
+        """Test that a user never has more runs in flight than allowed"""
+        engine = ExecutionEngine(max_workers=4, max_per_user=1)
+        lock = threading.Lock()
+        active = {"alice": 0, "bob": 0}
+        peak = {"alice": 0, "bob": 0}
+
+        def task(user):
+            with lock:
+                active[user] += 1
+                peak[user] = max(peak[user], active[user])
+            time.sleep(0.02)
+            with lock:
+                active[user] -= 1
+            return user
+
+        futures = [engine.submit(user, lambda user=user: task(user)) for user in ["alice", "alice", "bob", "alice"]]
+        self.assertEqual([future.result(timeout=5) for future in futures], ["alice", "alice", "bob", "alice"])
+        self.assertEqual(peak, {"alice": 1, "bob": 1})
+        engine.shutdown()
+
+    def test_shutdown_settles_every_future(self):
+        """Test that shutdown finishes the running task, cancels queued ones and refuses new ones"""
+        engine = ExecutionEngine(max_workers=1)
+        started = threading.Event()
+
+        def task():
+            started.set()
+            time.sleep(0.1)
+            return "done"
+
+        running = engine.submit("alice", task)
+        queued = engine.submit("alice", lambda: "never")
+        self.assertTrue(started.wait(5))
+        engine.shutdown()
+        self.assertEqual(running.result(timeout=5), "done")
+        self.assertTrue(queued.cancelled())
+        with self.assertRaises(RuntimeError):
+            engine.submit("alice", lambda: "late")
+
+
+class TestConcurrentExecution(unittest.TestCase):
+    def setUp(self):
+        """Set up an agent with a small worker pool"""
+        self.test_storage = "test_automations.json"
+        self.agent = DevOpsAutomationAgent(
+            storage_path=self.test_storage,
+            auth_required=False,
+            max_workers=4
+        )
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.agent.close()
+        if os.path.exists(self.test_storage):
+            os.remove(self.test_storage)
+
+    def _add(self, script, timeout=None):
+        return self.agent.add_automation(
+            question="Sleep",
+            script=script,
+            tags=["test"],
+            script_type=ScriptType.BASH,
+            user_id="test_user",
+            timeout=timeout
+        )
+
+    def test_execute_many_runs_in_parallel(self):
+        """Test that several shell automations overlap instead of running serially"""
+        ids = [self._add("sleep 0.3")["id"] for _ in range(4)]
+        started = time.monotonic()
+        results = [future.result(timeout=5) for future in self.agent.execute_many(ids, "test_user")]
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(all(result["success"] for result in results))
+
+    def test_timeout_and_async_api(self):
+        """Test per-automation timeouts through the async entry point"""
+        automation = self._add("sleep 5", timeout=0.2)
+        result = asyncio.run(self.agent.execute_automation_async(automation["id"], "test_user"))
+        self.assertFalse(result["success"])
+        self.assertIn("Timed out", result["error"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.exceptions import ExecutionError
+from devops_agent.fanout import FanOut, LocalTransport, Transport
+
+
+class RecordingTransport(Transport):
+    """Fails targets marked ``fail`` and tracks how many run at once."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.hosts = []
+
+    def run(self, automation, params, timeout):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.hosts.append(params["host"])
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if params.get("fail"):
+            raise ExecutionError(f"{params['host']} unreachable")
+        return f"ok from {params['host']}"
+
+
+def _finished(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class TestFanOut(unittest.TestCase):
+    def setUp(self):
+        """Set up an agent with a Python and a shell automation"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.agent = DevOpsAutomationAgent(storage_path=os.path.join(self.tmp_dir, "automations.json"),
+                                           auth_required=False, max_workers=8)
+        self.double = self.agent.add_automation(
+            "Double", "result = params['n'] * 2", ["math"], ScriptType.PYTHON, "test_user"
+        )
+        self.greet = self.agent.add_automation(
+            "Greet host", 'echo "hello $HOST"; test "$HOST" != bad', ["hosts"], ScriptType.BASH, "test_user"
+        )
+
+    def tearDown(self):
+        """Close the agent and remove its files"""
+        self.agent.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_results_stream_for_every_target(self):
+        """Test that each target yields one record and the summary adds up"""
+        targets = [{"n": n} for n in range(20)]
+        fanout = self.agent.execute_fanout(self.double["id"], "test_user", targets, max_parallel=4)
+        records = list(fanout)
+        self.assertEqual(sorted(record["target"] for record in records), list(range(20)))
+        self.assertTrue(all(record["result"] == record["params"]["n"] * 2 for record in records))
+        self.assertTrue(fanout.wait(5))
+        summary = fanout.summary()
+        self.assertEqual((summary["total"], summary["succeeded"], summary["failed"]), (20, 20, 0))
+        self.assertIsNone(summary["aborted"])
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_parallel targets run at once"""
+        transport = RecordingTransport()
+        targets = [{"host": f"web{n}"} for n in range(12)]
+        fanout = self.agent.execute_fanout(self.greet["id"], "test_user", targets, max_parallel=3,
+                                           transport=transport)
+        self.assertTrue(fanout.wait(5))
+        self.assertLessEqual(transport.peak, 3)
+        self.assertEqual(sorted(transport.hosts), sorted(target["host"] for target in targets))
+        self.assertEqual(fanout.summary()["succeeded"], 12)
+
+    def test_failure_threshold_aborts_remaining_targets(self):
+        """Test that passing the failure threshold skips the targets not yet started"""
+        transport = RecordingTransport(delay=0)
+        targets = [{"host": f"db{n}", "fail": n in (1, 2)} for n in range(10)]
+        fanout = self.agent.execute_fanout(self.greet["id"], "test_user", targets, max_parallel=1,
+                                           max_failures=1, transport=transport)
+        records = list(fanout)
+        summary = fanout.summary()
+        self.assertEqual((summary["succeeded"], summary["failed"], summary["skipped"]), (1, 2, 7))
+        self.assertEqual(summary["failed_targets"], [1, 2])
+        self.assertIn("Aborted after 2", summary["aborted"])
+        self.assertEqual(len(records), 10)
+        self.assertEqual(sum(1 for record in records if record.get("skipped")), 7)
+        self.assertEqual(transport.hosts, ["db0", "db1", "db2"])
+
+    def test_local_transport_runs_subprocesses(self):
+        """Test the local transport with params as environment variables and exit codes as outcomes"""
+        targets = [{"host": "alpha"}, {"host": "bad"}]
+        fanout = self.agent.execute_fanout(self.greet["id"], "test_user", targets, transport=LocalTransport())
+        records = {record["params"]["host"]: record for record in fanout}
+        self.assertEqual(records["alpha"]["result"]["stdout"], "hello alpha\n")
+        self.assertFalse(records["bad"]["success"])
+        self.assertIn("status 1", records["bad"]["error"])
+
+        fanout = self.agent.execute_fanout(self.double["id"], "test_user", [{"n": 21}], transport=LocalTransport())
+        self.assertEqual(next(iter(fanout))["result"], 42)
+
+    def test_shell_targets_get_their_params_by_default(self):
+        """Test that a shell fan-out without a transport passes each target's params to the script"""
+        fanout = self.agent.execute_fanout(self.greet["id"], "test_user", [{"host": "alpha"}, {"host": "beta"}])
+        outputs = {record["params"]["host"]: record["result"]["stdout"] for record in fanout}
+        self.assertEqual(outputs, {"alpha": "hello alpha\n", "beta": "hello beta\n"})
+
+    def test_instant_completions_do_not_recurse(self):
+        """Test that many runs finishing as soon as they are submitted all count as succeeded"""
+        targets = [{"n": n} for n in range(5000)]
+        fanout = FanOut(targets, lambda params: _finished({"success": True, "result": params["n"]}),
+                        max_parallel=1).start()
+        self.assertTrue(fanout.wait(30))
+        summary = fanout.summary()
+        self.assertEqual((summary["succeeded"], summary["failed"], summary["skipped"]), (5000, 0, 0))
+        self.assertEqual(len(list(fanout)), 5000)
+
+    def test_targets_that_cannot_start_are_skipped(self):
+        """Test that a submit error skips the remaining targets instead of failing them"""
+        def submit(params):
+            if params["n"] >= 2:
+                raise RuntimeError("cannot schedule new automations after shutdown")
+            return _finished({"success": True, "result": params["n"]})
+
+        fanout = FanOut([{"n": n} for n in range(5)], submit, max_parallel=1).start()
+        self.assertTrue(fanout.wait(5))
+        summary = fanout.summary()
+        self.assertEqual((summary["succeeded"], summary["failed"], summary["skipped"]), (2, 0, 3))
+        self.assertEqual(summary["failed_targets"], [])
+        self.assertIn("Could not start target 2", summary["aborted"])
+
+    def test_empty_and_unknown(self):
+        """Test that no targets finish immediately and unknown automations are rejected"""
+        fanout = self.agent.execute_fanout(self.double["id"], "test_user", [])
+        self.assertTrue(fanout.wait(0))
+        self.assertEqual(list(fanout), [])
+        with self.assertRaises(ValueError):
+            self.agent.execute_fanout(999, "test_user", [{"n": 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
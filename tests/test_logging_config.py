@@ -0,0 +1,125 @@
+import json
+import logging
+import logging.handlers
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.logging_config import JSONFormatter, RotatingLogHandler, configure_logging, shutdown_logging
+
+
+class ThreadRecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def emit(self, record):
+        self.threads.append(threading.current_thread())
+
+
+class TestLoggingConfig(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for log files"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmp_dir, "logs", "agent.log")
+
+    def tearDown(self):
+        """Stop the listener threads and clean up"""
+        shutdown_logging()
+        shutil.rmtree(self.tmp_dir)
+
+    def _config(self, logger_name):
+        return {
+            'version': 1,
+            'disable_existing_loggers': False,
+            'formatters': {'json': {'()': 'devops_agent.logging_config.JSONFormatter'}},
+            'handlers': {
+                'file': {
+                    'class': 'devops_agent.logging_config.RotatingLogHandler',
+                    'filename': self.log_path,
+                    'maxBytes': 1024 * 1024,
+                    'backupCount': 2,
+                    'formatter': 'json',
+                },
+            },
+            'loggers': {logger_name: {'handlers': ['file'], 'level': 'INFO'}},
+        }
+
+    def _records(self):
+        with open(self.log_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_json_formatter_keeps_extra_fields(self):
+        """Test that fields passed with extra= become JSON keys"""
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "ran %s", ("x",), None)
+        record.execution_id = "abc"
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry["message"], "ran x")
+        self.assertEqual(entry["execution_id"], "abc")
+        self.assertEqual(entry["level"], "INFO")
+
+    def test_handlers_write_from_background_thread(self):
+        """Test that configured handlers run on the listener thread, not the caller's"""
+        recorder = ThreadRecordingHandler()
+        config = self._config("queued_test")
+        config['handlers']['recorder'] = {'()': lambda: recorder}
+        config['loggers']['queued_test']['handlers'].append('recorder')
+        configure_logging(config)
+        logger = logging.getLogger("queued_test")
+        self.assertEqual([type(handler) for handler in logger.handlers], [logging.handlers.QueueHandler])
+
+        logger.info("hello", extra={"duration_ms": 1.5})
+        shutdown_logging()
+
+        self.assertEqual(len(recorder.threads), 1)
+        self.assertIsNot(recorder.threads[0], threading.current_thread())
+        self.assertEqual(self._records()[0]["duration_ms"], 1.5)
+        self.assertEqual(logger.handlers, [])
+
+    def test_rotation_by_size_and_age(self):
+        """Test that the handler rolls over at maxBytes and after the interval"""
+        handler = RotatingLogHandler(self.log_path, maxBytes=200, backupCount=3, interval=0.05)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("rotation_test")
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            for _ in range(10):
+                logger.warning("x" * 50)
+            self.assertTrue(os.path.exists(f"{self.log_path}.1"))
+            self.assertLessEqual(os.path.getsize(self.log_path), 200)
+
+            handler.doRollover()
+            logger.warning("first")
+            time.sleep(0.1)
+            logger.warning("second")
+            with open(f"{self.log_path}.1", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "first\n")
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+    def test_agent_logs_execution_ids_and_durations(self):
+        """Test structured execution records from the agent"""
+        configure_logging(self._config("devops_agent"))
+        agent = DevOpsAutomationAgent(storage_path=os.path.join(self.tmp_dir, "automations.json"),
+                                      auth_required=False)
+        try:
+            automation = agent.add_automation("one", "result = 1", ["t"], ScriptType.PYTHON, "test_user")
+            result = agent.execute_automation(automation["id"], "test_user")
+        finally:
+            agent.close()
+        shutdown_logging()
+
+        executions = [record for record in self._records() if "execution_id" in record]
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(executions[0]["execution_id"], result["execution_id"])
+        self.assertEqual(executions[0]["outcome"], "success")
+        self.assertGreaterEqual(executions[0]["duration_ms"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from urllib.request import urlopen
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.metrics import Histogram, MetricsRegistry, SamplingProfiler
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_histogram_quantiles(self):
+        """Test that quantiles fall in the right bucket and never exceed the maximum"""
+        histogram = Histogram(buckets=(0.001, 0.01, 0.1))
+        for _ in range(90):
+            histogram.observe(0.0005)
+        for _ in range(10):
+            histogram.observe(0.05)
+        self.assertEqual(histogram.quantile(0.5), 0.001)
+        self.assertEqual(histogram.quantile(0.95), 0.05)
+        self.assertEqual(histogram.count, 100)
+
+    def test_prometheus_rendering(self):
+        """Test counters, histograms and callbacks in the text exposition format"""
+        registry = MetricsRegistry(namespace="test")
+        registry.counter("runs_total", "Runs", outcome="ok").inc(2)
+        with registry.span("work"):
+            pass
+        registry.register_callback("items", "gauge", "Items", lambda: [({}, 7)])
+
+        text = registry.render()
+        self.assertIn("# TYPE test_runs_total counter", text)
+        self.assertIn('test_runs_total{outcome="ok"} 2.0', text)
+        self.assertIn('test_span_seconds_bucket{span="work",le="+Inf"} 1', text)
+        self.assertIn('test_span_seconds_count{span="work"} 1', text)
+        self.assertIn("test_items 7", text)
+
+        stats = registry.stats()
+        self.assertEqual(stats["runs_total"]["ok"], 2.0)
+        self.assertEqual(stats["span_seconds"]["work"]["count"], 1)
+        self.assertEqual(stats["items"]["total"], 7)
+
+    def test_sampling_profiler_sees_busy_thread(self):
+        """Test that the profiler records the stack of a running thread"""
+        stop = threading.Event()
+
+        def spin_for_profiler():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=spin_for_profiler)
+        profiler = SamplingProfiler(interval=0.001)
+        worker.start()
+        profiler.start()
+        time.sleep(0.1)
+        folded = profiler.stop()
+        stop.set()
+        worker.join()
+        self.assertTrue(any("spin_for_profiler" in stack for stack in folded))
+
+
+class TestAgentMetrics(unittest.TestCase):
+    def setUp(self):
+        """Create an agent in a scratch directory"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.agent = DevOpsAutomationAgent(storage_path=os.path.join(self.tmp_dir, "automations.json"),
+                                           auth_required=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.agent.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hot_paths_are_timed_and_counted(self):
+        """Test spans, execution outcomes, cache hits and bytes written"""
+        ok = self.agent.add_automation("ok", "result = 1", ["t"], ScriptType.PYTHON, "test_user")
+        bad = self.agent.add_automation("bad", "result = 1 / 0", ["t"], ScriptType.PYTHON, "test_user")
+        self.agent.execute_automation(ok["id"], "test_user")
+        self.agent.execute_automation(ok["id"], "test_user")
+        self.agent.execute_automation(bad["id"], "test_user")
+        self.agent.search_automation("ok")
+
+        stats = self.agent.stats()
+        for span in ("load", "hash", "validate", "save", "lookup", "search", "execute"):
+            self.assertGreater(stats["span_seconds"][span]["count"], 0, span)
+        self.assertEqual(stats["executions_total"]["success,python"], 2)
+        self.assertEqual(stats["executions_total"]["failure,python"], 1)
+        self.assertGreater(stats["cache_hits_total"]["code"], 0)
+        self.assertGreater(stats["storage_bytes_written_total"]["JSONFileBackend"], 0)
+        self.assertEqual(stats["automations"]["total"], 2)
+
+    def test_metrics_endpoint(self):
+        """Test scraping /metrics over HTTP"""
+        server = self.agent.start_metrics_server(port=0)
+        try:
+            with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5) as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn('devops_agent_span_seconds_count{span="load"} 1', body)
+        self.assertIn("devops_agent_automations 0", body)
+
+
+if __name__ == '__main__':
+    unittest.main()
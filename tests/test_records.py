@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.records import AutomationRecord, VersionRecord, json_default
+
+
+def _automation(automation_id, **overrides):
+    script = f"echo {automation_id}"
+    data = {
+        "id": automation_id,
+        "question": f"Question {automation_id}",
+        "script": script,
+        "script_type": "bash",
+        "tags": ["logs", "linux"],
+        "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456).isoformat(),
+        "created_by": "admin",
+        "times_used": 0,
+        "version": 1,
+        "script_hash": hashlib.sha256(script.encode()).hexdigest(),
+    }
+    data.update(overrides)
+    return data
+
+
+class TestAutomationRecord(unittest.TestCase):
+    def test_behaves_like_the_dict(self):
+        """Test that a record reads, compares and serializes like the dict it was built from"""
+        data = _automation(1, timeout=5)
+        record = AutomationRecord(data)
+        self.assertEqual(record, data)
+        self.assertEqual(dict(record), data)
+        self.assertEqual(list(record), list(data))
+        self.assertEqual(json.loads(json.dumps(record, default=json_default)), data)
+        self.assertEqual(pickle.loads(pickle.dumps(record)), data)
+        self.assertIsInstance(record["tags"], list)
+
+        record["times_used"] += 1
+        self.assertEqual(record.pop("timeout"), 5)
+        self.assertNotIn("timeout", record)
+        self.assertEqual(record.get("cache_ttl"), None)
+        expected = dict(data, times_used=1)
+        del expected["timeout"]
+        self.assertEqual(record.to_dict(), expected)
+
+    def test_fields_are_stored_compactly(self):
+        """Test that hashes and timestamps are packed and equal tag lists share one tuple"""
+        first = AutomationRecord(_automation(1))
+        second = AutomationRecord(_automation(2, tags=["logs", "linux"]))
+        self.assertIsInstance(first.script_hash, bytes)
+        self.assertIsInstance(first.created_at, datetime)
+        self.assertIs(first.tags, second.tags)
+        self.assertIs(first.script_type, second.script_type)
+
+    def test_unusual_values_round_trip(self):
+        """Test that values which cannot be packed losslessly are kept as given"""
+        data = _automation(1, script_hash="ABCD", created_at="yesterday")
+        record = AutomationRecord(data)
+        self.assertEqual(record["script_hash"], "ABCD")
+        self.assertEqual(record["created_at"], "yesterday")
+        version = VersionRecord({"version": 2, "script_hash": "xyz", "modified_at": "2024-05-01", "modified_by": "a"})
+        self.assertEqual(version["modified_at"], "2024-05-01")
+        self.assertEqual(version["script_hash"], "xyz")
+
+    def test_smaller_than_dicts(self):
+        """Test that records loaded from JSON take well under half the memory of the dicts"""
+        text = json.dumps([_automation(index, question="q", script="s") for index in range(5000)])
+
+        def measure(factory):
+            factory(_automation(0))
+            tracing = tracemalloc.is_tracing()
+            if not tracing:
+                tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            records = [factory(data) for data in json.loads(text)]
+            size = tracemalloc.get_traced_memory()[0] - before
+            if not tracing:
+                tracemalloc.stop()
+            self.assertEqual(len(records), 5000)
+            return size
+
+        self.assertLess(measure(AutomationRecord), measure(dict) / 2)
+
+
+class TestAgentRecords(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for the database"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "automations.db")
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_backends_round_trip_records(self):
+        """Test that records persist and reload unchanged through every backend"""
+        for backend in ("json", "log", "sqlite", "catalog"):
+            with self.subTest(backend=backend):
+                path = f"{self.path}.{backend}"
+                agent = DevOpsAutomationAgent(storage_path=path, auth_required=False, storage_backend=backend)
+                added = agent.add_automation("Rotate logs", "logrotate -f app", ["logs"], ScriptType.BASH,
+                                             "test_user", timeout=10)
+                expected = agent.update_script(added["id"], "logrotate -f app2", "test_user")
+                agent.close()
+
+                reopened = DevOpsAutomationAgent(storage_path=path, auth_required=False, storage_backend=backend)
+                self.assertIsInstance(reopened._automations_by_id[added["id"]], AutomationRecord)
+                self.assertEqual(reopened.get_automation(added["id"], count_usage=False), expected)
+                self.assertEqual([version["version"] for version in reopened.get_versions(added["id"])], [1, 2])
+                reopened.close()
+
+    def test_public_results_are_plain_dicts(self):
+        """Test that every automation the agent hands out is a JSON-serializable copy"""
+        for backend in ("json", "log", "sqlite", "catalog"):
+            with self.subTest(backend=backend):
+                agent = DevOpsAutomationAgent(storage_path=f"{self.path}.{backend}", auth_required=False,
+                                              storage_backend=backend)
+                added = agent.add_automation("Rotate logs", "logrotate -f app", ["logs"], ScriptType.BASH,
+                                             "test_user")
+                bulk = agent.add_automations_bulk(
+                    [{"question": "Clean tmp", "script": "rm -rf /tmp/app", "script_type": "bash"}], "test_user"
+                )
+                results = [
+                    added,
+                    bulk,
+                    agent.update_script(added["id"], "logrotate -f app2", "test_user"),
+                    agent.set_cache_ttl(added["id"], 30, "test_user"),
+                    agent.get_automation(added["id"]),
+                    agent.search_automation("logs"),
+                    list(agent.iter_automations()),
+                    agent.get_versions(added["id"]),
+                ]
+                for result in results:
+                    json.dumps(result)
+
+                automations = [added, *bulk["added"], *results[2:5], *results[5], *results[6], *results[7]]
+                self.assertTrue(all(type(automation) is dict for automation in automations))
+                fetched = agent.get_automation(added["id"], count_usage=False)
+                fetched["tags"].append("changed")
+                self.assertEqual(agent.get_automation(added["id"], count_usage=False)["tags"], ["logs"])
+                agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
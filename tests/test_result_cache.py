@@ -0,0 +1,124 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.result_cache import ResultCache, params_key
+
+
+class TestResultCache(unittest.TestCase):
+    def test_params_are_canonicalized(self):
+        """Test that key order does not matter and unserializable params are uncacheable"""
+        self.assertEqual(params_key("h", {"a": 1, "b": 2}), params_key("h", {"b": 2, "a": 1}))
+        self.assertEqual(params_key("h", None), params_key("h", {}))
+        self.assertNotEqual(params_key("h", {"a": 1}), params_key("h", {"a": 2}))
+        self.assertIsNone(params_key("h", {"a": object()}))
+
+    def test_concurrent_callers_share_one_run(self):
+        """Test single-flight coalescing of identical requests"""
+        cache = ResultCache()
+        calls = []
+        release = threading.Event()
+
+        def run():
+            calls.append(1)
+            release.wait(5)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(cache.get_or_run, "key", 60, run) for _ in range(8)]
+            while cache.misses + cache.coalesced < 8:
+                time.sleep(0.01)
+            release.set()
+            outcomes = [future.result() for future in futures]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in outcomes), [False] + [True] * 7)
+        self.assertEqual({value for value, _ in outcomes}, {"value"})
+
+    def test_expiry_and_uncached_failures(self):
+        """Test that results expire and rejected values are not kept"""
+        cache = ResultCache()
+        self.assertEqual(cache.get_or_run("key", 0.05, lambda: 1), (1, False))
+        self.assertEqual(cache.get_or_run("key", 0.05, lambda: 2), (1, True))
+        time.sleep(0.1)
+        self.assertEqual(cache.get_or_run("key", 0.05, lambda: 3), (3, False))
+
+        cache.get_or_run("bad", 60, lambda: None, should_cache=lambda value: value is not None)
+        self.assertEqual(cache.get_or_run("bad", 60, lambda: 4), (4, False))
+
+
+class TestCachedExecution(unittest.TestCase):
+    def setUp(self):
+        """Create an agent and a file the probes append to"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.runs_file = os.path.join(self.tmp_dir, "runs")
+        self.agent = DevOpsAutomationAgent(storage_path=os.path.join(self.tmp_dir, "automations.json"),
+                                           auth_required=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.agent.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _runs(self):
+        if not os.path.exists(self.runs_file):
+            return 0
+        with open(self.runs_file, encoding="utf-8") as f:
+            return len(f.readlines())
+
+    def _probe(self, cache_ttl):
+        return self.agent.add_automation(
+            question="Probe",
+            script=f"sleep 0.2; echo run >> {self.runs_file}",
+            tags=["probe"],
+            script_type=ScriptType.BASH,
+            user_id="test_user",
+            cache_ttl=cache_ttl
+        )
+
+    def test_parallel_identical_executions_spawn_once(self):
+        """Test that a dashboard burst of identical calls runs the script once"""
+        automation = self._probe(cache_ttl=60)
+        results = [future.result() for future in self.agent.execute_many([automation["id"]] * 6, "test_user")]
+        self.agent.execute_automation(automation["id"], "test_user")
+
+        self.assertEqual(self._runs(), 1)
+        self.assertTrue(all(result["success"] for result in results))
+        self.assertEqual(sum(1 for result in results if result.get("cached")), 5)
+        self.assertEqual(self.agent.get_automation(automation["id"], count_usage=False)["times_used"], 7)
+
+    def test_uncacheable_automation_runs_every_time(self):
+        """Test that caching is opt-in and can be switched off again"""
+        automation = self._probe(cache_ttl=None)
+        self.agent.execute_automation(automation["id"], "test_user")
+        self.agent.execute_automation(automation["id"], "test_user")
+        self.assertEqual(self._runs(), 2)
+
+        self.agent.set_cache_ttl(automation["id"], 60, "test_user")
+        self.agent.execute_automation(automation["id"], "test_user")
+        self.agent.execute_automation(automation["id"], "test_user")
+        self.assertEqual(self._runs(), 3)
+
+    def test_params_select_separate_results(self):
+        """Test that results are keyed by params as well as script"""
+        automation = self.agent.add_automation(
+            question="Double",
+            script="result = params['n'] * 2",
+            tags=["math"],
+            script_type=ScriptType.PYTHON,
+            user_id="test_user",
+            cache_ttl=60
+        )
+        first = self.agent.execute_automation(automation["id"], "test_user", params={"n": 1})
+        second = self.agent.execute_automation(automation["id"], "test_user", params={"n": 2})
+        again = self.agent.execute_automation(automation["id"], "test_user", params={"n": 1})
+        self.assertEqual((first["result"], second["result"], again["result"]), (2, 4, 2))
+        self.assertTrue(again["cached"])
+
+
+if __name__ == '__main__':
+    unittest.main()
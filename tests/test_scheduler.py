@@ -0,0 +1,187 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import Future
+from datetime import datetime
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.scheduler import CronTrigger, IntervalTrigger, Scheduler
+
+
+def _at(*args):
+    return datetime(*args).timestamp()
+
+
+class TestTriggers(unittest.TestCase):
+    def test_interval_grid(self):
+        """Test that interval runs stay on a fixed grid from the start time"""
+        trigger = IntervalTrigger(10, start=100.0)
+        self.assertEqual(trigger.next_after(50.0), 100.0)
+        self.assertEqual(trigger.next_after(100.0), 110.0)
+        self.assertEqual(trigger.next_after(137.5), 140.0)
+        fine = IntervalTrigger(0.05, start=1700000000.123)
+        moment = fine.start
+        for _ in range(1000):
+            following = fine.next_after(moment)
+            self.assertGreater(following, moment)
+            moment = following
+        with self.assertRaises(ValueError):
+            IntervalTrigger(0)
+
+    def test_cron_next_fire_times(self):
+        """Test steps, ranges, weekday and day-of-month rules and aliases"""
+        quarter = CronTrigger("*/15 * * * *")
+        self.assertEqual(quarter.next_after(_at(2024, 5, 1, 12, 7, 30)), _at(2024, 5, 1, 12, 15))
+        self.assertEqual(quarter.next_after(_at(2024, 5, 1, 12, 45)), _at(2024, 5, 1, 13, 0))
+
+        weekdays = CronTrigger("0 9 * * 1-5")
+        # 2024-05-03 is a Friday, so the next run is Monday morning
+        self.assertEqual(weekdays.next_after(_at(2024, 5, 3, 10, 0)), _at(2024, 5, 6, 9, 0))
+
+        # Both day fields restricted: the 1st of the month or any Sunday
+        either = CronTrigger("30 2 1 * 0")
+        self.assertEqual(either.next_after(_at(2024, 5, 1, 3, 0)), _at(2024, 5, 5, 2, 30))
+
+        self.assertEqual(CronTrigger("@monthly").next_after(_at(2024, 12, 15)), _at(2025, 1, 1))
+        self.assertEqual(CronTrigger("0 0 29 2 *").next_after(_at(2024, 3, 1)), _at(2028, 2, 29))
+
+    def test_invalid_cron_expressions(self):
+        """Test that malformed or impossible expressions are rejected"""
+        for expression in ("* * * *", "61 * * * *", "*/0 * * * *", "a * * * *", "5-1 * * * *"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    CronTrigger(expression)
+        with self.assertRaises(ValueError):
+            CronTrigger("0 0 30 2 *").next_after(_at(2024, 1, 1))
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        """Set up a scheduler on a fake clock that records dispatched runs"""
+        self.now = 1000.0
+        self.dispatched = []
+        self.scheduler = Scheduler(self._dispatch, clock=lambda: self.now, seed=1)
+
+    def _dispatch(self, schedule):
+        future = Future()
+        self.dispatched.append((schedule.automation_id, future))
+        return future
+
+    def _finish_all(self, success=True):
+        for _, future in self.dispatched:
+            if not future.done():
+                future.set_result({"success": success})
+
+    def test_runs_fire_when_due(self):
+        """Test that runs fire at each interval and record their outcome"""
+        schedule = self.scheduler.add(1, IntervalTrigger(10, start=1000.0))
+        self.assertEqual(self.scheduler.run_pending(1005.0), 0)
+        self.assertEqual(self.scheduler.run_pending(1010.0), 1)
+        self._finish_all()
+        self.assertEqual(self.scheduler.run_pending(1020.0), 1)
+        self._finish_all(success=False)
+        self.assertEqual(schedule.runs, 2)
+        self.assertEqual(schedule.failures, 1)
+        self.assertEqual(schedule.last_outcome, "failure")
+        self.assertEqual(schedule.next_run, 1030.0)
+        self.assertEqual(self.scheduler.counts["success"], 1)
+
+    def test_overlapping_runs_are_skipped(self):
+        """Test that a run still in progress blocks the next one unless overlap is allowed"""
+        exclusive = self.scheduler.add(1, IntervalTrigger(10, start=1000.0))
+        overlapping = self.scheduler.add(2, IntervalTrigger(10, start=1000.0), allow_overlap=True)
+        self.scheduler.run_pending(1010.0)
+        self.scheduler.run_pending(1020.0)
+        self.assertEqual([automation_id for automation_id, _ in self.dispatched], [1, 2, 2])
+        self.assertEqual(exclusive.skipped, 1)
+        self.assertEqual(overlapping.running, 2)
+        self._finish_all()
+        self.scheduler.run_pending(1030.0)
+        self.assertEqual(exclusive.runs, 2)
+
+    def test_misfire_policies(self):
+        """Test catching up on a long gap once, for every missed run, or not at all"""
+        schedules = {
+            policy: self.scheduler.add(index, IntervalTrigger(10, start=1000.0), misfire_policy=policy,
+                                       misfire_grace=5, allow_overlap=True)
+            for index, policy in enumerate(("run_once", "run_all", "skip"))
+        }
+        self.scheduler.run_pending(1045.0)
+        self.assertEqual(schedules["run_once"].runs, 1)
+        self.assertEqual(schedules["run_all"].runs, 4)
+        self.assertEqual(schedules["skip"].runs, 0)
+        for schedule in schedules.values():
+            self.assertEqual(schedule.next_run, 1050.0)
+        with self.assertRaises(ValueError):
+            self.scheduler.add(1, IntervalTrigger(10), misfire_policy="later")
+
+    def test_jitter_delays_runs_within_bounds(self):
+        """Test that jitter only ever delays a run, by at most the given seconds"""
+        schedules = [self.scheduler.add(index, IntervalTrigger(10, start=1000.0), jitter=3) for index in range(50)]
+        delays = [schedule.next_run - 1010.0 for schedule in schedules]
+        self.assertTrue(all(0 <= delay <= 3 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertEqual(self.scheduler.run_pending(1013.0), 50)
+
+    def test_removed_schedules_stop_and_are_compacted(self):
+        """Test that removing schedules stops their runs and keeps the heap small"""
+        schedules = [self.scheduler.add(1, IntervalTrigger(10, start=1000.0)) for _ in range(100)]
+        for schedule in schedules[:80]:
+            self.assertTrue(self.scheduler.remove(schedule.schedule_id))
+        self.assertFalse(self.scheduler.remove(schedules[0].schedule_id))
+        self.assertLessEqual(len(self.scheduler._heap), 60)
+        self.assertEqual(self.scheduler.run_pending(1010.0), 20)
+        self.assertEqual(self.scheduler.remove_automation(1), 20)
+        self.assertIsNone(self.scheduler.next_run_time())
+
+    def test_many_schedules(self):
+        """Test that tens of thousands of schedules register and fire in one pass"""
+        for index in range(20000):
+            self.scheduler.add(index, IntervalTrigger(60, start=1000.0 + index % 60))
+        self.assertEqual(self.scheduler.next_run_time(), 1001.0)
+        self.assertEqual(self.scheduler.run_pending(1060.0), 20000)
+        self.assertEqual(len(self.scheduler._heap), 20000)
+
+
+class TestAgentScheduling(unittest.TestCase):
+    def setUp(self):
+        """Set up an agent with a Python automation"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.agent = DevOpsAutomationAgent(storage_path=os.path.join(self.tmp_dir, "automations.json"),
+                                           auth_required=False)
+        self.automation = self.agent.add_automation(
+            "Double", "result = params['n'] * 2", ["math"], ScriptType.PYTHON, "test_user"
+        )
+
+    def tearDown(self):
+        """Close the agent and remove its files"""
+        self.agent.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_scheduled_runs_execute_on_the_worker_pool(self):
+        """Test that a schedule runs its automation repeatedly until removed"""
+        schedule = self.agent.schedule_automation(self.automation["id"], "test_user", interval=0.05,
+                                                  params={"n": 2})
+        deadline = time.time() + 5
+        while time.time() < deadline and self.agent.list_schedules()[0]["runs"] < 2:
+            time.sleep(0.02)
+        info = self.agent.list_schedules(self.automation["id"])[0]
+        self.assertGreaterEqual(info["runs"], 2)
+        self.assertEqual(info["interval"], 0.05)
+        self.assertTrue(self.agent.unschedule(schedule["schedule_id"], "test_user"))
+        self.assertEqual(self.agent.list_schedules(), [])
+        self.assertIn("devops_agent_scheduled_runs_total", self.agent.render_metrics())
+
+    def test_schedule_arguments_are_checked(self):
+        """Test that unknown automations and ambiguous triggers are rejected"""
+        with self.assertRaises(ValueError):
+            self.agent.schedule_automation(999, "test_user", interval=60)
+        with self.assertRaises(ValueError):
+            self.agent.schedule_automation(self.automation["id"], "test_user", interval=60, cron="* * * * *")
+        with self.assertRaises(ValueError):
+            self.agent.schedule_automation(self.automation["id"], "test_user", cron="not cron")
+
+
+if __name__ == '__main__':
+    unittest.main()
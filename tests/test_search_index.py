@@ -0,0 +1,73 @@
+import unittest
+from devops_agent.search_index import IndexSnapshot, SearchIndex
+
+
+def make_automation(automation_id, question, tags):
+    return {"id": automation_id, "question": question, "tags": tags}
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        """Build an index over a small catalog"""
+        self.documents = [
+            make_automation(1, "Check disk space on a host", ["system", "disk"]),
+            make_automation(2, "Restart the nginx service", ["web", "service"]),
+            make_automation(3, "Report disk usage per directory", ["storage"]),
+            make_automation(4, "Rotate nginx logs", ["web", "logs"]),
+        ]
+        self.index = SearchIndex()
+        self.index.build(self.documents)
+
+    def test_ranks_token_matches(self):
+        """Test that the document matching more query terms ranks first"""
+        ranked = self.index.search("nginx service")
+        self.assertEqual(ranked[0][0], 2)
+        self.assertIn(4, [doc_id for doc_id, _ in ranked])
+
+    def test_substring_and_prefix_fallback(self):
+        """Test that partial words still match like the old substring search"""
+        self.assertEqual([doc_id for doc_id, _ in self.index.search("isk spa")], [1])
+        self.assertEqual(sorted(doc_id for doc_id, _ in self.index.search("dis")), [1, 3])
+        self.assertEqual([doc_id for doc_id, _ in self.index.search("stor")], [3])
+
+    def test_tag_filter_and_pagination(self):
+        """Test filtering by tag and paging through results"""
+        ranked = self.index.search("nginx", tags=["logs"])
+        self.assertEqual([doc_id for doc_id, _ in ranked], [4])
+        first_page = self.index.search("", tags=["web"], limit=1)
+        second_page = self.index.search("", tags=["web"], limit=1, offset=1)
+        self.assertEqual([first_page[0][0], second_page[0][0]], [2, 4])
+
+    def test_add_replaces_existing_entry(self):
+        """Test that re-indexing an id drops its old terms"""
+        self.index.add(make_automation(2, "Reload haproxy", ["web"]))
+        self.assertEqual(self.index.search("nginx service")[0][0], 4)
+        self.assertEqual([doc_id for doc_id, _ in self.index.search("haproxy")], [2])
+
+    def test_snapshot_layers_match_a_full_build(self):
+        """Test that changes layered over an exported snapshot search and export like a rebuilt index"""
+        header, sections = self.index.export()
+        documents = {document["id"]: document for document in self.documents}
+        base = IndexSnapshot({name: memoryview(bytes(section)) for name, section in sections.items()},
+                             header, documents.__getitem__)
+        layered = SearchIndex(base=base)
+        for index in (layered, self.index):
+            index.add(make_automation(2, "Reload haproxy", ["web"]))
+            index.add(make_automation(5, "Check nginx disk usage", ["disk", "web"]))
+            index.remove(3)
+
+        self.assertEqual(len(layered), 4)
+        for query, tags in [("nginx service", None), ("disk", None), ("dis", None), ("isk spa", None),
+                            ("haproxy", None), ("", ["web"]), ("stor", None), ("nginx", ["disk"])]:
+            with self.subTest(query=query, tags=tags):
+                self.assertEqual(layered.search(query, tags=tags), self.index.search(query, tags=tags))
+
+        def as_bytes(exported):
+            header, sections = exported
+            return header, {name: bytes(section) for name, section in sections.items()}
+
+        self.assertEqual(as_bytes(layered.export()), as_bytes(self.index.export()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from devops.agent import Solution
+from devops.solution_cache import SolutionCache, normalize_question
+
+
+def make_solution(description):
+    return Solution(
+        description=description, implementation_steps=["Enable TLS"], considerations=[], risks=[],
+        estimated_effort="1d", tools_required=["nginx"], prerequisites=[], validation_steps=[]
+    )
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for persisted caches"""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after each test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_normalization_ignores_case_punctuation_and_filler(self):
+        """Test that trivially reworded questions share a key"""
+        self.assertEqual(normalize_question("How do I rotate the Nginx logs?"),
+                         normalize_question("rotate nginx logs"))
+
+    def test_near_duplicates_hit_and_unrelated_questions_miss(self):
+        """Test MinHash matching of near-identical questions"""
+        cache = SolutionCache()
+        question = "How can we set up automated PostgreSQL backups to S3 with daily retention on Kubernetes"
+        cache.put(question, make_solution("backups"))
+
+        self.assertEqual(cache.get(question.upper()).description, "backups")
+        near = "set up an automated postgresql backup to S3 with daily retention on our Kubernetes cluster"
+        self.assertEqual(cache.get(near).description, "backups")
+        self.assertIsNone(cache.get("Configure Prometheus alerting for Kafka consumer lag"))
+        self.assertIsNone(cache.get("How can we set up automated MySQL restores from GCS on Kubernetes"))
+        self.assertEqual((cache.hits, cache.near_hits, cache.misses), (1, 1, 2))
+
+    def test_lru_and_ttl_eviction(self):
+        """Test that the oldest entry is evicted and expired entries are dropped"""
+        cache = SolutionCache(maxsize=2, min_similarity=1.0)
+        cache.put("alpha question", make_solution("a"))
+        cache.put("beta question", make_solution("b"))
+        cache.get("alpha question")
+        cache.put("gamma question", make_solution("c"))
+        self.assertIsNone(cache.get("beta question"))
+        self.assertIsNotNone(cache.get("alpha question"))
+
+        expiring = SolutionCache(ttl=0.05)
+        expiring.put("alpha question", make_solution("a"))
+        time.sleep(0.1)
+        self.assertIsNone(expiring.get("alpha question"))
+        self.assertEqual(len(expiring), 0)
+
+    def test_persistence(self):
+        """Test that a saved cache is loaded by a new instance"""
+        path = os.path.join(self.tmp_dir, "solutions.json")
+        cache = SolutionCache(path=path)
+        cache.put("Rotate nginx logs", make_solution("logrotate"))
+        cache.save()
+
+        reloaded = SolutionCache(path=path)
+        self.assertEqual(reloaded.get("rotate NGINX logs!"), make_solution("logrotate"))
+
+    def test_unreadable_file_starts_empty(self):
+        """Test that a truncated or malformed cache file is ignored with a warning"""
+        path = os.path.join(self.tmp_dir, "solutions.json")
+        cache = SolutionCache(path=path)
+        cache.put("Rotate nginx logs", make_solution("logrotate"))
+        cache.save()
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+
+        for damaged in (content[:len(content) // 2], '{"entries": [{"question": "rotate nginx log"}]}', "[]"):
+            with self.subTest(damaged=damaged[:20]):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(damaged)
+                with self.assertLogs("devops.solution_cache", level="WARNING"):
+                    reloaded = SolutionCache(path=path)
+                self.assertEqual(len(reloaded), 0)
+                reloaded.put("Rotate nginx logs", make_solution("logrotate"))
+                reloaded.save()
+                self.assertEqual(len(SolutionCache(path=path)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.exceptions import ConflictError
+from devops_agent.storage import AppendOnlyLogBackend, SQLiteBackend
+
+SHARED_BACKENDS = ("json", "log", "sqlite", "catalog")
+
+
+def _add_from_process(path, backend, count):
+    agent = DevOpsAutomationAgent(storage_path=path, auth_required=False, storage_backend=backend)
+    for index in range(count):
+        agent.add_automation(
+            question=f"Process {os.getpid()} task {index}",
+            script=f"echo {os.getpid()} {index}",
+            tags=["shared"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+    agent.close()
+
+
+class TestStorageBackends(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for database files"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "automations.json")
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        shutil.rmtree(self.tmp_dir)
+
+    def _add(self, agent, question):
+        return agent.add_automation(
+            question=question,
+            script="echo ok",
+            tags=["test"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+
+    def test_log_backend_appends_and_replays(self):
+        """Test that mutations go to the log and survive a reload"""
+        agent = DevOpsAutomationAgent(storage_path=self.path, auth_required=False, storage_backend="log")
+        automation = self._add(agent, "First")
+        agent.get_automation(automation["id"])
+        agent.close()
+
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".log", encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        reloaded = DevOpsAutomationAgent(storage_path=self.path, auth_required=False, storage_backend="log")
+        self.assertEqual(reloaded.get_automation(1, count_usage=False)["times_used"], 1)
+        self.assertEqual(len(reloaded.automations_db["versions"]["1"]), 1)
+        reloaded.close()
+
+    def test_log_backend_compacts_and_ignores_torn_tail(self):
+        """Test compaction into a snapshot and recovery from a partial line"""
+        backend = AppendOnlyLogBackend(self.path, compact_every=1)
+        agent = DevOpsAutomationAgent(storage_path=self.path, auth_required=False, storage_backend=backend)
+        self._add(agent, "First")
+        agent.close()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+
+        with open(self.path + ".log", "a", encoding="utf-8") as f:
+            f.write('{"op": "automation", "data": {"id": 9')
+
+        agent = DevOpsAutomationAgent(storage_path=self.path, auth_required=False, storage_backend="log")
+        self._add(agent, "Second")
+        agent.close()
+
+        reloaded = AppendOnlyLogBackend(self.path).load()
+        self.assertEqual([a["question"] for a in reloaded["automations"]], ["First", "Second"])
+
+    def test_sqlite_backend_round_trip(self):
+        """Test that the SQLite backend persists automations and versions"""
+        db_path = os.path.join(self.tmp_dir, "automations.db")
+        agent = DevOpsAutomationAgent(storage_path=db_path, auth_required=False, storage_backend="sqlite")
+        self._add(agent, "First")
+        agent.close()
+
+        backend = SQLiteBackend(db_path)
+        db = backend.load()
+        versions = backend.load_versions(1)
+        backend.close()
+        self.assertEqual(db["automations"][0]["question"], "First")
+        self.assertEqual(db["versions"], {})
+        self.assertEqual(versions[0]["version"], 1)
+
+
+class TestSharedStorage(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for the shared catalogs"""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        shutil.rmtree(self.tmp_dir)
+
+    def _path(self, backend):
+        return os.path.join(self.tmp_dir, f"shared-{backend}.db")
+
+    def _agent(self, backend):
+        return DevOpsAutomationAgent(storage_path=self._path(backend), auth_required=False,
+                                     storage_backend=backend, usage_flush_threshold=1000)
+
+    def _add(self, agent, question):
+        return agent.add_automation(
+            question=question,
+            script=f"echo {question}",
+            tags=["shared"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+
+    def test_agents_see_each_others_writes(self):
+        """Test that interleaved adds get distinct ids and reach the other agent"""
+        for backend in SHARED_BACKENDS:
+            with self.subTest(backend=backend):
+                first, second = self._agent(backend), self._agent(backend)
+                ids = [self._add(first, "alpha")["id"], self._add(second, "beta")["id"],
+                       self._add(first, "gamma")["id"]]
+                self.assertEqual(ids, [1, 2, 3])
+
+                self.assertEqual(second.refresh(), 1)
+                self.assertEqual(second.get_automation(3, count_usage=False)["question"], "gamma")
+                self.assertEqual([a["id"] for a in second.search_automation("gamma")], [3])
+                self.assertEqual(second.refresh(), 0)
+                first.close()
+                second.close()
+
+    def test_stale_update_raises_conflict(self):
+        """Test the optimistic version check against an edit from another agent"""
+        for backend in SHARED_BACKENDS:
+            with self.subTest(backend=backend):
+                first, second = self._agent(backend), self._agent(backend)
+                self._add(first, "deploy")
+                second.refresh()
+
+                first.update_script(1, "echo v2", "test_user", expected_version=1)
+                with self.assertRaises(ConflictError):
+                    second.update_script(1, "echo other", "test_user", expected_version=1)
+                updated = second.update_script(1, "echo v3", "test_user", expected_version=2)
+                self.assertEqual(updated["version"], 3)
+                self.assertEqual([v["script"] for v in second.get_versions(1)],
+                                 ["echo deploy", "echo v2", "echo v3"])
+
+                first.refresh()
+                self.assertEqual(first.get_automation(1, count_usage=False)["script"], "echo v3")
+                first.close()
+                second.close()
+
+    def test_usage_counts_are_merged(self):
+        """Test that usage flushed by two agents adds up instead of overwriting"""
+        for backend in SHARED_BACKENDS:
+            with self.subTest(backend=backend):
+                first, second = self._agent(backend), self._agent(backend)
+                self._add(first, "deploy")
+                second.refresh()
+                first.get_automation(1)
+                second.get_automation(1)
+                second.get_automation(1)
+                first.close()
+                second.close()
+
+                reloaded = self._agent(backend)
+                self.assertEqual(reloaded.get_automation(1, count_usage=False)["times_used"], 3)
+                reloaded.close()
+
+    def test_saved_usage_is_not_counted_twice(self):
+        """Test that a use written out with its record is not re-applied after another agent's write"""
+        for backend in SHARED_BACKENDS:
+            with self.subTest(backend=backend):
+                first, second = self._agent(backend), self._agent(backend)
+                self._add(first, "deploy")
+                first.get_automation(1)
+                first.update_script(1, "echo v2", "test_user")
+                second.refresh()
+                self._add(second, "rollback")
+                first.refresh()
+                self.assertEqual(first.get_automation(1, count_usage=False)["times_used"], 1)
+                first.close()
+                second.close()
+
+                reloaded = self._agent(backend)
+                self.assertEqual(reloaded.get_automation(1, count_usage=False)["times_used"], 1)
+                reloaded.close()
+
+    def test_concurrent_processes_do_not_lose_writes(self):
+        """Test that adds from several processes all survive with unique ids"""
+        for backend in ("log", "sqlite"):
+            with self.subTest(backend=backend):
+                processes = [multiprocessing.Process(target=_add_from_process, args=(self._path(backend), backend, 10))
+                             for _ in range(4)]
+                for process in processes:
+                    process.start()
+                for process in processes:
+                    process.join()
+                    self.assertEqual(process.exitcode, 0)
+
+                agent = self._agent(backend)
+                ids = [automation["id"] for automation in agent.iter_automations()]
+                self.assertEqual(sorted(ids), list(range(1, 41)))
+                agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
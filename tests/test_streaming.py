@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.streaming import TailBuffer
+
+
+class TestTailBuffer(unittest.TestCase):
+    def test_keeps_only_the_tail(self):
+        """Test that the buffer drops old bytes once full"""
+        buffer = TailBuffer(5)
+        for chunk in [b"abc", b"def", b"gh"]:
+            buffer.append(chunk)
+        self.assertEqual(buffer.getvalue(), b"defgh")
+        buffer.append(b"0123456789")
+        self.assertEqual(buffer.getvalue(), b"56789")
+
+
+class TestStreamAutomation(unittest.TestCase):
+    def setUp(self):
+        """Set up an agent with a chatty shell automation"""
+        self.test_storage = "test_automations.json"
+        self.agent = DevOpsAutomationAgent(storage_path=self.test_storage, auth_required=False)
+        self.automation = self.agent.add_automation(
+            question="Print lines",
+            script="for i in 1 2 3; do echo line$i; done; echo oops >&2",
+            tags=["test"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.agent.close()
+        if os.path.exists(self.test_storage):
+            os.remove(self.test_storage)
+
+    def test_stream_yields_chunks_and_spills(self):
+        """Test streaming output with a small tail and a spill file"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spill_path = os.path.join(tmp_dir, "output.log")
+            stream = self.agent.stream_automation(self.automation["id"], "test_user",
+                                                  tail_bytes=6, spill_path=spill_path)
+            chunks = list(stream)
+            stdout = b"".join(data for name, data in chunks if name == "stdout")
+            self.assertEqual(stdout, b"line1\nline2\nline3\n")
+            self.assertEqual(stream.tail("stdout"), "line3\n")
+            self.assertEqual(stream.tail("stderr"), "oops\n")
+            self.assertEqual(stream.returncode, 0)
+            with open(spill_path, "rb") as f:
+                self.assertIn(b"line2", f.read())
+
+    def test_async_stream(self):
+        """Test the async iterator variant"""
+        async def collect():
+            stream = self.agent.stream_automation_async(self.automation["id"], "test_user")
+            return stream, [chunk async for chunk in stream]
+
+        stream, chunks = asyncio.run(collect())
+        self.assertIn(b"line3", b"".join(data for _, data in chunks))
+        self.assertEqual(stream.returncode, 0)
+
+    def test_abandoned_streams_clean_up(self):
+        """Test that breaking out early kills the script and closes the spill file"""
+        endless = self.agent.add_automation("Endless", "yes", ["test"], ScriptType.BASH, "test_user")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spill_path = os.path.join(tmp_dir, "output.log")
+            stream = self.agent.stream_automation(endless["id"], "test_user", spill_path=spill_path)
+            self.assertIsNone(stream.process)
+            self.assertFalse(os.path.exists(spill_path))
+            for _ in stream:
+                break
+            self.assertIsNotNone(stream.returncode)
+            self.assertIsNone(stream._spill)
+
+            async def consume_one():
+                stream = self.agent.stream_automation_async(endless["id"], "test_user", spill_path=spill_path)
+                chunks = stream.__aiter__()
+                await chunks.__anext__()
+                await chunks.aclose()
+                return stream
+
+            stream = asyncio.run(consume_one())
+            self.assertIsNotNone(stream.returncode)
+            self.assertIsNone(stream._spill)
+
+
+if __name__ == '__main__':
+    unittest.main()
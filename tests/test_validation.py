@@ -0,0 +1,82 @@
+import os
+import shutil
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.exceptions import ValidationError
+from devops_agent.validation import ScriptValidator
+
+
+class TestScriptValidator(unittest.TestCase):
+    def test_verdicts_are_memoized_by_hash(self):
+        """Test that a script is only checked once per hash and type"""
+        validator = ScriptValidator()
+        self.assertIsNone(validator.check("result = 1", "python", "h1"))
+        self.assertIsNone(validator.check("result = 1", "python", "h1"))
+        self.assertEqual((validator.hits, validator.misses), (1, 1))
+        self.assertIn("Invalid Python syntax", validator.check("def (", "python"))
+
+    @unittest.skipUnless(shutil.which("bash"), "bash is not installed")
+    def test_check_many_parses_bash_without_running_it(self):
+        """Test parse-only bash checks in bulk, with duplicates checked once"""
+        validator = ScriptValidator(max_workers=4)
+        marker = os.path.join(os.getcwd(), "validation_marker")
+        verdicts = validator.check_many([
+            ("echo ok", "bash", None),
+            (f"touch {marker}", "bash", None),
+            ("if true; then echo", "bash", None),
+            ("if true; then echo", "bash", None),
+            ("   ", "bash", None),
+        ])
+        self.assertFalse(os.path.exists(marker))
+        self.assertEqual(verdicts[:2], [None, None])
+        self.assertIn("Invalid bash syntax", verdicts[2])
+        self.assertEqual(verdicts[3], verdicts[2])
+        self.assertEqual(verdicts[4], "Script cannot be empty")
+        self.assertEqual(validator.misses, 3)
+
+    def test_missing_interpreter_is_not_cached(self):
+        """Test that scripts are accepted but rechecked when no interpreter is available"""
+        validator = ScriptValidator()
+        validator.powershell_path = None
+        self.assertIsNone(validator.check("Get-Process", "powershell", "h1"))
+        self.assertIsNone(validator.check("Get-Process", "powershell", "h1"))
+        self.assertEqual(validator.hits, 0)
+
+
+@unittest.skipUnless(shutil.which("bash") and shutil.which("false"), "bash is not installed")
+class TestAgentValidation(unittest.TestCase):
+    def setUp(self):
+        """Set up test environment before each test"""
+        self.test_storage = "test_automations.json"
+        self.agent = DevOpsAutomationAgent(storage_path=self.test_storage, auth_required=False)
+
+    def tearDown(self):
+        """Clean up after each test"""
+        self.agent.close()
+        if os.path.exists(self.test_storage):
+            os.remove(self.test_storage)
+
+    def test_bash_syntax_errors_rejected_at_add(self):
+        """Test that a bash script that does not parse is not stored"""
+        with self.assertRaises(ValidationError):
+            self.agent.add_automation("Broken", "for x in; do", ["test"], ScriptType.BASH, "test_user")
+        outcome = self.agent.add_automations_bulk([
+            {"question": "Broken", "script": "case x in", "script_type": "bash"},
+            {"question": "Fine", "script": "echo fine", "script_type": "bash"},
+        ], "test_user")
+        self.assertEqual([error["index"] for error in outcome["errors"]], [0])
+        self.assertEqual(len(outcome["added"]), 1)
+
+    def test_revalidate_ignores_cached_verdicts(self):
+        """Test re-checking the catalog after the interpreter changed"""
+        self.agent.add_automation("Disk", "df -h", ["disk"], ScriptType.BASH, "test_user")
+        self.agent.add_automation("Sum", "result = 1", ["math"], ScriptType.PYTHON, "test_user")
+        self.assertEqual(self.agent.revalidate(), [])
+
+        # Stand-in for an upgraded bash that rejects the stored script
+        self.agent.validator.bash_path = shutil.which("false")
+        self.assertEqual([failure["automation_id"] for failure in self.agent.revalidate()], [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import unittest
+from devops.agent import Solution
+from devops.solution_generator import SolutionGenerator
+from devops.validators import DevOpsValidator, PhraseMatcher
+
+
+def make_solution(steps):
+    return Solution(description="candidate", implementation_steps=steps, considerations=[], risks=[],
+                    estimated_effort="1d", tools_required=[], prerequisites=[], validation_steps=[])
+
+
+def reference_findings(solution):
+    """The original per-check, per-step substring scan"""
+    security = [f"Missing {check} consideration" for check in DevOpsValidator.SECURITY_CHECKS
+                if not any(check.lower() in step.lower() for step in solution.implementation_steps)]
+    reliability = [f"Consider adding {check}" for check in DevOpsValidator.RELIABILITY_CHECKS
+                   if not any(check.lower() in step.lower() for step in solution.implementation_steps)]
+    return {"security": security, "reliability": reliability}
+
+
+class TestDevOpsValidator(unittest.TestCase):
+    def test_matches_original_semantics(self):
+        """Test the single-pass matcher against the per-check scan on random steps"""
+        rng = random.Random(7)
+        words = [word for check in DevOpsValidator.SECURITY_CHECKS + DevOpsValidator.RELIABILITY_CHECKS
+                 for word in check.split()] + ["deploy", "the", "NETWORK", "with", "strategies"]
+        solutions = [make_solution([" ".join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+                                    for _ in range(rng.randint(0, 6))])
+                     for _ in range(500)]
+        for solution, findings in zip(solutions, DevOpsValidator.validate_many(solutions)):
+            self.assertEqual(findings, reference_findings(solution))
+            self.assertEqual(DevOpsValidator.validate_security(solution), findings["security"])
+            self.assertEqual(DevOpsValidator.validate_reliability(solution), findings["reliability"])
+
+    def test_phrases_do_not_span_steps(self):
+        """Test that a phrase split across two steps is not matched"""
+        findings = DevOpsValidator.validate(make_solution(["Enable data", "encryption everywhere"]))
+        self.assertIn("Missing Data encryption consideration", findings["security"])
+
+    def test_overlapping_and_prefix_phrases(self):
+        """Test that overlapping phrases and phrases that prefix others are all found"""
+        matcher = PhraseMatcher(["network security", "security scanning", "network"])
+        self.assertEqual(matcher.found("Run NETWORK SECURITY SCANNING nightly"), {0, 1, 2})
+        self.assertEqual(matcher.found("network only"), {2})
+
+    def test_rank_solutions(self):
+        """Test that candidates with fewer findings are ranked first"""
+        thorough = make_solution(DevOpsValidator.SECURITY_CHECKS + DevOpsValidator.RELIABILITY_CHECKS)
+        partial = make_solution(["Data encryption", "Load balancing"])
+        empty = make_solution([])
+        self.assertEqual(SolutionGenerator().rank_solutions([empty, partial, thorough]), [thorough, partial, empty])
+
+
+if __name__ == '__main__':
+    unittest.main()
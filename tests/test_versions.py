@@ -0,0 +1,94 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from devops_agent.agent import DevOpsAutomationAgent, ScriptType
+from devops_agent.versions import apply_delta, make_delta
+
+
+class TestDelta(unittest.TestCase):
+    def test_round_trip(self):
+        """Test that applying a delta reproduces the target text"""
+        base = "a\nb\nc\nd\n"
+        target = "a\nB\nc\nd\ne"
+        self.assertEqual(apply_delta(base, make_delta(base, target)), target)
+
+
+class TestVersionStore(unittest.TestCase):
+    def setUp(self):
+        """Create a scratch directory for database files"""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the scratch directory"""
+        shutil.rmtree(self.tmp_dir)
+
+    def _agent(self, backend, name="automations.json"):
+        return DevOpsAutomationAgent(storage_path=os.path.join(self.tmp_dir, name),
+                                     auth_required=False, storage_backend=backend)
+
+    def _add(self, agent, script):
+        return agent.add_automation(
+            question="Report",
+            script=script,
+            tags=["test"],
+            script_type=ScriptType.BASH,
+            user_id="test_user"
+        )
+
+    def test_history_survives_reload(self):
+        """Test edits are stored as deltas and reconstructed after a restart"""
+        for backend in ["json", "log", "sqlite"]:
+            with self.subTest(backend=backend):
+                agent = self._agent(backend, f"{backend}.db")
+                scripts = ["echo one\necho two\n", "echo one\necho 2\n", "echo one\necho 2\necho three\n"]
+                automation = self._add(agent, scripts[0])
+                for script in scripts[1:]:
+                    agent.update_script(automation["id"], script, "test_user")
+                agent.close()
+
+                reloaded = self._agent(backend, f"{backend}.db")
+                history = reloaded.get_versions(automation["id"])
+                self.assertEqual([v["script"] for v in history], scripts)
+                self.assertEqual([v["version"] for v in history], [1, 2, 3])
+                self.assertEqual(reloaded.get_automation(automation["id"], count_usage=False)["version"], 3)
+                reloaded.close()
+
+    def test_identical_scripts_share_one_blob(self):
+        """Test that the same script text is stored once across automations"""
+        agent = self._agent("json")
+        first = self._add(agent, "uptime")
+        second = self._add(agent, "uptime")
+        agent.update_script(first["id"], "uptime -p", "test_user")
+        agent.close()
+
+        with open(os.path.join(self.tmp_dir, "automations.json"), encoding="utf-8") as f:
+            db = json.load(f)
+        self.assertEqual(len(db["blobs"]), 2)
+        self.assertNotIn("script", db["versions"]["1"][0])
+
+        reloaded = self._agent("json")
+        self.assertEqual(reloaded.get_versions(first["id"])[0]["script"], "uptime")
+        self.assertEqual(reloaded.get_versions(second["id"])[0]["script"], "uptime")
+        reloaded.close()
+
+    def test_legacy_versions_are_migrated(self):
+        """Test that version entries with inline scripts still load"""
+        path = os.path.join(self.tmp_dir, "automations.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "automations": [{"id": 1, "question": "q", "script": "df -h", "script_type": "bash",
+                                 "tags": [], "times_used": 0, "version": 1, "script_hash": "h1"}],
+                "versions": {"1": [{"version": 1, "script": "df -h", "script_hash": "h1",
+                                    "modified_at": "2025-01-01T00:00:00", "modified_by": "u"}]}
+            }, f)
+        agent = self._agent("json")
+        self.assertEqual(agent.automations_db["blobs"], {"h1": {"live": 1}})
+        agent.update_script(1, "df -h /", "test_user")
+        self.assertEqual([v["script"] for v in agent.get_versions(1)], ["df -h", "df -h /"])
+        agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from devops_agent.exceptions import ExecutionError
+from devops_agent.workers import PythonWorkerPool
+
+
+def compile_script(script):
+    return compile(script, '<string>', 'exec')
+
+
+class TestPythonWorkerPool(unittest.TestCase):
+    def setUp(self):
+        """Start a single warm worker that recycles every two runs"""
+        self.pool = PythonWorkerPool(size=1, max_runs=2)
+
+    def tearDown(self):
+        """Stop the worker processes"""
+        self.pool.shutdown()
+
+    def test_runs_code_in_another_process_and_recycles(self):
+        """Test results come back from a worker that is replaced after max_runs"""
+        code = compile_script("import os\nresult = (os.getpid(), params['n'] * 2)")
+        first_pid, doubled = self.pool.run("h1", code, {"n": 21})
+        second_pid, _ = self.pool.run("h1", code, {"n": 1})
+        third_pid, _ = self.pool.run("h1", code, {"n": 1})
+        self.assertEqual(doubled, 42)
+        self.assertEqual(first_pid, second_pid)
+        self.assertNotEqual(second_pid, third_pid)
+        self.assertEqual(self.pool.recycled, 1)
+
+    def test_errors_and_timeouts(self):
+        """Test script errors are reported and hung workers are replaced"""
+        with self.assertRaises(ExecutionError):
+            self.pool.run("h2", compile_script("raise ValueError('boom')"), None)
+        with self.assertRaises(TimeoutError):
+            self.pool.run("h3", compile_script("while True: pass"), None, timeout=0.2)
+        self.assertEqual(self.pool.run("h4", compile_script("result = 'alive'"), None), "alive")
+
+    def test_unpicklable_params_keep_the_worker(self):
+        """Test that params which cannot be sent fail the run without losing the worker"""
+        code = compile_script("result = 'alive'")
+        with self.assertRaises(ExecutionError):
+            self.pool.run("h5", code, {"callback": lambda: None})
+        with self.assertRaises(ExecutionError):
+            self.pool.run("h6", compile_script("result = lambda: None"), None)
+        self.assertEqual(self.pool._idle.qsize(), 1)
+        self.assertEqual(self.pool.run("h5", code, None, timeout=5), "alive")
+
+
+if __name__ == '__main__':
+    unittest.main()